@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - benchmarks - result history"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# benchmark results are kept as a json list of runs, newest last; each run
+# records when it ran, the parameters it ran with and {name: {stat: value}}
+
+import datetime
+import json
+import os
+
+dir_benchmarks = os.path.dirname(os.path.realpath(__file__))
+dir_results = os.path.join(dir_benchmarks, 'results')
+
+
+def default_path(name):
+    """:return: default history file for benchmark `name`"""
+
+    return os.path.join(dir_results, name + '.json')
+
+
+def load(path):
+    """:return: `list`, previous runs; empty if missing or unreadable"""
+
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return []
+
+
+def previous(history, **params):
+    """:return: results of the newest run made with `params`, else None"""
+
+    runs = [x for x in history
+            if all(x.get(k) == v for k, v in params.items())]
+    return runs[-1]['results'] if runs else None
+
+
+def save(path, history, results, **params):
+    """appends a run to `history` and writes it to `path`"""
+
+    run = dict(params)
+    run['time'] = datetime.datetime.utcnow().isoformat()
+    run['results'] = results
+    history.append(run)
+
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+
+
+def change(results, previous_results, name, stat):
+    """:return: `str`, relative change of a stat against a previous run"""
+
+    try:
+        old = previous_results[name][stat]
+        new = results[name][stat]
+        return '{:+.1%}'.format((new - old) / old)
+    except (KeyError, TypeError, ZeroDivisionError):
+        return ''
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - benchmarks - tool start up time"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# measures cold start latency of each command line tool: every sample is a
+# fresh interpreter importing the tool module (and, separately, running its
+# ``--help``), so nothing is shared with previous samples; results are
+# appended to a json history file and compared against the previous entry
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import history
+
+dir_benchmarks = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_benchmarks, '..'))
+
+tools = ['lfptool', 'recipetool', 'webtool', 'cameratool', 'cameracontrols']
+
+import_stmt = '''
+import time
+t = time.time()
+import lpt.bin.{tool}
+print(time.time() - t)
+'''
+
+
+def _env():
+    """environment for sampled interpreters, resolving `lpt` from this tree"""
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [dir_root] + [x for x in [env.get('PYTHONPATH')] if x])
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    return env
+
+
+def sample_import(tool, python=sys.executable):
+    """:return: seconds spent importing `tool`'s module, None on failure"""
+
+    sp = subprocess.Popen([python, '-c', import_stmt.format(tool=tool)],
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE,
+                          env=_env())
+    stdout, stderr = sp.communicate()
+    if sp.returncode:
+        return None
+    return float(stdout.strip().splitlines()[-1])
+
+
+def sample_help(tool, python=sys.executable):
+    """:return: wall time of ``<tool> --help`` (interpreter start included)"""
+
+    script = os.path.join(dir_root, 'lpt', 'bin', tool + '.py')
+    start = time.time()
+    sp = subprocess.Popen([python, script, '--help'],
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE,
+                          env=_env())
+    sp.communicate()
+    if sp.returncode:
+        return None
+    return time.time() - start
+
+
+def summarize(samples):
+    """:return: `dict`, min/median/max of the successful samples"""
+
+    samples = sorted(x for x in samples if x is not None)
+    if not samples:
+        return None
+    return {'min': samples[0],
+            'median': samples[len(samples) // 2],
+            'max': samples[-1],
+            'n': len(samples)}
+
+
+def run(repeat=5, selected=None, python=sys.executable):
+    """:return: `dict`, {tool: {'import': summary, 'help': summary}}"""
+
+    results = {}
+    for tool in selected or tools:
+        results[tool] = {
+            'import': summarize([sample_import(tool, python)
+                                 for _ in range(repeat)]),
+            'help': summarize([sample_help(tool, python)
+                               for _ in range(repeat)])}
+    return results
+
+
+def report(results, previous=None):
+    """prints results, with the change in median against `previous`"""
+
+    row = '{:<16}{:<8}{:>10}{:>10}{:>10}{:>10}'
+    print(row.format('tool', 'stage', 'min', 'median', 'max', 'change'))
+
+    for tool in sorted(results):
+        for stage in 'import', 'help':
+            cur = results[tool][stage]
+            if not cur:
+                print(row.format(tool, stage, '-', '-', '-', 'failed'))
+                continue
+
+            change = ''
+            if previous and previous.get(tool):
+                change = history.change(results[tool], previous[tool],
+                                        stage, 'median')
+
+            print(row.format(tool, stage,
+                             '{:.3f}'.format(cur['min']),
+                             '{:.3f}'.format(cur['median']),
+                             '{:.3f}'.format(cur['max']),
+                             change))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="measure cold start latency of the Lytro Power Tools")
+    parser.add_argument('-n', '--repeat', type=int, default=5,
+                        help="samples per tool and stage")
+    parser.add_argument('-t', '--tool', action='append', choices=tools,
+                        dest='tools', help="only measure the given tool(s)")
+    parser.add_argument('-o', '--output',
+                        default=history.default_path('import_time'),
+                        help="json history file results are appended to")
+    parser.add_argument('--python', default=sys.executable,
+                        help="interpreter to sample with")
+    args = parser.parse_args()
+
+    runs = history.load(args.output)
+    results = run(args.repeat, args.tools, args.python)
+    report(results, history.previous(runs, python=args.python))
+    history.save(args.output, runs, results, python=args.python)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - benchmarks - recipe load and flush"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# times the recipe round trip that recipetool and lfptool batch repeat per
+# file: recipe key lookups, Make.verify, Recipe load and Recipe flush over a
+# directory of generated recipe files; results are appended to a json
+# history file and compared against the previous entry
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import history
+
+dir_benchmarks = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_benchmarks, '..'))
+sys.path.insert(0, dir_root)
+
+from lpt.recipe.make import Make
+from lpt.recipe.params import Params
+from lpt.recipe.params import key_formats
+from lpt.recipe.recipe import Recipe
+
+make = Make()
+params = Params()
+
+seed_views = {
+    'viewAperture': 2.0,
+    'viewExposure': 0.5,
+    'viewFocus': 1.5,
+    'viewSaturation': 10,
+    'viewTemperature': 5200}
+
+
+def seed(dir_out, count):
+    """writes `count` identical recipe files to `dir_out`
+
+    :return: `list`, recipe file paths
+    """
+
+    recipe = Recipe()
+    recipe(seed_views)
+    recipe.focus_animation.keyframes(times=1.0, values=1.5)
+    recipe.focus_animation.keyframes(times=3.0, values=2.5)
+    recipe.path = os.path.join(dir_out, 'seed.json')
+    recipe.flush()
+
+    paths = []
+    for i in range(count):
+        path = os.path.join(dir_out, 'recipe_{:05d}.json'.format(i))
+        shutil.copyfile(recipe.path, path)
+        paths.append(path)
+
+    return paths
+
+
+def bench_keys(rounds):
+    """key format lookups for every recipe key, `rounds` times over"""
+
+    keys = sorted(params.recipe_keys)
+    forms = key_formats.forms.keys()
+
+    start = time.time()
+    for _ in range(rounds):
+        for key in keys:
+            for form in forms:
+                key_formats(key, form, True)
+    return time.time() - start
+
+
+def bench_verify(paths):
+
+    start = time.time()
+    for path in paths:
+        make.verify(path)
+    return time.time() - start
+
+
+def bench_load_flush(paths):
+    """:return: `tuple`, seconds spent loading, seconds spent flushing"""
+
+    load = flush = 0.0
+
+    for path in paths:
+        start = time.time()
+        recipe = Recipe(path)
+        load += time.time() - start
+
+        start = time.time()
+        recipe.flush()
+        flush += time.time() - start
+
+    return load, flush
+
+
+def run(count):
+    """:return: `dict`, {stage: seconds}"""
+
+    dir_out = tempfile.mkdtemp(prefix='lpt_bench_')
+
+    try:
+        paths = seed(dir_out, count)
+        load, flush = bench_load_flush(paths)
+        stages = dict(keys=bench_keys(count),
+                      verify=bench_verify(paths),
+                      load=load,
+                      flush=flush)
+    finally:
+        shutil.rmtree(dir_out, ignore_errors=True)
+
+    return {k: {'total': v} for k, v in stages.items()}
+
+
+def report(results, count, previous=None):
+    """prints results, with the change in total against `previous`"""
+
+    row = '{:<10}{:>12}{:>14}{:>10}'
+    print(row.format('stage', 'total (s)', 'per item (ms)', 'change'))
+
+    for stage in 'keys', 'verify', 'load', 'flush':
+        total = results[stage]['total']
+        print(row.format(stage,
+                         '{:.3f}'.format(total),
+                         '{:.3f}'.format(total / count * 1000),
+                         history.change(results, previous, stage, 'total')))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="measure recipe load/flush throughput")
+    parser.add_argument('-n', '--count', type=int, default=10000,
+                        help="number of recipe files")
+    parser.add_argument('-o', '--output',
+                        default=history.default_path('recipe_flush'),
+                        help="json history file results are appended to")
+    args = parser.parse_args()
+
+    runs = history.load(args.output)
+    results = run(args.count)
+    report(results, args.count, history.previous(runs, count=args.count))
+    history.save(args.output, runs, results, count=args.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - benchmarks - stub TNT engine"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# stands in for the proprietary ``tnt`` binary: accepts any TNT command line,
+# sleeps to emulate processing and writes a placeholder for every output
+# argument, so lfptool/recipetool orchestration can be measured without
+# camera files or the real engine
+#
+# environment:
+#   LPT_STUB_TNT_LATENCY   seconds per invocation (default: 0.05)
+#   LPT_STUB_TNT_PER_MB    extra seconds per MB of --lfp-in (default: 0)
+#   LPT_STUB_TNT_SIZE      bytes per written output file (default: 65536)
+#   LPT_STUB_TNT_LOG       append one json line per invocation to this file
+
+import json
+import os
+import sys
+import time
+
+file_outputs = ('--image-out', '--lfp-out', '--raw-out', '--eslf-out',
+                '--depth-out')
+recipe_outputs = ('--recipe-out',)
+
+
+def options(argv):
+    """:return: `dict`, {flag: value or True} from a TNT command line"""
+
+    opts = {}
+    i = 0
+
+    while i < len(argv):
+        arg = argv[i]
+        if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+            opts[arg] = argv[i + 1]
+            i += 2
+        else:
+            opts[arg] = True
+            i += 1
+
+    return opts
+
+
+def main(argv=None):
+
+    argv = sys.argv[1:] if argv is None else argv
+    start = time.time()
+    opts = options(argv)
+
+    latency = float(os.getenv('LPT_STUB_TNT_LATENCY', .05))
+    per_mb = float(os.getenv('LPT_STUB_TNT_PER_MB', 0))
+
+    lfp_in = opts.get('--lfp-in')
+    if per_mb and isinstance(lfp_in, str) and os.path.isfile(lfp_in):
+        latency += per_mb * os.path.getsize(lfp_in) / 1e6
+    size = int(os.getenv('LPT_STUB_TNT_SIZE', 65536))
+
+    time.sleep(latency)
+
+    for flag in file_outputs:
+        path = opts.get(flag)
+        if isinstance(path, str):
+            with open(path, 'wb') as f:
+                f.write(b'\x00' * size)
+
+    for flag in recipe_outputs:
+        path = opts.get(flag)
+        if isinstance(path, str):
+            with open(path, 'w') as f:
+                json.dump({'viewFocus': 0.0}, f)
+
+    log = os.getenv('LPT_STUB_TNT_LOG')
+    if log:
+        with open(log, 'a') as f:
+            f.write(json.dumps({'pid': os.getpid(),
+                                'start': start,
+                                'end': time.time(),
+                                'argv': argv}) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - benchmarks - benchmark suite"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# end to end benchmarks that need neither camera files nor the proprietary
+# TNT engine: inputs come from `synthetic`, TNT is replaced by `stub_tnt`
+# and web uploads go to a local HTTP server; every benchmark runs in a fresh
+# temporary directory and results are appended to a json history file
+#
+# TNT is swapped in-process (``Tnt._exe``), so worker processes pick up the
+# stub through fork; the stub must be executable (POSIX only)
+
+import BaseHTTPServer
+import SocketServer
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+dir_benchmarks = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_benchmarks, '..'))
+stub_tnt = os.path.join(dir_benchmarks, 'stub_tnt.py')
+sys.path.insert(0, dir_root)
+
+import history
+import recipe_flush
+import synthetic
+
+from lpt.lfp.lfp import Lfp
+from lpt.lfp.tnt import Tnt
+from lpt.lfp.tool import Tool
+from lpt.recipe.make import Generator
+from lpt.recipe.recipe import Recipe
+
+tool = Tool()
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """silences stdout/stderr at the descriptor level (workers included)"""
+
+    if not enabled:
+        yield
+        return
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+
+    try:
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        [os.close(fd) for fd in saved + (devnull,)]
+
+
+@contextlib.contextmanager
+def workdir():
+    """temporary directory, removed afterwards"""
+
+    path = tempfile.mkdtemp(prefix='lpt_bench_')
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def stubbed_tnt(latency):
+    """points `Tnt` at the stub engine for the duration of the block"""
+
+    exe = Tnt._exe
+    env = os.environ.get('LPT_STUB_TNT_LATENCY')
+    Tnt._exe = stub_tnt
+    os.environ['LPT_STUB_TNT_LATENCY'] = str(latency)
+
+    try:
+        yield
+    finally:
+        Tnt._exe = exe
+        if env is None:
+            del os.environ['LPT_STUB_TNT_LATENCY']
+        else:
+            os.environ['LPT_STUB_TNT_LATENCY'] = env
+
+
+def animated_recipe(path, duration=10.0):
+    """writes a recipe animating focus over `duration` seconds"""
+
+    recipe = Recipe()
+    recipe({'viewFocus': 0.0})
+    recipe.focus_animation.keyframes(times=0.0, values=-2.0)
+    recipe.focus_animation.keyframes(times=duration, values=2.0)
+    recipe.path = path
+    recipe.flush()
+    return path
+
+
+def lfptool(*argv):
+    """runs lfptool in-process with `argv`"""
+
+    from lpt.bin import lfptool as tool_
+
+    saved = sys.argv
+    sys.argv = ['lfptool'] + [str(x) for x in argv]
+    try:
+        tool_.build()
+    finally:
+        sys.argv = saved
+
+
+# benchmarks
+#
+# each takes the parsed options and returns {'total': seconds, 'items': n}
+#
+#
+
+
+def bench_lfp_parse(opts):
+
+    with workdir() as dir_:
+        paths = synthetic.write_shoot(dir_, opts.files,
+                                      frames=opts.frames,
+                                      metadata_size=opts.metadata_size,
+                                      blob_size=opts.blob_size)
+        start = time.time()
+        for path in paths:
+            Lfp(path).images
+        total = time.time() - start
+
+    return {'total': total, 'items': len(paths)}
+
+
+def bench_search(opts):
+
+    with workdir() as dir_:
+        synthetic.write_shoot(dir_, opts.files,
+                              frames=opts.frames,
+                              metadata_size=opts.metadata_size,
+                              blob_size=opts.blob_size)
+        start = time.time()
+        with quiet(not opts.verbose):
+            found = tool.search(dir_, raw=True, validate=False, mute=True,
+                                processors=opts.processors)
+        total = time.time() - start
+
+    assert len(found) == opts.files, "search found {} of {} files".format(
+        len(found), opts.files)
+    return {'total': total, 'items': opts.files}
+
+
+def bench_generator(opts):
+
+    steps = opts.files
+
+    with workdir() as dir_:
+        recipe_in = animated_recipe(os.path.join(dir_, 'anim.json'))
+
+        start = time.time()
+        with quiet(not opts.verbose):
+            gen = Generator(recipe_in, total=steps)
+            gen.init()
+            _, end = gen.recipe_in.duration
+            for i in range(steps):
+                mark = end * i / max(steps - 1, 1)
+                gen(mark, recipe_out=os.path.join(dir_, '{}.json'.format(i)))
+        total = time.time() - start
+
+    return {'total': total, 'items': steps}
+
+
+def bench_recipe_flush(opts):
+
+    with workdir() as dir_:
+        paths = recipe_flush.seed(dir_, opts.files)
+        with quiet(not opts.verbose):
+            load, flush = recipe_flush.bench_load_flush(paths)
+
+    return {'total': load + flush, 'load': load, 'flush': flush,
+            'items': len(paths)}
+
+
+def bench_lfptool_raw(opts):
+
+    with workdir() as dir_:
+        synthetic.write_shoot(dir_, opts.files, blob_size=opts.blob_size)
+
+        start = time.time()
+        with stubbed_tnt(opts.latency), quiet(not opts.verbose):
+            lfptool('raw', '-i', dir_, '--image-out', '--imagerep', 'jpeg',
+                    '-P', opts.processors)
+        total = time.time() - start
+
+    return {'total': total, 'items': opts.files,
+            'engine': opts.files * opts.latency}
+
+
+def bench_lfptool_batch(opts):
+
+    with workdir() as dir_:
+        dir_lfp = os.path.join(dir_, 'shoot')
+        synthetic.write_shoot(dir_lfp, opts.files, blob_size=opts.blob_size)
+        recipe_in = animated_recipe(os.path.join(dir_, 'anim.json'))
+
+        start = time.time()
+        with stubbed_tnt(opts.latency), quiet(not opts.verbose):
+            lfptool('batch', '-i', dir_lfp, '--recipe-in', recipe_in,
+                    '--imagerep', 'jpeg', '-P', opts.processors)
+        total = time.time() - start
+
+    return {'total': total, 'items': opts.files,
+            'engine': opts.files * opts.latency}
+
+
+class _UploadHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """answers upload and picture posts the way the Lytro web API does"""
+
+    def do_POST(self):
+        length = int(self.headers.getheader('Content-Length') or 0)
+        self.rfile.read(length)
+
+        if self.path.rstrip('/').endswith('pictures.json'):
+            data = {'picture_id': 1}
+        else:
+            data = {'upload_id': 1}
+
+        body = json.dumps(data)
+        self.send_response(201)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def bench_web_upload(opts):
+
+    from lpt.web.webcommon import WebCommon
+
+    server = _Server(('127.0.0.1', 0), _UploadHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    api_url = WebCommon.api_url
+    WebCommon.api_url = 'http://127.0.0.1:{}'.format(server.server_port)
+
+    try:
+        web = WebCommon()
+        web.user_id = 1
+        web.auth_token = 'benchmark'
+
+        with workdir() as dir_:
+            paths = synthetic.write_shoot(dir_, opts.files, ext='lfp',
+                                          blob_size=opts.blob_size)
+            size = sum(os.path.getsize(p) for p in paths)
+
+            start = time.time()
+            with quiet(not opts.verbose):
+                for path in paths:
+                    web.post_picture(path, album_id=1)
+            total = time.time() - start
+    finally:
+        WebCommon.api_url = api_url
+        server.shutdown()
+        server.server_close()
+
+    return {'total': total, 'items': len(paths), 'bytes': size}
+
+
+benchmarks = [
+    ('lfp_parse', bench_lfp_parse),
+    ('search', bench_search),
+    ('generator', bench_generator),
+    ('recipe_flush', bench_recipe_flush),
+    ('lfptool_raw', bench_lfptool_raw),
+    ('lfptool_batch', bench_lfptool_batch),
+    ('web_upload', bench_web_upload)]
+
+
+def report(results, previous=None):
+    """prints results, with the change in total against `previous`
+
+    benchmarks that could not run have an `error` instead of their stats
+    """
+
+    row = '{:<16}{:>8}{:>12}{:>14}{:>10}'
+    print(row.format('benchmark', 'items', 'total (s)', 'per item (ms)',
+                     'change'))
+
+    for name, _ in benchmarks:
+        if name not in results:
+            continue
+        res = results[name]
+        if 'error' in res:
+            print('{:<16}failed: {}'.format(name, res['error']))
+            continue
+        print(row.format(name,
+                         res['items'],
+                         '{:.3f}'.format(res['total']),
+                         '{:.2f}'.format(res['total'] / res['items'] * 1000),
+                         history.change(results, previous, name, 'total')))
+
+
+def main():
+
+    names = [name for name, _ in benchmarks]
+
+    parser = argparse.ArgumentParser(
+        description="Lytro Power Tools benchmark suite")
+    parser.add_argument('-b', '--benchmark', action='append', choices=names,
+                        dest='benchmarks', help="run only the given one(s)")
+    parser.add_argument('-n', '--files', type=int, default=50,
+                        help="files (or generator steps) per benchmark")
+    parser.add_argument('--frames', type=int, default=1,
+                        help="frames per synthetic LFP")
+    parser.add_argument('--metadata-size', type=int, default=4096,
+                        help="public metadata bytes per synthetic frame")
+    parser.add_argument('--blob-size', type=int, default=1 << 20,
+                        help="raw image bytes per synthetic frame")
+    parser.add_argument('--latency', type=float, default=.05,
+                        help="stub TNT seconds per invocation")
+    parser.add_argument('-P', '--processors', type=int, default=1,
+                        help="processors for search and lfptool runs")
+    parser.add_argument('--verbose', action='store_true',
+                        help="show tool output")
+    parser.add_argument('-o', '--output',
+                        default=history.default_path('suite'),
+                        help="json history file results are appended to")
+    args = parser.parse_args()
+
+    params = dict(files=args.files,
+                  frames=args.frames,
+                  metadata_size=args.metadata_size,
+                  blob_size=args.blob_size,
+                  latency=args.latency,
+                  processors=args.processors)
+
+    results = {}
+    for name, func in benchmarks:
+        if args.benchmarks and name not in args.benchmarks:
+            continue
+        # one benchmark that can not run here (e.g. the web API config is
+        # OS X and Windows only) must not cost the results of the others
+        try:
+            results[name] = func(args)
+        except Exception as e:
+            results[name] = dict(error='{}: {}'.format(type(e).__name__, e))
+
+    runs = history.load(args.output)
+    report(results, history.previous(runs, **params))
+    history.save(args.output, runs, results, **params)
+
+
+if __name__ == '__main__':
+    main()
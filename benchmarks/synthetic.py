@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - benchmarks - synthetic LFP containers"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# writes LFP/LFR containers that lpt.lfp.lfp.Lfp reads like camera files:
+# the real file/master/chunk magic numbers and header/blob struct layout,
+# a master picture blob referencing per-frame public metadata, private
+# metadata and raw image blobs by sha1; metadata padding, frame count and
+# image blob size are configurable so parsing cost can be scaled
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+dir_benchmarks = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_benchmarks, '..'))
+sys.path.insert(0, dir_root)
+
+from lpt.lfp.lfp import Lfp
+
+file_magic = Lfp._file_magic_number
+master_magic = Lfp._master_magic_number
+chunk_magic = Lfp._chunk_magic_number
+header_struct = Lfp._header_struct
+blob_struct = Lfp._blob_struct
+alignment = Lfp._alignment
+
+
+def _ref(data):
+    return 'sha1-' + hashlib.sha1(data).hexdigest()
+
+
+def _blob(magic, data):
+    """:return: `tuple`, (sha1 reference, packed and aligned blob)"""
+
+    ref = _ref(data)
+    packed = blob_struct.pack(magic, len(data), ref) + data
+    packed += '\x00' * (-len(packed) % alignment)
+    return ref, packed
+
+
+def _json(obj):
+    return json.dumps(obj, sort_keys=True)
+
+
+def lfp_data(frames=1, metadata_size=4096, blob_size=1 << 20, width=3280,
+             height=3280, serial='B5150000000', bits=10, endianness=None,
+             raw=None):
+    """builds a synthetic LFP container
+
+    :param frames: `int`, number of frames (raw image + metadata per frame)
+    :param metadata_size: `int`, approximate bytes of public metadata per
+                          frame
+    :param blob_size: `int`, raw image blob bytes per frame; 0 omits the raw
+                      image (no ``imageRef``, i.e. not a raw LFP)
+    :param width: `int`, raw image width recorded in the metadata
+    :param height: `int`, raw image height recorded in the metadata
+    :param serial: `str`, camera serial number recorded in the metadata
+    :param bits: `int`, sensor bits per pixel recorded in the metadata
+    :param endianness: `str`, pixel packing endianness recorded in the
+                       metadata, None to leave the packing out
+    :param raw: `str`, raw image blob of every frame instead of random
+                `blob_size` bytes
+    :return: `str`, container bytes
+    """
+
+    chunks = []
+    frame_refs = []
+
+    for i in range(frames):
+
+        public = {'camera': {'make': 'Lytro, Inc.', 'model': 'ILLUM'},
+                  'image': {'width': width,
+                            'height': height,
+                            'orientation': 1,
+                            'representation': 'rawPacked'},
+                  'devices': {'sensor': {'bitsPerPixel': bits}},
+                  'generator': {'frame': i, 'padding': ''}}
+
+        if endianness:
+            packing = {'bitsPerPixel': bits, 'endianness': endianness}
+            public['image']['rawDetails'] = {'pixelPacking': packing}
+
+        pad = metadata_size - len(_json(public))
+        public['generator']['padding'] = 'x' * max(pad, 0)
+
+        private = {'camera': {'serialNumber': serial},
+                   'devices': {'sensor': {'sensorSerial': serial + '0'}}}
+
+        frame = {}
+        ref, chunk = _blob(chunk_magic, _json(public))
+        frame['metadataRef'] = ref
+        chunks.append(chunk)
+
+        ref, chunk = _blob(chunk_magic, _json(private))
+        frame['privateMetadataRef'] = ref
+        chunks.append(chunk)
+
+        image = raw
+        if image is None and blob_size:
+            # leading NUL keeps the json decoder from reading a number
+            image = '\x00' + os.urandom(16) * (blob_size // 16)
+            image = image[:blob_size]
+
+        if image is not None:
+            ref, chunk = _blob(chunk_magic, image)
+            frame['imageRef'] = ref
+            chunks.append(chunk)
+
+        frame_refs.append({'frame': frame})
+
+    picture = {'frames': frame_refs,
+               'views': [],
+               'generator': 'lpt benchmarks'}
+
+    _, master = _blob(master_magic, _json(picture))
+    header = header_struct.pack(file_magic, 1, 0)
+
+    return header + master + ''.join(chunks)
+
+
+def write_lfp(path, **kwargs):
+    """writes a synthetic LFP container to `path`
+
+    :param path: `str`, output file (``.lfp``/``.lfr`` to be searchable)
+    :param kwargs: `dict`, passed to `lfp_data`
+    :return: `str`, `path`
+    """
+
+    with open(path, 'wb') as f:
+        f.write(lfp_data(**kwargs))
+    return path
+
+
+def write_shoot(dir_out, count, ext='lfr', **kwargs):
+    """writes `count` containers named like camera files (IMG_0001.lfr ...)
+
+    all files share one generated container, so large shoots are cheap
+
+    :param dir_out: `str`, output directory, created if missing
+    :param count: `int`, number of files
+    :param ext: `str`, file extension
+    :param kwargs: `dict`, passed to `lfp_data`
+    :return: `list`, written paths
+    """
+
+    if not os.path.exists(dir_out):
+        os.makedirs(dir_out)
+
+    data = lfp_data(**kwargs)
+    paths = []
+
+    for i in range(1, count + 1):
+        path = os.path.join(dir_out, 'IMG_{:04d}.{}'.format(i, ext))
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths.append(path)
+
+    return paths
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="write synthetic LFP/LFR containers")
+    parser.add_argument('dir_out', help="output directory")
+    parser.add_argument('-n', '--count', type=int, default=10,
+                        help="number of files")
+    parser.add_argument('--ext', default='lfr', choices=['lfp', 'lfr'],
+                        help="file extension")
+    parser.add_argument('--frames', type=int, default=1,
+                        help="frames per file")
+    parser.add_argument('--metadata-size', type=int, default=4096,
+                        help="public metadata bytes per frame")
+    parser.add_argument('--blob-size', type=int, default=1 << 20,
+                        help="raw image bytes per frame (0: no raw image)")
+    args = parser.parse_args()
+
+    paths = write_shoot(args.dir_out, args.count, ext=args.ext,
+                        frames=args.frames,
+                        metadata_size=args.metadata_size,
+                        blob_size=args.blob_size)
+
+    print("{} files written to {}".format(len(paths), args.dir_out))
+
+
+if __name__ == '__main__':
+    main()
@@ -39,10 +39,28 @@ except ImportError:
 
 from lpt.camera import camerabin
 from lpt.camera import builder
+from lpt.utils.profutils import profile
 
 bld = builder.Build()
 cam = camerabin.CameraControls()
 
+
+#Acts like --version: runs as soon as it is parsed so no sub command is needed
+class GetAll(argparse.Action):
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        cam.handle_if_adb_not_running()
+        cam.init(False)
+        state = cam.get_all(True)
+        width = max(len(label) for label in state)
+        print "\n"
+        for label, value in state.items():
+            print "{label} ---> {value}".format(label=label.ljust(width), value=value)
+        print ""
+        cam.disable_virtual_cable(True)
+        parser.exit()
+
+
 parser = argparse.ArgumentParser(epilog='Control',
                                  description="LYTRO DEVELOPER KIT CAMERA TOOL \nsee help on "
                                              "individual sub commands for details",
@@ -54,6 +72,15 @@ parser.add_argument("-v",
                     dest="verbose",
                     action='store_true',
                     help="increase output verbosity")
+parser.add_argument("--get-all",
+                    nargs=0,
+                    action=GetAll,
+                    help="print the whole camera configuration (read in a single round trip)")
+parser.add_argument("--profile",
+                    default=None,
+                    dest="profile",
+                    metavar="DIR",
+                    help="profile the command with cProfile; pstats files are written to DIR")
 
 subparser = parser.add_subparsers()
 
@@ -1201,7 +1228,8 @@ def main():
     except AttributeError:
         pass
 
-    args.func(args)
+    with profile(args.profile, __prog__):
+        args.func(args)
 
     cam.disable_virtual_cable(True)
 
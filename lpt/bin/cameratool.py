@@ -32,14 +32,36 @@ except ImportError:
     import lpt
 
 from lpt.camera import builder
+from lpt.camera import devices
+from lpt.utils.profutils import profile
 import functools
 import textwrap
+import copy
 
 
 def main():
 
     bld = builder.Build()
 
+    bld.parser.add_argument("-s", "--serial",
+                            action="append",
+                            default=None,
+                            dest="serials",
+                            metavar=" ",
+                            help="serial number of the camera to use; repeat to drive several cameras at once")
+
+    bld.parser.add_argument("--all-devices",
+                            action="store_true",
+                            default=False,
+                            dest="all_devices",
+                            help="run the command on every attached camera at once")
+
+    bld.parser.add_argument("--profile",
+                            default=None,
+                            dest="profile",
+                            metavar="DIR",
+                            help="profile the command with cProfile; pstats files are written to DIR")
+
     subparsers = bld.parser.add_subparsers()
 
     ''' CAPTURES '''
@@ -291,7 +313,35 @@ def main():
                                    dest="dwl_all",
                                    help="import all pictures as opposed to only the pictures captured in latest run.")
 
-    p_import_pictures.set_defaults(func=bld.cam.download_images)
+    p_import_pictures.add_argument("--jobs",
+                                   type=functools.partial(bld.check_range, arg_range=(1, 8), arg_name='Jobs'),
+                                   default=3,
+                                   dest="jobs",
+                                   metavar=" ",
+                                   help="Number of concurrent transfers (1 to 8)")
+
+    p_import_pictures.add_argument("--render",
+                                   action="store_true",
+                                   default=False,
+                                   dest="render",
+                                   help="render a preview image of each picture as soon as it is downloaded")
+
+    p_import_pictures.add_argument("--render-jobs",
+                                   type=functools.partial(bld.check_range, arg_range=(1, 8), arg_name='Render jobs'),
+                                   default=1,
+                                   dest="render_jobs",
+                                   metavar=" ",
+                                   help="Number of concurrent renders when using --render (1 to 8)")
+
+    p_import_pictures.add_argument("--imagerep",
+                                   type=str,
+                                   default=None,
+                                   choices=('bmp', 'exr', 'jpeg', 'png', 'tiff'),
+                                   dest="imagerep",
+                                   metavar=" ",
+                                   help="Image representation of rendered previews: bmp, exr, jpeg, png or tiff")
+
+    p_import_pictures.set_defaults(func=bld.download_images)
 
 
     ''' DELETE_ALL_PICTURES '''
@@ -302,32 +352,70 @@ def main():
 
     args = bld.parser.parse_args()
 
-    bld.cam.handle_if_adb_not_running()
+    serials = args.serials or []
+    with profile(args.profile, __prog__):
+        if args.all_devices or len(serials) > 1:
+            run_on_devices(bld, args, serials)
+        else:
+            if serials:
+                device_bld = builder.Build(serials[0])
+            else:
+                device_bld = bld
+            device_bld.cam.handle_if_adb_not_running()
+            run_on(bld, device_bld, args)
+
+
+#Bound methods in args.func belong to the parser's Build; look the same method up on the
+#Build (or its CameraControls) that drives the requested camera.
+def run_on(bld, device_bld, args):
 
     #Check FOCUS SWEEP values
     try:
         #If user did not specify focus range than use current min and max as focus range
         if not args.focus_range:
-            bld.cam.init(False)
-            args.focus_range = tuple(bld.cam.get_valid_focus_range())
+            device_bld.cam.init(False)
+            args.focus_range = tuple(device_bld.cam.get_valid_focus_range())
         else:
             lowest_focus = args.focus_range[0]
             highest_focus = args.focus_range[1]
-            bld.cam.init(False)
-            valid_focus_range = tuple(bld.cam.get_valid_focus_range())
-            bld.check_range(lowest_focus, valid_focus_range, "Focus step")
-            bld.check_range(highest_focus, valid_focus_range, "Focus step")
-            bld.check_range(args.pictures, tuple([1, highest_focus - lowest_focus]), "Picture count")
+            device_bld.cam.init(False)
+            valid_focus_range = tuple(device_bld.cam.get_valid_focus_range())
+            device_bld.check_range(lowest_focus, valid_focus_range, "Focus step")
+            device_bld.check_range(highest_focus, valid_focus_range, "Focus step")
+            device_bld.check_range(args.pictures, tuple([1, highest_focus - lowest_focus]), "Picture count")
     except AttributeError:
         pass
 
     #Check CONT CAPTURES values
     try:
-        bld.check_range(args.capture_size, tuple([1, 8]), "Consecutive captures")
+        device_bld.check_range(args.capture_size, tuple([1, 8]), "Consecutive captures")
     except AttributeError:
         pass
 
-    args.func(args)
+    if args.func.__self__ is bld.cam:
+        func = getattr(device_bld.cam, args.func.__name__)
+    else:
+        func = getattr(device_bld, args.func.__name__)
+    func(args)
+
+
+def run_on_devices(bld, args, serials):
+    manager = devices.DeviceManager()
+    manager.bind(serials if not args.all_devices else None)
+    if not manager.devices:
+        print "\nERROR: No cameras found. Make sure ADB is activated on every camera\n"
+        sys.exit()
+
+    def job(serial, device_bld):
+        #Scripts mutate their arguments, so every camera gets its own copy
+        device_args = copy.copy(args)
+        device_bld.cam.handle_if_adb_not_running()
+        #Keep each camera's pictures apart
+        if hasattr(device_args, 'dwl_all'):
+            device_args.path = os.path.join(args.path, serial)
+        run_on(bld, device_bld, device_args)
+
+    manager.run(job)
 
 
 if __name__ == "__main__":
@@ -37,6 +37,8 @@ from lpt.lfp.cmds import Cmds
 from lpt.lfp.tnt import Tnt
 from lpt.utils.argutils import ArgumentParser
 from lpt.utils.argutils import ArgUtils
+from lpt.utils.profutils import profile
+from lpt.utils.traceutils import trace
 from lpt.utils.utils import Utils
 
 __prog__ = 'lfptool'
@@ -49,8 +51,14 @@ argutils = ArgUtils()
 arg_parser = ArgParser()
 
 
-def build():
-    """build function and arguments for LFP Tool"""
+def make_parser(argv=None):
+    """builds the LFP Tool argument parser
+
+    :param argv: `list`, command line the parser is for (sub command
+                 arguments are only built for the invoked sub command),
+                 default ``sys.argv[1:]``
+    :return: `ArgumentParser`
+    """
 
     epilog = "Lytro Power Tools - LightField {} Tool"
     desc = ("process, import, export and metadata operations "
@@ -121,6 +129,28 @@ def build():
         view, write, query, and validate metadata from an individual LFP file,
         a list of LFP files, or a directory containing LFP files''')
     four_d_desc = "calculate 4d coordinates (x, y, u, v) for eslf image"
+    manifest_desc = textwrap.dedent('''
+        expand the raw jobs of a JSON manifest (inputs, actions, argument
+        variants and output file templates), drop tasks asked for more than
+        once and run everything as one multiprocessing run; see
+        lpt/lfp/manifest.py for the format''')
+    daemon_desc = textwrap.dedent('''
+        keep worker processes, LFP search results and schema validators warm
+        and run raw, warp and batch requests sent to a Unix socket; a request
+        is a JSON line such as {"argv": ["raw", "-i", "IMG_0001.lfr",
+        "--image-out"]}, answered with JSON status lines until the job ends''')
+    worker_desc = textwrap.dedent('''
+        run the tasks of an lfptool raw/warp/batch --serve coordinator; input
+        and output paths are used as the coordinator gives them, so workers
+        need the same file system view (e.g. a shared mount)''')
+    watch_desc = textwrap.dedent('''
+        process raw LFP files as they are dropped into the watched directories,
+        with the arguments of the raw command; files are processed once their
+        size holds still, and a cursor file keeps them from being processed
+        again, also across restarts, unless they change''')
+    extract_desc = textwrap.dedent('''
+        copy the encoded images and depth maps embedded in packed warp LFP
+        files straight out of the file (no TNT processing)''')
 
     raw = subparsers.add_parser(
         'raw',
@@ -144,6 +174,13 @@ def build():
         epilog=epilog.format('Warp Processing'),
         description=warp_desc)
 
+    extract = subparsers.add_parser(
+        'extract',
+        help="extract embedded images from warp LFP files",
+        formatter_class=argutils.formatter_class(m=48),
+        epilog=epilog.format('Embedded Image Extraction'),
+        description=extract_desc)
+
     four_d = subparsers.add_parser(
         '4d-coord',
         help="calculate 4d coordinates",
@@ -158,24 +195,104 @@ def build():
         formatter_class=argutils.formatter_class(m=48),
         epilog=epilog.format('Info'))
 
-    parser.args_meta(dflt_verbose=config.db['verbose'])
-    arg_parser.arg_src(info)
-    arg_parser.arg_src(warp)
-    raw_in = arg_parser.arg_src(raw)
-    batch_in = arg_parser.arg_src(batch)
+    manifest = subparsers.add_parser(
+        'manifest',
+        help="run the jobs of a JSON job manifest",
+        description=manifest_desc,
+        formatter_class=argutils.formatter_class(m=48),
+        epilog=epilog.format('Job Manifest Processing'))
 
-    arg_parser.builder(batch, input_args=batch_in, mode='batch')
-    arg_parser.builder(raw, input_args=raw_in, mode='raw', add_actions=True)
-    arg_parser.builder(warp, mode='warp', add_actions=True)
+    daemon = subparsers.add_parser(
+        'daemon',
+        help="serve raw/warp/batch requests from warm worker processes",
+        description=daemon_desc,
+        formatter_class=argutils.formatter_class(m=48),
+        epilog=epilog.format('Render Daemon'))
+
+    watch = subparsers.add_parser(
+        'watch',
+        help="process raw LFP files as they appear in watched directories",
+        description=watch_desc,
+        formatter_class=argutils.formatter_class(m=48),
+        epilog=epilog.format('Watch Folder Processing'))
 
-    arg_parser.args_info(info)
-    arg_parser.args_four_d(four_d)
-    arg_parser.args_batch(batch)
+    worker = subparsers.add_parser(
+        'worker',
+        help="run tasks served by a remote lfptool coordinator",
+        description=worker_desc,
+        formatter_class=argutils.formatter_class(m=48),
+        epilog=epilog.format('Remote Worker'))
+
+    parser.args_meta(dflt_verbose=config.db['verbose'])
 
-    arg_parser.arg_multiprocessing(raw)
-    arg_parser.arg_multiprocessing(batch)
-    arg_parser.arg_multiprocessing(warp)
-    arg_parser.arg_multiprocessing(info)
+    # only the invoked sub command gets its arguments built; the others are
+    # left as bare parsers, enough for top-level help and dispatch
+    command = parser.invoked(('raw', 'batch', 'warp', 'extract', '4d-coord',
+                              'info', 'manifest', 'worker', 'daemon',
+                              'watch'),
+                             argv)
+
+    if command == 'info':
+        arg_parser.arg_src(info)
+        arg_parser.args_info(info)
+        arg_parser.arg_multiprocessing(info)
+
+    elif command == 'warp':
+        arg_parser.arg_src(warp)
+        arg_parser.builder(warp, mode='warp', add_actions=True)
+        arg_parser.arg_multiprocessing(warp)
+        arg_parser.arg_schedule(warp)
+        arg_parser.arg_serve(warp)
+
+    elif command == 'raw':
+        raw_in = arg_parser.arg_src(raw)
+        arg_parser.builder(raw, input_args=raw_in, mode='raw',
+                           add_actions=True)
+        arg_parser.args_plan(raw)
+        arg_parser.args_focus_sweep(raw)
+        arg_parser.arg_multiprocessing(raw)
+        arg_parser.arg_schedule(raw)
+        arg_parser.arg_serve(raw)
+
+    elif command == 'batch':
+        batch_in = arg_parser.arg_src(batch)
+        arg_parser.builder(batch, input_args=batch_in, mode='batch')
+        arg_parser.args_batch(batch)
+        arg_parser.arg_multiprocessing(batch)
+        arg_parser.arg_schedule(batch)
+        arg_parser.arg_serve(batch)
+
+    elif command == 'extract':
+        arg_parser.arg_src(extract)
+        arg_parser.args_extract(extract)
+        arg_parser.arg_multiprocessing(extract)
+        arg_parser.arg_schedule(extract)
+
+    elif command == '4d-coord':
+        arg_parser.args_four_d(four_d)
+
+    elif command == 'manifest':
+        arg_parser.args_manifest(manifest)
+        arg_parser.arg_multiprocessing(manifest)
+        arg_parser.arg_schedule(manifest)
+        arg_parser.arg_serve(manifest)
+
+    elif command == 'worker':
+        arg_parser.args_worker(worker)
+
+    elif command == 'daemon':
+        arg_parser.args_daemon(daemon)
+        arg_parser.arg_multiprocessing(daemon)
+
+    elif command == 'watch':
+        watch_in = arg_parser.arg_src(watch)
+        arg_parser.builder(watch, input_args=watch_in, mode='raw',
+                           add_actions=True)
+        arg_parser.args_plan(watch)
+        arg_parser.args_focus_sweep(watch)
+        arg_parser.args_watch(watch)
+        arg_parser.arg_multiprocessing(watch)
+        arg_parser.arg_schedule(watch)
 
     raw.set_defaults(
         func=cmds.raw,
@@ -191,6 +308,10 @@ def build():
         warp_action='pack',
         print_help=warp.print_help)
 
+    extract.set_defaults(
+        func=cmds.extract,
+        print_help=extract.print_help)
+
     four_d.set_defaults(
         func=cmds.four_d,
         print_help=four_d.print_help)
@@ -199,10 +320,38 @@ def build():
         func=cmds.batch,
         print_help=batch.print_help)
 
-    args = parser.parse_args()
+    worker.set_defaults(
+        func=cmds.worker,
+        print_help=worker.print_help)
+
+    manifest.set_defaults(
+        func=cmds.manifest,
+        print_help=manifest.print_help)
+
+    watch.set_defaults(
+        func=cmds.watch,
+        print_help=watch.print_help,
+        raw_action='unpack')
+
+    daemon.set_defaults(
+        func=cmds.daemon,
+        make_parser=make_parser,
+        print_help=daemon.print_help)
+
+    return parser
+
+
+def build():
+    """build function and arguments for LFP Tool"""
+
+    args = make_parser().parse_args()
     cmds.debug = args.debug
     cmds.verbose = args.verbose
-    args.func(args)
+    cmds.schedule = getattr(args, 'schedule', cmds.schedule)
+    cmds.serve = getattr(args, 'serve', None)
+
+    with profile(args.profile, __prog__), trace(args.trace, __prog__):
+        args.func(args)
 
 
 if __name__ == '__main__':
@@ -32,9 +32,10 @@ except ImportError:
 from lpt.recipe import config
 from lpt.recipe.argparser import ArgParser
 from lpt.recipe.cmds import Cmds
-from lpt.recipe.params import Params
 from lpt.utils.argutils import ArgUtils
 from lpt.utils.argutils import ArgumentParser
+from lpt.utils.profutils import profile
+from lpt.utils.traceutils import trace
 from lpt.utils.utils import Utils
 
 __prog__ = 'recipetool'
@@ -42,7 +43,6 @@ __version__ = '1.0.1'
 
 cmds = Cmds()
 utils = Utils()
-params = Params()
 argutils = ArgUtils()
 arg_parser = ArgParser()
 
@@ -124,56 +124,61 @@ def build():
             description=view_desc,
             formatter_class=argutils.formatter_class(m=48))
 
-    arg_parser.arg_animation_store_true(destroy)
-    arg_parser.args_store(info, info=True)
-
-    arg_parser.arg_recipe_out(new)
-    arg_parser.arg_recipe_out(merge)
-
-    arg_parser.arg_recipe_in(view)
-    arg_parser.arg_recipe_in(destroy)
-    arg_parser.arg_recipe_in(info)
-    arg_parser.arg_recipe_in(plot)
-    arg_parser.arg_recipe_in(validate)
-
-    arg_parser.arg_destroy_all(destroy)
-
-    param_dests = params.dests(
-            cls=True,
-            enabled=True,
-            exclude=('priorities',),
-            grouped=True)
-
-    destroy_groups = {}
-    info_groups = {}
-    merge_groups = {}
-    plot_groups = {}
-
-    for group, dests in param_dests.items():
+    param_table = arg_parser.param_table
+    primary = ('destroy', 'info', 'merge', 'new', 'plot', 'validate', 'view')
+    param_cmds = [k for props in param_table.values() for k, _, _ in props]
+    command = parser.invoked(primary + tuple(param_cmds))
+
+    # only the invoked sub command gets its arguments; the rest are already
+    # registered above (or below, as bare name and help line per view
+    # parameter) which is all the top-level help and dispatch need
+
+    if command == 'destroy':
+        arg_parser.arg_animation_store_true(destroy)
+        arg_parser.arg_recipe_in(destroy)
+        arg_parser.arg_destroy_all(destroy)
+    elif command == 'info':
+        arg_parser.args_store(info, info=True)
+        arg_parser.arg_recipe_in(info)
+    elif command == 'new':
+        arg_parser.arg_recipe_out(new, processors=True)
+    elif command == 'merge':
+        arg_parser.arg_recipe_out(merge)
+    elif command == 'plot':
+        arg_parser.arg_recipe_in(plot, processors=False)
+    elif command == 'validate':
+        arg_parser.arg_recipe_in(validate)
+    elif command == 'view':
+        arg_parser.arg_recipe_in(view)
+
+    groups = {}
+
+    for group, props in param_table.items():
 
         blank()
         blank(group)
-        view_group = view.add_argument_group(group)
-
-        destroy_groups[group] = []
-        info_groups[group] = []
-        merge_groups[group] = []
-        plot_groups[group] = []
-
-        for dest in dests:
-
-            prop = getattr(params, dest)
-            arg_parser.add_parser(prop, subparsers, view_group)
-            destroy_groups[group].append(prop)
-            info_groups[group].append(prop)
-            merge_groups[group].append(prop)
-            plot_groups[group].append(prop)
-
-    arg_parser.args_view_store_true(destroy, destroy_groups)
-    arg_parser.args_view_store_true(info, info_groups)
-    arg_parser.args_view_store_true(plot, plot_groups)
-    arg_parser.args_merge(merge, merge_groups)
-    arg_parser.args_plot(plot)
+        groups[group] = [prop for _, _, prop in props]
+
+        if command == 'view':
+            view_group = view.add_argument_group(group)
+            for _, _, prop in props:
+                arg_parser.add_view_argument(prop, view_group)
+
+        for key_parser, help_, prop in props:
+            if command == key_parser:
+                arg_parser.add_parser(prop, subparsers)
+            else:
+                subparsers.add_parser(key_parser, help=help_)
+
+    if command == 'destroy':
+        arg_parser.args_view_store_true(destroy, groups)
+    elif command == 'info':
+        arg_parser.args_view_store_true(info, groups)
+    elif command == 'plot':
+        arg_parser.args_view_store_true(plot, groups)
+        arg_parser.args_plot(plot)
+    elif command == 'merge':
+        arg_parser.args_merge(merge, groups)
 
     parser.set_defaults(print_help=parser.print_help)
 
@@ -211,7 +216,9 @@ def build():
             print_help=validate.print_help)
 
     args = parser.parse_args()
-    args.func(args)
+
+    with profile(args.profile, __prog__), trace(args.trace, __prog__):
+        args.func(args)
 
 
 if __name__ == '__main__':
@@ -38,6 +38,8 @@ from lpt.utils.argutils import ArgumentParser
 from lpt.utils.argutils import ArgUtils
 from lpt.utils.msgutils import MsgUtils
 from lpt.utils.msgutils import ToolError
+from lpt.utils.profutils import profile
+from lpt.utils.traceutils import trace
 from lpt.utils.utils import Utils
 from lpt.web import config
 from lpt.web.cmds import Cmds
@@ -484,7 +486,8 @@ def build():
     if args.debug:
         pprint.pprint(vars(args))
 
-    args.func(args)
+    with profile(args.profile, __prog__), trace(args.trace, __prog__):
+        args.func(args)
 
 
 if __name__ == '__main__':
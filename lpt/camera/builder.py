@@ -42,15 +42,16 @@ import shlex
 
 class Build:
 
-    def __init__(self):
+    def __init__(self, serial=None, adb_bin="adb"):
 
-        self.cam = camerabin.CameraControls()
+        self.cam = camerabin.CameraControls(serial, adb_bin)
 
         self.dwl_and_del_string = "Deletes ALL pictures from camera after import is complete"
 
         self.dwl_string = "Downloads images to the local file system'"
 
-        self.adb = "adb shell "
+        self.adb = self.cam.adb
+        self.adb_bin = " ".join(self.cam.adb_cmd)
 
         self.epilog = "Lytro Developer Kit Camera {} Tool"
 
@@ -80,8 +81,10 @@ class Build:
             self.cal_data_path = abspath(profile, 'AppData\Local\Lytro')
             self.currentDir = os.getcwd().replace(r"\\", r"\\\\")
 
+        #Other POSIX systems (e.g. Linux hosts) keep the Lytro data in the XDG config home
         else:
-            raise OSError("unsupported operating system: " + sys.platform)
+            self.cal_data_path = camerabin.lytro_home()
+            self.currentDir = os.getcwd()
 
 
     def check_min_value(self, x, subparser_caller):
@@ -164,7 +167,7 @@ class Build:
 
     def push_args_to_camera(self, args):
         json_obj = json.dumps(args)
-        os.system("adb push {} storage/sdcard1/".format(json_obj))
+        os.system("{adb} push {json} storage/sdcard1/".format(adb=self.adb_bin, json=json_obj))
 
     def setup_captures_script(self, args):
         #Convert from namespace object to dictionary
@@ -274,6 +277,23 @@ class Build:
         self.launch_scripts()
 
 
+    def download_images(self, args):
+        if not getattr(args, 'render', False):
+            self.cam.download_images(args)
+            return
+        #Only pull in the lfp processing package when rendering was asked for
+        from lpt.camera import pipeline
+        render = pipeline.RenderPipeline(jobs=args.render_jobs, imagerep=args.imagerep, verbose=self.cam.verbose)
+        render.start()
+        try:
+            self.cam.download_images(args, on_pulled=render.submit)
+        finally:
+            rendered, failed = render.finish()
+        print "\nRendered {count} picture(s) in {secs:.1f}s".format(count=len(rendered), secs=render.elapsed())
+        if failed:
+            print "\nFailed to render: {}".format(", ".join(failed))
+
+
     def send_command(self, cmd):
         out = subprocess.Popen(shlex.split(self.adb + cmd), stdout=subprocess.PIPE)
         #makes previous call blocking
@@ -294,7 +314,7 @@ class Build:
             sys.exit()
 
     def log_to_json(self, dict):
-        json_file = os.path.join(self.real_path, "args.json")
+        json_file = self.cam.args_json
         with open(json_file, "w") as json_file:
             json.dump(dict, json_file, indent=4)
             json_file.close()
@@ -302,31 +322,35 @@ class Build:
     def push_files_to_sdcard(self):
         sdcard_path = 'storage/sdcard1'
         print "\nPush 'args.json' to {}".format(sdcard_path)
-        os.system("adb push {source} {dest}".format(source=os.path.join(self.real_path, "args.json"), dest=sdcard_path))
+        os.system("{adb} push {source} {dest}".format(adb=self.adb_bin, source=self.cam.args_json,
+                                                      dest=sdcard_path + "/args.json"))
         time.sleep(.5)
         print "\nPush 'run.py' to {}".format(sdcard_path)
-        os.system("adb push {source} {dest}".format(source=os.path.join(self.real_path, "run.py"), dest=sdcard_path))
+        os.system("{adb} push {source} {dest}".format(adb=self.adb_bin, source=os.path.join(self.real_path, "run.py"),
+                                                      dest=sdcard_path))
         time.sleep(.5)
         print "\nPush 'camerabin.py' to {}".format(sdcard_path)
-        os.system("adb push {source} {dest}".format(source=os.path.join(self.real_path, "camerabin.py"),
-                                                    dest=sdcard_path))
+        os.system("{adb} push {source} {dest}".format(adb=self.adb_bin,
+                                                      source=os.path.join(self.real_path, "camerabin.py"),
+                                                      dest=sdcard_path))
         time.sleep(.5)
         print "\nPush '__init__.py' to {}".format(sdcard_path)
-        os.system("adb push {source} {dest}".format(source=os.path.join(self.real_path, "__init__.py"),
-                                                    dest=sdcard_path))
+        os.system("{adb} push {source} {dest}".format(adb=self.adb_bin,
+                                                      source=os.path.join(self.real_path, "__init__.py"),
+                                                      dest=sdcard_path))
         time.sleep(.5)
 
 
     def launch_scripts(self):
         # Button combination press to start scripts.
-        os.system("adb shell sendevent /dev/input/event2 1 557 1")
-        os.system("adb shell sendevent /dev/input/event2 0 0 0")
+        os.system(self.adb + "sendevent /dev/input/event2 1 557 1")
+        os.system(self.adb + "sendevent /dev/input/event2 0 0 0")
         time.sleep(.5)
-        os.system("adb shell sendevent /dev/input/event2 1 559 1")
-        os.system("adb shell sendevent /dev/input/event2 0 0 0")
+        os.system(self.adb + "sendevent /dev/input/event2 1 559 1")
+        os.system(self.adb + "sendevent /dev/input/event2 0 0 0")
         time.sleep(4)
-        os.system("adb shell sendevent /dev/input/event2 1 557 0")
-        os.system("adb shell sendevent /dev/input/event2 0 0 0")
-        os.system("adb shell sendevent /dev/input/event2 1 559 0")
-        os.system("adb shell sendevent /dev/input/event2 0 0 0")
+        os.system(self.adb + "sendevent /dev/input/event2 1 557 0")
+        os.system(self.adb + "sendevent /dev/input/event2 0 0 0")
+        os.system(self.adb + "sendevent /dev/input/event2 1 559 0")
+        os.system(self.adb + "sendevent /dev/input/event2 0 0 0")
         print "\nYou can now disconnect USB cable and press start on camera display to begin \n"
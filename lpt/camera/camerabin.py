@@ -26,30 +26,489 @@ import sys
 import re
 import signal
 import functools
+import atexit
+import uuid
+import hashlib
+import posixpath
+import threading
+import Queue
+import collections
+
+
+#Keeps a single 'adb shell' pipe open so commands don't pay for a new process each time.
+#Every command is followed by an echo of a unique sentinel and its exit status, which is
+#how replies are split apart when several commands are written to the pipe at once.
+class AdbShell:
+
+    def __init__(self, shell_cmd=("adb", "shell")):
+        self.shell_cmd = list(shell_cmd)
+        self.sentinel = "__LPT_{}__".format(uuid.uuid4().hex)
+        self.sentinel_re = re.compile(r'{}(-?\d+)\s*$'.format(self.sentinel))
+        self.proc = None
+
+    def is_open(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def open(self):
+        if self.is_open():
+            return
+        self.proc = subprocess.Popen(self.shell_cmd,
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT,
+                                     bufsize=0)
+        #adb shell runs on a PTY: keep the device side from echoing our input back and from
+        #printing a prompt, either of which would end up at the front of the next reply
+        self.run("stty -echo 2>/dev/null; PS1=''")
+
+    def close(self):
+        if not self.is_open():
+            self.proc = None
+            return
+        try:
+            self.proc.stdin.write("exit\n")
+            self.proc.stdin.close()
+            self.proc.wait()
+        except (IOError, OSError):
+            self.proc.kill()
+        self.proc = None
+
+    def _write(self, cmd):
+        self.proc.stdin.write("{cmd}; echo {sentinel}$?\n".format(cmd=cmd, sentinel=self.sentinel))
+
+    def _read_reply(self):
+        lines = []
+        while True:
+            line = self.proc.stdout.readline()
+            if not line:
+                raise IOError("adb shell session closed unexpectedly")
+            match = self.sentinel_re.search(line)
+            if match:
+                #Output not ending in a newline shares a line with the sentinel
+                head = line[:match.start()]
+                if head:
+                    lines.append(head)
+                return "".join(lines).replace("\r", ""), int(match.group(1))
+            lines.append(line)
+
+    #Runs a single command and returns (output, exit_status)
+    def run(self, cmd):
+        return self.pipeline([cmd])[0]
+
+    #Writes every command before reading any reply, so the whole batch costs one round trip
+    def pipeline(self, cmds):
+        self.open()
+        for cmd in cmds:
+            self._write(cmd)
+        self.proc.stdin.flush()
+        return [self._read_reply() for cmd in cmds]
+
+
+#os.rename won't replace an existing file on Windows
+def replace_file(source, dest):
+    if sys.platform == 'win32' and os.path.exists(dest):
+        os.remove(dest)
+    os.rename(source, dest)
+
+
+#Per-user folder for what the tools learn about a camera (same place the Lytro desktop app uses)
+def lytro_home():
+    if sys.platform == 'darwin':
+        return os.path.join(os.getenv('HOME'), 'Library', 'Application Support', 'Lytro')
+    elif sys.platform == 'win32':
+        return os.path.join(os.getenv('USERPROFILE'), 'AppData', 'Local', 'Lytro')
+    return os.path.join(os.getenv('XDG_CONFIG_HOME') or os.path.expanduser('~/.config'), 'lytro')
+
+
+def md5_file(path, block_size=1 << 20):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), ''):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+#Incremental copy of the camera's DCF folder. A manifest kept in the download root records
+#what has already been transferred (name, size, mtime, md5) so reruns only pull new pictures.
+#Pulls run on a few threads, land under a '.part' name and are renamed once their size and md5
+#match the copy on the camera (size only if the camera's shell has no md5 tool).
+class DcfSync:
+
+    manifest_name = ".lpt_manifest.json"
+
+    def __init__(self, root, adb=("adb",), jobs=3, verbose=False):
+        self.root = root
+        self.adb = list(adb)
+        self.jobs = max(int(jobs), 1)
+        self.verbose = verbose
+        self.manifest_path = os.path.join(root, self.manifest_name)
+        self.manifest = self.load_manifest()
+        self.lock = threading.Lock()
+        self.in_flight = set()
+        self.cancelled = False
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as manifest_json:
+                return json.loads(manifest_json.read())
+        except (IOError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        tmp_path = self.manifest_path + ".part"
+        with open(tmp_path, 'w') as manifest_json:
+            manifest_json.write(json.dumps(self.manifest, indent=2, sort_keys=True))
+        replace_file(tmp_path, self.manifest_path)
+
+    #Returns a list of {'name', 'size', 'mtime'} parsed from a single 'ls -l' of the DCF folder
+    def list_remote(self, dcf_path):
+        output = subprocess.check_output(self.adb + ['shell', 'ls', '-l', dcf_path])
+        entries = []
+        for line in output.splitlines():
+            match = re.search(r'\s(\d+)\s+(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2})\s+(\S+)\s*$', line)
+            if match:
+                entries.append({'name': match.group(3),
+                                'size': int(match.group(1)),
+                                'mtime': match.group(2)})
+        return entries
+
+    def is_synced(self, entry):
+        record = self.manifest.get(entry['name'])
+        if not record or record['size'] != entry['size'] or record['mtime'] != entry['mtime']:
+            return False
+        return os.path.exists(record['path']) and os.path.getsize(record['path']) == entry['size']
+
+    def pending(self, entries):
+        return [entry for entry in entries if not self.is_synced(entry)]
+
+    #md5 of a file computed on the camera, None if neither md5sum nor md5 is available there
+    def remote_md5(self, remote_path):
+        cmd = "md5sum {path} 2>/dev/null || md5 {path} 2>/dev/null".format(path=remote_path)
+        try:
+            output = subprocess.check_output(self.adb + ['shell', cmd])
+        except subprocess.CalledProcessError:
+            return None
+        match = re.search(r'\b([0-9a-fA-F]{32})\b', output)
+        return match.group(1).lower() if match else None
+
+    def pull(self, entry, dcf_path, dest_dir, retries=1):
+        final_path = os.path.join(dest_dir, entry['name'])
+        tmp_path = final_path + ".part"
+        remote_path = posixpath.join(dcf_path, entry['name'])
+        expected = self.remote_md5(remote_path)
+        with self.lock:
+            self.in_flight.add(tmp_path)
+        try:
+            for attempt in range(retries + 1):
+                out = subprocess.Popen(self.adb + ['pull', remote_path, tmp_path],
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                #Make this call blocking
+                output = out.communicate()[0]
+                if self.verbose:
+                    with self.lock:
+                        print output
+                if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) != entry['size']:
+                    continue
+                checksum = md5_file(tmp_path)
+                if expected is None or checksum == expected:
+                    break
+            else:
+                with self.lock:
+                    print "FAILED to verify {}".format(entry['name'])
+                self.remove(tmp_path)
+                return False
+
+            replace_file(tmp_path, final_path)
+        finally:
+            with self.lock:
+                self.in_flight.discard(tmp_path)
+
+        with self.lock:
+            self.manifest[entry['name']] = {'size': entry['size'],
+                                            'mtime': entry['mtime'],
+                                            'md5': checksum,
+                                            'path': os.path.abspath(final_path)}
+            self.save_manifest()
+        return True
+
+    def worker(self, tasks, dcf_path, dest_dir, results, on_pulled=None):
+        while not self.cancelled:
+            try:
+                entry = tasks.get_nowait()
+            except Queue.Empty:
+                return
+            #Print under the lock so the lines of several pull threads do not run together
+            with self.lock:
+                print "downloading {photo} to {path}".format(photo=entry['name'], path=dest_dir)
+            pulled = self.pull(entry, dcf_path, dest_dir)
+            results.append((entry['name'], pulled))
+            if pulled and on_pulled:
+                on_pulled(os.path.join(dest_dir, entry['name']))
+
+    #Pulls the given entries into dest_dir; returns (pulled, failed) lists of names.
+    #on_pulled is called with the local path of every file as soon as it is in place.
+    def sync(self, entries, dcf_path, dest_dir, on_pulled=None):
+        if not entries:
+            return [], []
+        if not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+        tasks = Queue.Queue()
+        for entry in entries:
+            tasks.put(entry)
+        results = []
+        threads = [threading.Thread(target=self.worker, args=(tasks, dcf_path, dest_dir, results, on_pulled))
+                   for i in range(min(self.jobs, len(entries)))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        #Join with a timeout so Ctrl + C still reaches the main thread
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(.2)
+        pulled = [name for name, ok in results if ok]
+        failed = [name for name, ok in results if not ok]
+        return pulled, failed
+
+    #Stops handing out pulls and removes anything half transferred
+    def cancel(self, *args):
+        self.cancelled = True
+        with self.lock:
+            for tmp_path in list(self.in_flight):
+                print "Cancelling import on {}".format(tmp_path[:-len(".part")])
+                self.remove(tmp_path)
+        try:
+            sys.exit(0)
+        except SystemExit:
+            os._exit(0)
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
 
 class CameraControls:
 
-    def __init__(self):
-        self.adb = "adb shell "
+    #serial picks one of several attached cameras ('adb -s <serial>'); None means the only one
+    def __init__(self, serial=None, adb_bin="adb"):
+        self.serial = serial
+        self.adb_cmd = [adb_bin] + (["-s", serial] if serial else [])
+        self.adb = " ".join(self.adb_cmd) + " shell "
         self.prefix = ""
         self.max_real_focus_step = 1308
         self.max_user_focus_step = 1645
         self.max_real_zoom_step = 1043
         self.max_user_zoom_step = 1522
         self.real_path = os.path.dirname(os.path.realpath(__file__))
+        #Each camera gets its own script arguments so several can be driven at once
+        self.args_json = os.path.join(self.real_path, "args_{}.json".format(serial) if serial else "args.json")
         self.verbose = False
+        self.session = AdbShell(self.adb_cmd + ["shell"])
+        atexit.register(self.session.close)
+        #Seconds of fixed sleep replaced by polling vs. seconds actually spent waiting
+        self.wait_budget = 0
+        self.wait_spent = 0
+        #Outputs of the read commands from the last snapshot, dropped on any write
+        self.state = None
+        self.state_time = 0
+        self.state_ttl = 5
+        self.serial_no = None
+        self.focus_ranges_path = os.path.join(lytro_home(), "focus_ranges.json")
+
+    #Every read a getter makes; a snapshot runs them all in one round trip
+    state_cmds = ["model get iso",
+                  "model get shutterSpeed",
+                  "model get exposureMode",
+                  "model get exposureCompensation",
+                  "model get ShutterDriveMode",
+                  "model get SelfTimerEnable",
+                  "model get SelfTimerSeconds",
+                  "model get ExposureBracketEnable",
+                  "model get FocusBracketEnable",
+                  "model get metermode",
+                  "model get FlashSyncMode",
+                  "model get FlashAfAssistEnable",
+                  "model get ExposureFlashCompensation",
+                  "model get BiposLambdaOffset",
+                  "model get FocusRingLock",
+                  "model get ZoomRingLock",
+                  "model get 4",
+                  "model get WhiteBalanceMode",
+                  "model get WhiteBalancePreset",
+                  "model get DepthAssistMode",
+                  "model get InactivityTimeoutSeconds",
+                  "camsettings get Camera.AfDriveMode",
+                  "camsettings get Camera.virtualCable",
+                  "state get shotsremaining",
+                  "diagfsalb -q"]
+
+
+    #Commands prefixed with 'adb shell ' go through the persistent session, anything else
+    #(on-device commands, 'adb pull', 'adb root'...) still gets its own process.
+    def execute(self, cmd):
+        if cmd.startswith(self.adb):
+            try:
+                return self.session.run(cmd[len(self.adb):])[0]
+            except (IOError, OSError):
+                #Session died (cable pulled, adb restarted); fall back to a one-off process
+                self.session.close()
+        return subprocess.check_output(shlex.split(cmd))
 
 
     def send_cmd(self, cmd, sleep=.5):
-        output = subprocess.check_output(shlex.split(cmd))
+        self.invalidate_state()
+        output = self.execute(cmd)
         if self.verbose:
             print output
         time.sleep(sleep)
 
 
+    #Sends a batch of commands in a single round trip when going through adb
+    def send_cmds(self, cmds, sleep=0):
+        self.invalidate_state()
+        if self.prefix == self.adb:
+            try:
+                replies = self.session.pipeline(cmds)
+            except (IOError, OSError):
+                self.session.close()
+                replies = [(subprocess.check_output(shlex.split(self.adb + cmd)), 0) for cmd in cmds]
+            if self.verbose:
+                for output, status in replies:
+                    print output
+        else:
+            for cmd in cmds:
+                self.send_cmd(cmd, 0)
+        time.sleep(sleep)
+
+
+    #Served from the last snapshot while it is fresh, otherwise read from the camera
     def get_output(self, cmd):
-        return subprocess.check_output(shlex.split(self.prefix + cmd))
+        if self.state is not None and cmd in self.state and time.time() - self.state_time < self.state_ttl:
+            return self.state[cmd]
+        return self.execute(self.prefix + cmd)
+
+
+    def get_outputs(self, cmds):
+        if self.prefix == self.adb:
+            try:
+                return [output for output, status in self.session.pipeline(cmds)]
+            except (IOError, OSError):
+                self.session.close()
+        return [self.execute(self.prefix + cmd) for cmd in cmds]
+
+
+    #Reads every state_cmds entry in a single round trip and caches the outputs for the getters
+    def snapshot(self, adb_state=False):
+        self.check_if_running_adb(adb_state)
+        self.state = dict(zip(self.state_cmds, self.get_outputs(self.state_cmds)))
+        self.state_time = time.time()
+        return self.state
+
+
+    def invalidate_state(self):
+        self.state = None
+
+
+    #Whole camera configuration, as the individual getters would report it
+    def get_all(self, adb_state=False):
+        self.snapshot(adb_state)
+        getters = [("White Balance", self.get_white_balance_mode),
+                   ("Exposure Mode", self.get_exposure_mode),
+                   ("Exposure Compensation", self.get_exposure_compensation),
+                   ("ISO", self.get_iso),
+                   ("Shutter Speed", self.get_shutter_speed),
+                   ("Focus Step", self.get_real_focus),
+                   ("Zoom Step", self.get_real_zoom),
+                   ("Optical Offset", self.get_optical_offset),
+                   ("Focus Ring Lock", self.get_focus_ring_lock),
+                   ("Zoom Ring Lock", self.get_zoom_ring_lock),
+                   ("AE Lock", self.get_ae_lock),
+                   ("Depth Assist", self.get_depthAssist_mode),
+                   ("Focus Method", self.get_focus_method),
+                   ("Shutter Mode", self.get_shooting_mode),
+                   ("Self Timer", self.get_self_timer),
+                   ("Exposure Bracketing", self.get_exp_bracketing),
+                   ("Focus Bracketing", self.get_focus_bracketing),
+                   ("Metering Mode", self.get_metering_mode),
+                   ("Flash Sync Mode", self.get_flash_sync_mode),
+                   ("Flash AF Assist", self.get_flashAF_assist),
+                   ("Flash Exposure Compensation", self.get_exposure_flash_compensation),
+                   ("Sleep Timer", self.get_timeout_value),
+                   ("Virtual Cable", self.get_virtual_cable),
+                   ("Pictures Remaining", self.get_pictures_remaining)]
+        state = collections.OrderedDict()
+        for label, getter in getters:
+            state[label] = str(getter(adb_state)).strip()
+        return state
+
+
+    #Polls probe() with exponential backoff until done(value) is true or the deadline passes.
+    #The deadline is the fixed sleep the wait replaces, so a slow camera never gets less time
+    #than it used to. Returns True if the camera reported ready before the deadline.
+    def wait_until(self, probe, done, deadline, interval=.05, backoff=1.5, max_interval=.5):
+        start = time.time()
+        while True:
+            try:
+                ready = done(probe())
+            except (subprocess.CalledProcessError, ValueError, IndexError):
+                ready = False
+            elapsed = time.time() - start
+            if ready or elapsed >= deadline:
+                break
+            time.sleep(min(interval, deadline - elapsed))
+            interval = min(interval * backoff, max_interval)
+        self.wait_budget += deadline
+        self.wait_spent += time.time() - start
+        return ready
+
+
+    #Numeric values are compared with a small relative tolerance since the model rounds them
+    #(e.g. shutter speeds); anything else is a case-insensitive substring match.
+    @staticmethod
+    def model_value_matches(output, expected):
+        try:
+            expected = float(expected)
+        except ValueError:
+            return str(expected).lower() in output.lower()
+        numbers = re.findall(r'\-?\d+\.?\d*', output)
+        if not numbers:
+            return False
+        actual = float(numbers[0])
+        return abs(actual - expected) <= max(abs(expected) * .01, 1e-6)
+
+
+    def wait_for_model(self, key, expected, deadline):
+        probe = lambda: self.get_output("model get {}".format(key))[14:]
+        done = functools.partial(self.model_value_matches, expected=expected)
+        return self.wait_until(probe, done, deadline)
+
+
+    #A lens move is done once the position is within tolerance of the target, or once it has
+    #left its starting position and stopped changing (the target was outside the valid range).
+    def wait_for_lens(self, get_position, start_position, target, deadline, tolerance=5):
+        readings = [start_position]
+
+        def probe():
+            readings.append(get_position())
+            return readings
+
+        def done(readings):
+            current = readings[-1]
+            if abs(current - target) <= tolerance:
+                return True
+            return current != start_position and len(readings) > 2 and readings[-2] == current
+
+        return self.wait_until(probe, done, deadline)
+
+
+    #Returns (budgeted, spent, saved) seconds since the last reset and optionally resets them
+    def wait_report(self, reset=True):
+        report = (self.wait_budget, self.wait_spent, max(self.wait_budget - self.wait_spent, 0))
+        if reset:
+            self.wait_budget = 0
+            self.wait_spent = 0
+        return report
 
     def check_if_running_adb(self, running_adb):
         self.prefix = ""
@@ -59,7 +518,18 @@ class CameraControls:
         else:
             return False
 
-    def get_valid_focus_range(self):
+    #The valid range only depends on the camera and its zoom position, so it is probed (by moving
+    #the lens to both ends) once per serial number and zoom step and remembered after that.
+    def get_valid_focus_range(self, refresh=False):
+        cache_key = "{serial}:{zoom}".format(serial=self.get_serial_no(), zoom=self.get_real_zoom(True))
+        try:
+            with open(self.focus_ranges_path, 'r') as ranges_json:
+                focus_ranges = json.loads(ranges_json.read())
+        except (IOError, ValueError):
+            focus_ranges = {}
+        if not refresh and cache_key in focus_ranges:
+            return focus_ranges[cache_key]
+
         print "\nChecking for valid focus range..."
         current_focus = self.get_real_focus(True)
 
@@ -70,6 +540,15 @@ class CameraControls:
         min_step = self.get_real_focus(True)
 
         self.set_real_focus(current_focus, True)
+
+        focus_ranges[cache_key] = [min_step, max_step]
+        try:
+            if not os.path.exists(os.path.dirname(self.focus_ranges_path)):
+                os.makedirs(os.path.dirname(self.focus_ranges_path))
+            with open(self.focus_ranges_path, 'w') as ranges_json:
+                ranges_json.write(json.dumps(focus_ranges, indent=4))
+        except (IOError, OSError) as e:
+            print "WARNING: could not save focus range to {}: {}".format(self.focus_ranges_path, e)
         return [min_step, max_step]
 
 
@@ -86,13 +565,18 @@ class CameraControls:
         self.check_if_running_adb(adb_state)
         for i in range(number_of_pics):
             print "\nTaking picture..."
-            self.send_cmd("{}lyt capture 0".format(self.prefix), sleep)
+            shots_remaining = self.get_pictures_remaining(adb_state)
+            self.send_cmd("{}lyt capture 0".format(self.prefix), 0)
+            #The shot has been written once the remaining count drops
+            self.wait_until(functools.partial(self.get_pictures_remaining, adb_state),
+                            lambda remaining: remaining != shots_remaining, sleep)
 
     # iso value ranges: 80-3200
     def set_iso(self, iso_value, adb_state=False):
         self.check_if_running_adb(adb_state)
         self.set_exposure_mode('manual', adb_state)
-        self.send_cmd("{prefix}model set iso {iso}".format(prefix=self.prefix, iso=iso_value), 1)
+        self.send_cmd("{prefix}model set iso {iso}".format(prefix=self.prefix, iso=iso_value), 0)
+        self.wait_for_model("iso", iso_value, 1)
 
     def get_iso(self, adb_state=False):
         self.check_if_running_adb(adb_state)
@@ -106,7 +590,8 @@ class CameraControls:
         self.check_if_running_adb(adb_state)
         self.set_exposure_mode('manual', adb_state)
         print "\nSetting shutter speed to {}".format(sp_value)
-        self.send_cmd("{prefix}model set shutterSpeed {sp}".format(prefix=self.prefix, sp=sp_value), 1)
+        self.send_cmd("{prefix}model set shutterSpeed {sp}".format(prefix=self.prefix, sp=sp_value), 0)
+        self.wait_for_model("shutterSpeed", sp_value, 1)
 
 
     def get_shutter_speed(self, adb_state=False):
@@ -120,7 +605,9 @@ class CameraControls:
     def set_real_focus(self, amount, adb_state=False):
         self.check_if_running_adb(adb_state)
         model_value = amount / float(self.max_user_focus_step)
-        self.send_cmd("{pre}model set focusPos {value}".format(pre=self.prefix, value=model_value), 2)
+        start_position = self.get_real_focus(adb_state)
+        self.send_cmd("{pre}model set focusPos {value}".format(pre=self.prefix, value=model_value), 0)
+        self.wait_for_lens(functools.partial(self.get_real_focus, adb_state), start_position, amount, 2)
 
 
     #Get the current focus step directly from the focus motor.
@@ -142,7 +629,9 @@ class CameraControls:
         self.check_if_running_adb(adb_state)
         model_value = amount / float(self.max_user_zoom_step)
         print "SETTING TO MODEL VALUE {}".format(model_value)
-        self.send_cmd("{pre}model set zoomPos {value}".format(pre=self.prefix, value=model_value), 2)
+        start_position = self.get_real_zoom(adb_state)
+        self.send_cmd("{pre}model set zoomPos {value}".format(pre=self.prefix, value=model_value), 0)
+        self.wait_for_lens(functools.partial(self.get_real_zoom, adb_state), start_position, amount, 2)
 
 
     def get_real_zoom(self, adb_state=False):
@@ -181,7 +670,8 @@ class CameraControls:
                    'manual': 'EXPOSURE_MANUAL'}
         exp_mode = presets[mode]
         print "\nSetting exp mode to {}".format(exp_mode)
-        self.send_cmd("{prefix}model set exposureMode {preset}".format(prefix=self.prefix, preset=presets[mode]), 1)
+        self.send_cmd("{prefix}model set exposureMode {preset}".format(prefix=self.prefix, preset=presets[mode]), 0)
+        self.wait_for_model("exposureMode", exp_mode, 1)
 
     def get_exposure_mode(self, adb_state=False):
         self.check_if_running_adb(adb_state)
@@ -424,14 +914,15 @@ class CameraControls:
 
     def get_timeout_value(self, adb_state=False):
         self.check_if_running_adb(adb_state)
-        output = subprocess.check_output(shlex.split("{pre}model get InactivityTimeoutSeconds".format(pre=self.prefix)))
+        output = self.get_output("model get InactivityTimeoutSeconds")
         timeout_secs = (re.findall(r'\d+', output))[0]
         return timeout_secs
 
     def set_timeout(self, timeout_secs, adb_state=False):
         self.check_if_running_adb(adb_state)
         self.send_cmd("{pre}model set InactivityTimeoutSeconds {timeout}".format(pre=self.prefix,
-                                                                                 timeout=timeout_secs), 1)
+                                                                                 timeout=timeout_secs), 0)
+        self.wait_for_model("InactivityTimeoutSeconds", timeout_secs, 1)
     #valid modes are: 'auto', 'tungsten', 'fluorescent', 'flash', 'daylight', 'cloudy', 'shade', 'custom'
     def set_white_balance_mode(self, mode, adb_state=False):
         self.check_if_running_adb(adb_state)
@@ -487,15 +978,14 @@ class CameraControls:
         self.check_if_running_adb(adb_state)
         if mode == '1':
             if "DEPTH_ASSIST_OFF" in self.get_depthAssist_mode(adb_state):
-                self.send_cmd("{}sendevent /dev/input/event2 1 555 1".format(self.prefix), 0)
-                self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-                self.send_cmd("{}sendevent /dev/input/event2 1 554 1".format(self.prefix), 0)
-                self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-                self.send_cmd("{}sendevent /dev/input/event2 1 554 0".format(self.prefix), 0)
-                self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-                self.send_cmd("{}sendevent /dev/input/event2 1 555 0".format(self.prefix), 0)
-                self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-                time.sleep(1)
+                self.send_cmds(["sendevent /dev/input/event2 1 555 1",
+                               "sendevent /dev/input/event2 0 0 0",
+                               "sendevent /dev/input/event2 1 554 1",
+                               "sendevent /dev/input/event2 0 0 0",
+                               "sendevent /dev/input/event2 1 554 0",
+                               "sendevent /dev/input/event2 0 0 0",
+                               "sendevent /dev/input/event2 1 555 0",
+                               "sendevent /dev/input/event2 0 0 0"], 1)
         elif mode == '0':
             self.send_cmd("{}model set DepthAssistMode 0".format(self.prefix))
 
@@ -517,12 +1007,10 @@ class CameraControls:
 
     def half_press_shutter(self, adb_state=False):
         self.check_if_running_adb(adb_state)
-        self.send_cmd("{}sendevent /dev/input/event2 1 528 1".format(self.prefix), 0)
-        self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-        #time.sleep(1)
-        self.send_cmd("{}sendevent /dev/input/event2 1 528 0".format(self.prefix), 0)
-        self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-        time.sleep(1)
+        self.send_cmds(["sendevent /dev/input/event2 1 528 1",
+                       "sendevent /dev/input/event2 0 0 0",
+                       "sendevent /dev/input/event2 1 528 0",
+                       "sendevent /dev/input/event2 0 0 0"], 1)
 
 
     def disable_bracketing_modes(self):
@@ -546,9 +1034,11 @@ class CameraControls:
             self.disable_timeout(True)
 
     def get_serial_no(self):
-        output = subprocess.check_output(['adb', 'shell', 'cat', 'unitdata/unit_info.json'])
-        unit_info = json.loads(output)
-        return unit_info['camera']['serialNumber'].strip()
+        if self.serial_no is None:
+            output = self.execute(self.adb + "cat unitdata/unit_info.json")
+            unit_info = json.loads(output)
+            self.serial_no = unit_info['camera']['serialNumber'].strip()
+        return self.serial_no
 
     def convert_zoom_x_to_step(self, zoom):
         zoom_pos_x = {'1': '1',
@@ -569,8 +1059,10 @@ class CameraControls:
         if not os.path.exists(dest_path):
             os.makedirs(dest_path)
         print "\nPulling call data...\n"
-        print "path: " + "adb pull unitdata {}".format(os.path.join(args.path, "cameras", camera_sn))
-        self.send_cmd("adb pull unitdata {}".format(os.path.join(args.path, "cameras", camera_sn)))
+        pull_cmd = "{adb} pull unitdata {path}".format(adb=" ".join(self.adb_cmd),
+                                                        path=os.path.join(args.path, "cameras", camera_sn))
+        print "path: " + pull_cmd
+        self.send_cmd(pull_cmd)
         print "\nCal data transfer completed\n"
         self.set_timeout(self.get_entry_from_json("sleep_timeout"), True)
         self.disable_virtual_cable(True)
@@ -595,7 +1087,7 @@ class CameraControls:
         except OSError:
             return folder_counter
 
-    def download_images(self, args):
+    def download_images(self, args, on_pulled=None):
         self.init()
         if not os.path.exists(args.path):
             os.makedirs(args.path)
@@ -607,86 +1099,40 @@ class CameraControls:
             end_directory_path += "_({})".format(folder_count+1)
 
         print "\nWaiting for DCF...\n"
-        #Give it a sleep in case pictures are still being written to the card
-        time.sleep(5)
+        self.wait_for_dcf()
         if self.higher_dcf_path_exists():
             dcf_path = 'storage/sdcard1/DCIM/200PHOTO/'
         else:
             dcf_path = 'storage/sdcard1/DCIM/100PHOTO/'
-        dcf_list = subprocess.check_output(['adb', 'shell', 'ls', '{}'.format(dcf_path)]).split()
-
-        #If user specified to download all then do that
-        if args.dwl_all:
-            for photo in reversed(dcf_list):
-                if photo.endswith("LFR"):
-                    final_path = os.path.join(end_directory_path, photo)
-                    base_path = "adb pull {dcf}/{pic_id} ".format(dcf=dcf_path, pic_id=photo)
-                    pull_cmd = shlex.split(base_path)
-                    pull_cmd.append(final_path)
-                    if sys.platform == 'win32':
-                        [(item.replace("\\", "\\\\")) for item in pull_cmd]
-                    print "downloading {photo} to {path}".format(photo=photo, path=os.path.dirname(final_path))
-                    try:
-                        #Handle Ctr + Z interrupt
-                        try:
-                            signal.signal(signal.SIGTSTP, functools.partial(self.handler, final_path))
-                        #Windows does not recognize SIGTSP and will throw an AtributeError
-                        except AttributeError:
-                            pass
-                        #Execute image download
-                        out = subprocess.Popen(pull_cmd, stdout=subprocess.PIPE)
-                        #Make this call blocking
-                        out.communicate()[0]
-
-                    #Handle Ctr + C interrupt
-                    except KeyboardInterrupt:
-                        self.remove_file(final_path)
-                        print "Cancelling import on {}".format(final_path)
-                        try:
-                            sys.exit(0)
-                        except SystemExit:
-                            os._exit(0)
-            time.sleep(1)
-            print "\nDONE!\n"
-
-        #Otherwise download images from the latest script ran
-        else:
+
+        dcf_sync = DcfSync(args.path, adb=self.adb_cmd, jobs=getattr(args, 'jobs', 3), verbose=self.verbose)
+        dcf_list = [entry for entry in dcf_sync.list_remote(dcf_path) if entry['name'].endswith("LFR")]
+
+        #Unless the user asked for everything, only consider the pictures from the latest script ran
+        if not args.dwl_all:
             pictures_taken = self.get_entry_from_json("total_captures")
-            LFR_counter = 0
-            for photo in reversed(dcf_list):
-                if (LFR_counter + 1) > pictures_taken:
-                    time.sleep(1)
-                    print "\nDONE!\n"
-                    break
-                if photo.endswith("LFR"):
-                    LFR_counter += 1
-                    final_path = os.path.join(end_directory_path, photo)
-                    base_path = "adb pull {dcf}/{pic_id} ".format(dcf=dcf_path, pic_id=photo)
-                    pull_cmd = shlex.split(base_path)
-                    pull_cmd.append(final_path)
-                    if sys.platform == 'win32':
-                        [(item.replace("\\", "\\\\")) for item in pull_cmd]
-
-                    print "downloading {photo} to {path}".format(photo=photo, path=os.path.dirname(final_path))
-                    try:
-                        #Handle Ctr + Z interrupt
-                        try:
-                            signal.signal(signal.SIGTSTP, functools.partial(self.handler, final_path))
-                        #Windows does not recognize SIGTSP and will throw an AtributeError
-                        except AttributeError:
-                            pass
-                        out = subprocess.Popen(pull_cmd, stdout=subprocess.PIPE)
-                        #Make this call blocking
-                        out.communicate()[0]
-
-                    #Handle Ctr + C interrupt
-                    except KeyboardInterrupt:
-                        self.remove_file(final_path)
-                        print "Cancelling import on {}".format(final_path)
-                        try:
-                            sys.exit(0)
-                        except SystemExit:
-                            os._exit(0)
+            dcf_list = dcf_list[max(len(dcf_list) - pictures_taken, 0):] if pictures_taken > 0 else []
+
+        pending = dcf_sync.pending(dcf_list)
+        if len(pending) < len(dcf_list):
+            print "Skipping {} picture(s) already downloaded".format(len(dcf_list) - len(pending))
+
+        #Handle Ctr + Z interrupt
+        try:
+            signal.signal(signal.SIGTSTP, dcf_sync.cancel)
+        #Windows does not recognize SIGTSP and will throw an AtributeError
+        except AttributeError:
+            pass
+
+        try:
+            pulled, failed = dcf_sync.sync(pending, dcf_path, end_directory_path, on_pulled)
+        #Handle Ctr + C interrupt
+        except KeyboardInterrupt:
+            dcf_sync.cancel()
+
+        if failed:
+            print "\nFailed to download: {}".format(", ".join(failed))
+        print "\nDONE!\n"
 
         self.set_timeout(self.get_entry_from_json("sleep_timeout"), True)
         self.disable_virtual_cable(True)
@@ -700,7 +1146,7 @@ class CameraControls:
 
 
     def get_entry_from_json(self, key):
-        with open(os.path.join(self.real_path, "args.json"), 'r') as args_json:
+        with open(self.args_json, 'r') as args_json:
             capture_args = json.loads(args_json.read())
             entry = capture_args[key]
             args_json.close()
@@ -712,7 +1158,9 @@ class CameraControls:
         return int((re.findall(r'\d+', out))[0])
 
     def is_adb_running(self):
-        output = subprocess.check_output(["adb", "devices"])
+        output = subprocess.check_output(self.adb_cmd[:1] + ["devices"])
+        if self.serial:
+            return re.search(r'^{}\s+device\s*$'.format(re.escape(self.serial)), output, re.M) is not None
         #If the output contains digits, it found the serial number which means adb is running.
         if any(char.isdigit() for char in output):
             return True
@@ -730,20 +1178,36 @@ class CameraControls:
     def login_as_root_if_necessary(self):
         if not self.running_as_root():
             print "\nLogging as root"
-            self.send_cmd("adb root")
+            self.send_cmd(" ".join(self.adb_cmd + ["root"]))
+            #adbd restarts as root, so the open shell session is gone
+            self.session.close()
             raw_input("\nDisconnect and reconnect USB cable. Press ENTER to continue")
             time.sleep(2)
 
     def running_as_root(self):
-        uid_output = subprocess.check_output(["adb", "shell", "id", "-u"])
+        uid_output = subprocess.check_output(self.adb_cmd + ["shell", "id", "-u"])
         if "uid=0" in uid_output:
             return True
         else:
             return False
 
 
+    #Waits until the DCF folders list the same pictures twice in a row, in case pictures are still
+    #being written to the card
+    def wait_for_dcf(self, deadline=5):
+        listings = []
+
+        def probe():
+            listings.append(subprocess.check_output(self.adb_cmd + ["shell", "ls -l storage/sdcard1/DCIM/*PHOTO/ 2>/dev/null"]))
+            return listings
+
+        def done(listings):
+            return len(listings) > 1 and listings[-1] == listings[-2] and ".LFR" in listings[-1]
+
+        return self.wait_until(probe, done, deadline, interval=.5)
+
     def higher_dcf_path_exists(self):
-        output = subprocess.check_output(["adb", "shell", "storage/sdcard1/DCIM/200PHOTO/"])
+        output = subprocess.check_output(self.adb_cmd + ["shell", "storage/sdcard1/DCIM/200PHOTO/"])
         if "Is a directory" in output:
             return True
         else:
@@ -752,81 +1216,73 @@ class CameraControls:
     def press_power(self, repeat=1, sleep=1, adb_state=False):
         self.check_if_running_adb(adb_state)
         for i in range(repeat):
-            self.send_cmd("{}sendevent /dev/input/event1 1 356 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event1 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event1 1 356 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event1 0 0 0".format(self.prefix), 0)
-            time.sleep(sleep)
+            self.send_cmds(["sendevent /dev/input/event1 1 356 1",
+                           "sendevent /dev/input/event1 0 0 0",
+                           "sendevent /dev/input/event1 1 356 0",
+                           "sendevent /dev/input/event1 0 0 0"], sleep)
 
 
     def press_shutter(self, repeat=1, sleep=1, adb_state=False):
         self.check_if_running_adb(adb_state)
         for i in range(repeat):
-            self.send_cmd("{}sendevent /dev/input/event2 1 528 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 766 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 766 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 528 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            time.sleep(sleep)
+            self.send_cmds(["sendevent /dev/input/event2 1 528 1",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 766 1",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 766 0",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 528 0",
+                           "sendevent /dev/input/event2 0 0 0"], sleep)
 
     def press_half_shutter(self, repeat=1, sleep=1, adb_state=False):
         self.check_if_running_adb(adb_state)
         for i in range(repeat):
-            self.send_cmd("{}sendevent /dev/input/event2 1 528 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 528 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            time.sleep(sleep)
+            self.send_cmds(["sendevent /dev/input/event2 1 528 1",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 528 0",
+                           "sendevent /dev/input/event2 0 0 0"], sleep)
 
     def press_lytro(self, repeat=1, sleep=1, adb_state=False):
         self.check_if_running_adb(adb_state)
         for i in range(repeat):
-            self.send_cmd("{}sendevent /dev/input/event2 1 555 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 554 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 554 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 555 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            time.sleep(sleep)
+            self.send_cmds(["sendevent /dev/input/event2 1 555 1",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 554 1",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 554 0",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 555 0",
+                           "sendevent /dev/input/event2 0 0 0"], sleep)
 
     def press_ael(self, repeat=1, sleep=1, adb_state=False):
         self.check_if_running_adb(adb_state)
         for i in range(repeat):
-            self.send_cmd("{}sendevent /dev/input/event2 1 556 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 556 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            time.sleep(sleep)
+            self.send_cmds(["sendevent /dev/input/event2 1 556 1",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 556 0",
+                           "sendevent /dev/input/event2 0 0 0"], sleep)
 
 
     def press_fn(self, repeat=1, sleep=1, adb_state=False):
         self.check_if_running_adb(adb_state)
         for i in range(repeat):
-            self.send_cmd("{}sendevent /dev/input/event2 1 557 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 557 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            time.sleep(sleep)
+            self.send_cmds(["sendevent /dev/input/event2 1 557 1",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 557 0",
+                           "sendevent /dev/input/event2 0 0 0"], sleep)
 
     def press_hyperfocal(self, repeat=1, sleep=1, adb_state=False):
         self.check_if_running_adb(adb_state)
         for i in range(repeat):
-            self.send_cmd("{}sendevent /dev/input/event2 1 558 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 558 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            time.sleep(sleep)
+            self.send_cmds(["sendevent /dev/input/event2 1 558 1",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 558 0",
+                           "sendevent /dev/input/event2 0 0 0"], sleep)
 
     def press_af(self, repeat=1, sleep=1, adb_state=False):
         self.check_if_running_adb(adb_state)
         for i in range(repeat):
-            self.send_cmd("{}sendevent /dev/input/event2 1 559 1".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 1 559 0".format(self.prefix), 0)
-            self.send_cmd("{}sendevent /dev/input/event2 0 0 0".format(self.prefix), 0)
-            time.sleep(sleep)
+            self.send_cmds(["sendevent /dev/input/event2 1 559 1",
+                           "sendevent /dev/input/event2 0 0 0",
+                           "sendevent /dev/input/event2 1 559 0",
+                           "sendevent /dev/input/event2 0 0 0"], sleep)
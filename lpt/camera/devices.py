@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - camera package - multiple camera manager"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+
+
+import collections
+import subprocess
+import threading
+import time
+
+from lpt.camera import builder
+
+
+#Drives several cameras attached to the same host. A Build (and with it a CameraControls and
+#its own adb shell session) is bound to each serial number, and a job runs on every camera at
+#once, one thread per device, with a shared progress report.
+class DeviceManager:
+
+    def __init__(self, adb_bin="adb"):
+        self.adb_bin = adb_bin
+        self.devices = collections.OrderedDict()
+        self.status = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    #Serials of every attached camera that adb reports as ready
+    def list_serials(self):
+        output = subprocess.check_output([self.adb_bin, "devices"])
+        serials = []
+        for line in output.splitlines()[1:]:
+            fields = line.split()
+            if len(fields) == 2 and fields[1] == "device":
+                serials.append(fields[0])
+        return serials
+
+    def bind(self, serials=None):
+        for serial in serials or self.list_serials():
+            if serial not in self.devices:
+                self.devices[serial] = builder.Build(serial, self.adb_bin)
+        return self.devices
+
+    def progress(self, serial, state):
+        with self.lock:
+            self.status[serial] = state
+            finished = len([s for s in self.status.values() if s.startswith(("done", "failed"))])
+            print "\n[{finished}/{total}] {serial}: {state}".format(finished=finished, total=len(self.devices),
+                                                                 serial=serial, state=state)
+
+    #Runs job(serial, bld) on every bound camera concurrently; returns {serial: final state}
+    def run(self, job):
+        start = time.time()
+
+        def target(serial, bld):
+            self.progress(serial, "started")
+            try:
+                job(serial, bld)
+            #One camera failing (or exiting) must not take the others down
+            except (Exception, SystemExit) as err:
+                self.progress(serial, "failed ({})".format(err))
+            else:
+                self.progress(serial, "done")
+
+        threads = [threading.Thread(target=target, args=(serial, bld)) for serial, bld in self.devices.items()]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        #Join with a timeout so Ctrl + C still reaches the main thread
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(.2)
+
+        print "\nFinished {count} camera(s) in {secs:.1f}s".format(count=len(self.devices), secs=time.time() - start)
+        for serial, state in self.status.items():
+            print "    {serial}: {state}".format(serial=serial, state=state)
+        return self.status
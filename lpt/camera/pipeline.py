@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - camera package - download to render pipeline"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+
+import time
+import threading
+import Queue
+
+from lpt.lfp import config
+from lpt.lfp.tntcommon import TntCommon
+
+
+#Renders LFRs while the rest of the shoot is still being pulled off the camera. Transfers hand
+#each finished file to submit(); a bounded queue sits between them and the render threads so a
+#fast card can't run arbitrarily far ahead of TNT.
+class RenderPipeline:
+
+    def __init__(self, jobs=1, queue_size=4, dir_out=None, imagerep=None, calibration_in=None, verbose=False):
+        self.jobs = max(int(jobs), 1)
+        self.queue = Queue.Queue(maxsize=max(int(queue_size), self.jobs))
+        self.dir_out = dir_out
+        self.imagerep = imagerep
+        self.calibration_in = calibration_in or config.db['calibration_in']
+        self.verbose = verbose
+        #Keeps TNT status lines from several render threads from interleaving
+        self.lock = threading.Lock()
+        self.threads = []
+        #Progress index of the next file taken off the queue, counted under the lock
+        self.taken = 0
+        self.rendered = []
+        self.failed = []
+        self.start_time = None
+        self.end_time = None
+
+    def start(self):
+        self.start_time = time.time()
+        for i in range(self.jobs):
+            thread = threading.Thread(target=self.render_worker)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    #Blocks while the queue is full, which is what throttles the transfer side
+    def submit(self, lfp_in):
+        self.queue.put(lfp_in)
+
+    def render_worker(self):
+        tnt_common = TntCommon(verbose=self.verbose)
+        tnt_common.lock = self.lock
+        for lfp_in in iter(self.queue.get, 'STOP'):
+            with self.lock:
+                i = self.taken
+                self.taken += 1
+            try:
+                tnt_common.raw_image_out(lfp_in,
+                                         calibration_in=self.calibration_in,
+                                         dir_out=self.dir_out,
+                                         imagerep=self.imagerep,
+                                         i=i)
+                self.rendered.append(lfp_in)
+            #A bad file must not take the thread down, or submit() would block forever
+            except (Exception, SystemExit):
+                self.failed.append(lfp_in)
+
+    #Waits for every submitted file to render; returns (rendered, failed) lists of paths
+    def finish(self):
+        for thread in self.threads:
+            self.queue.put('STOP')
+        while any(thread.is_alive() for thread in self.threads):
+            for thread in self.threads:
+                thread.join(.2)
+        self.end_time = time.time()
+        return self.rendered, self.failed
+
+    def elapsed(self):
+        if self.start_time is None:
+            return 0
+        return (self.end_time or time.time()) - self.start_time
@@ -36,6 +36,7 @@ class Execution:
         self.cam = camerabin.CameraControls()
         self.show_timer = False
         self.start_time = 0
+        self.time_saved = 0
 
 
     def send_command(self, cmd):
@@ -50,6 +51,7 @@ class Execution:
         return args
 
     def perform_captures(self):
+        self.cam.wait_report()
         self.cam.disable_bracketing_modes()
         reps = self.args['pictures']
         add_sleep = self.args['interval']
@@ -64,7 +66,10 @@ class Execution:
             else:
                 time.sleep(add_sleep)
 
+        self.report_time_saved("Captures")
+
     def perform_cont_captures(self):
+        self.cam.wait_report()
         self.cam.disable_bracketing_modes()
         reps = self.args['reps']
         cap_size = self.args['capture_size']
@@ -85,7 +90,10 @@ class Execution:
                 #Additional sleep time input by user.
                 time.sleep(add_sleep)
 
+        self.report_time_saved("Continuous captures")
+
     def perform_exp_bracketing(self):
+        self.cam.wait_report()
         self.cam.enable_exp_bracketing()
         self.cam.set_exposure_bracket_offset(self.args['offset'])
         self.cam.set_exposure_bracket_size(self.args['size'])
@@ -102,7 +110,10 @@ class Execution:
             else:
                 time.sleep(add_sleep)
 
+        self.report_time_saved("Exposure bracketing")
+
     def perform_focus_bracketing(self):
+        self.cam.wait_report()
         self.cam.enable_focus_bracketing()
         self.cam.set_focus_bracket_offset(self.args['offset'])
         self.cam.set_focus_bracket_size(self.args['size'])
@@ -119,7 +130,10 @@ class Execution:
             else:
                 time.sleep(add_sleep)
 
+        self.report_time_saved("Focus bracketing")
+
     def perform_focus_sweep(self):
+        self.cam.wait_report()
         self.cam.disable_bracketing_modes()
         add_sleep = self.args['interval']
         lowest_step = self.args['focus_range'][0]
@@ -152,8 +166,11 @@ class Execution:
             else:
                 time.sleep(add_sleep)
 
+        self.report_time_saved("Focus sweep")
+
 
     def perform_zoom_sweep(self):
+        self.cam.wait_report()
         self.cam.disable_bracketing_modes()
         add_sleep = self.args['interval']
         lowest_step = self.args['zoom_range'][0]
@@ -186,6 +203,15 @@ class Execution:
             else:
                 time.sleep(add_sleep)
 
+        self.report_time_saved("Zoom sweep")
+
+
+    def report_time_saved(self, name):
+        budget, spent, saved = self.cam.wait_report()
+        self.time_saved += saved
+        print "{name}: waited {spent:.1f}s of {budget:.1f}s budgeted, saved {saved:.1f}s".format(
+            name=name, spent=spent, budget=budget, saved=saved)
+
 
     def launch_start_screen(self):
 
@@ -267,6 +293,7 @@ class Execution:
         script_duration = datetime.now().replace(microsecond=0) - self.start_time
         with open("storage/sdcard1/args.json", mode='w') as args_json:
             self.args['script_duration'] = str(script_duration)
+            self.args['wait_time_saved'] = round(self.time_saved, 1)
             args_json.write(json.dumps(self.args))
 
 
@@ -20,7 +20,10 @@ import multiprocessing
 from functools import partial
 
 import config
+from lpt.lfp import distrib
+from lpt.lfp import watch
 from lpt.lfp.tnt import Tnt
+from lpt.lfp.tntcommon import TntCommon
 from lpt.recipe.params import Params
 from lpt.utils.argutils import ArgUtils
 from lpt.utils.utils import Utils
@@ -37,7 +40,12 @@ class ArgParser(object):
     """LFP Tool-specific argument parser functions"""
 
     _file_pattern = config.file_pattern
-    _cpu_count = config.db['processors']
+
+    @property
+    def _cpu_count(self):
+        """:return: configured default number of processors"""
+
+        return config.db['processors']
 
     @staticmethod
     def _cls_vals(cls):
@@ -134,6 +142,120 @@ class ArgParser(object):
             type=partial(argutils.processors, arg='--processors'),
             default=self._cpu_count)
 
+    @staticmethod
+    def arg_schedule(parser):
+        """adds task scheduling arg (for multiprocessing)
+
+        :param parser: <argparse parser> parser to add argument to
+        """
+
+        parser.add_argument(
+            '--schedule',
+            help="task queueing order: longest estimated task first, or "
+                 "input order " + argutils.arg_default('longest'),
+            choices=config.schedules,
+            default='longest')
+
+    @staticmethod
+    def args_daemon(parser):
+        """adds render daemon args
+
+        :param parser: <argparse parser> parser to add arguments to
+        """
+
+        parser.add_argument(
+            '--socket',
+            help="Unix socket to listen on "
+                 + argutils.arg_default(config.daemon_socket),
+            metavar='PATH',
+            default=config.daemon_socket)
+
+    @staticmethod
+    def args_manifest(parser):
+        """adds job manifest args
+
+        :param parser: <argparse parser> parser to add arguments to
+        """
+
+        parser.add_argument(
+            '-m', '--manifest',
+            help="JSON job manifest to run",
+            metavar='PATH',
+            required=True)
+
+        parser.add_argument(
+            '--dry-run',
+            help="list the tasks of the manifest without running them",
+            action='store_true')
+
+    @staticmethod
+    def arg_serve(parser):
+        """adds coordinator arg (for distributed processing)
+
+        :param parser: <argparse parser> parser to add argument to
+        """
+
+        parser.add_argument(
+            '--serve',
+            help="serve tasks to `worker` processes on [HOST]:PORT instead "
+                 "of running them locally; paths must resolve to the same "
+                 "files on every worker. HOST defaults to localhost; the "
+                 "port is unauthenticated, so use 0.0.0.0 or a specific "
+                 "address only on a trusted network",
+            metavar='[HOST]:PORT',
+            type=distrib.parse_address)
+
+    @staticmethod
+    def args_watch(parser):
+        """adds watch folder args
+
+        :param parser: <argparse parser> parser to add arguments to
+        """
+
+        parser.add_argument(
+            '--interval',
+            help="seconds between scans of the watched paths; on Linux, "
+                 "changes are picked up as they happen "
+                 + argutils.arg_default(watch.interval),
+            metavar='SECONDS',
+            type=float,
+            default=watch.interval)
+
+        parser.add_argument(
+            '--settle',
+            help="seconds a file's size must hold still before it is "
+                 "processed " + argutils.arg_default(watch.settle),
+            metavar='SECONDS',
+            type=float,
+            default=watch.settle)
+
+        parser.add_argument(
+            '--cursor',
+            help="file keeping track of the files already processed; use "
+                 "one per watch set up "
+                 + argutils.arg_default(config.watch_cursor),
+            metavar='PATH',
+            default=config.watch_cursor)
+
+    @staticmethod
+    def args_worker(parser):
+        """adds remote worker args
+
+        :param parser: <argparse parser> parser to add arguments to
+        """
+
+        parser.add_argument(
+            '--connect',
+            help="coordinator address, see --serve",
+            metavar='[HOST]:PORT',
+            required=True,
+            type=distrib.parse_address)
+
+        parser.add_argument(
+            '--name',
+            help="worker name reported to the coordinator "
+                 + argutils.arg_default('host name'))
+
     def arg_src(self, parser):
         """creates a argparse group and adds input arguments
 
@@ -213,6 +335,84 @@ class ArgParser(object):
             help="with --property, search for exact match",
             dest='exact')
 
+    @staticmethod
+    def args_extract(parser):
+        """adds extract arguments to a given argparse parser
+
+        :param parser: <argparse parser> parser to add arguments to
+        """
+
+        parser.add_argument(
+            '--dir-out',
+            help="output directory (default: output to the source LFP "
+                 "file's directory)",
+            metavar=argutils.path_meta,
+            type=partial(argutils.str_, arg='--dir-out'),
+            dest='dir_out')
+
+        parser.add_argument(
+            '--no-depth',
+            default=True,
+            help="skip depth and confidence maps",
+            dest='depth',
+            action='store_false')
+
+    @staticmethod
+    def args_plan(parser):
+        """adds the multi-output plan argument to a given argparse parser
+
+        :param parser: <argparse parser> parser to add arguments to
+        """
+
+        choices = list(TntCommon._plan_actions)
+
+        def action(x): return x.lstrip('-').replace('-', '_')
+
+        parser.add_argument(
+            '--plan',
+            nargs='+',
+            default=None,
+            choices=choices,
+            type=action,
+            metavar='ACTION',
+            dest='plan',
+            help="run several actions per LFP in one pass (overrides the "
+                 "action argument); outputs TNT can write from one decode "
+                 "share a single TNT call "
+                 "({{{}}})".format(','.join(c.replace('_', '-')
+                                            for c in choices)))
+
+    @staticmethod
+    def args_focus_sweep(parser):
+        """adds focus sweep arguments to a given argparse parser
+
+        :param parser: <argparse parser> parser to add arguments to
+        """
+
+        group = parser.add_argument_group('focus sweep arguments')
+        sweep = group.add_mutually_exclusive_group()
+        number = partial(argutils.number, arg='--focus-sweep')
+
+        sweep.add_argument(
+            '--focus-sweep',
+            nargs=3,
+            default=None,
+            type=number,
+            metavar=('START', 'STOP', 'STEPS'),
+            dest='focus_sweep',
+            help="with --image-out, render STEPS images with focus evenly "
+                 "spaced from START to STOP (overrides --focus)")
+
+        sweep.add_argument(
+            '--focus-list',
+            nargs='+',
+            default=None,
+            type=partial(argutils.number, arg='--focus-list'),
+            metavar=argutils.float_meta,
+            dest='focus_list',
+            help="with --image-out, render one image per focus value "
+                 "(overrides --focus)")
+
     @staticmethod
     def args_four_d(parser):
         """adds 4D arguments to a given argparse parser
@@ -16,15 +16,23 @@
 # SOFTWARE OR ITS DERIVATIVES.
 # </copyright>
 
+import argparse
 import collections
+import json
 import os
 import multiprocessing
-import numpy as np
 
 from pprint import pprint
 from functools import partial
 from copy import copy
 
+from lpt.lfp import daemon
+from lpt.lfp import distrib
+from lpt.lfp import manifest
+from lpt.lfp import watch
+from lpt.lfp.manifest import Manifest
+from lpt.lfp.schedule import Scheduler
+from lpt.lfp.schedule import _TimedQueue
 from lpt.lfp.tnt import Tnt
 from lpt.lfp.tntcommon import TntCommon
 from lpt.lfp.tool import Tool
@@ -36,6 +44,10 @@ from lpt.utils.jsonutils import JsonUtils
 from lpt.utils.msgutils import MsgUtils
 from lpt.utils.msgutils import ToolError
 from lpt.utils.msgutils import ToolWarn
+from lpt.utils.profutils import profiled
+from lpt.utils.traceutils import span
+from lpt.utils.traceutils import traced
+from lpt.utils.traceutils import traced_target
 from lpt.utils.utils import Utils
 
 tnt = Tnt()
@@ -62,6 +74,10 @@ class Cmds(TntCommon):
 
     def __init__(self, **kwargs):
         TntCommon.__init__(self, **kwargs)
+        self.schedule = 'longest'
+        self.serve = None
+        self.pool = None
+        self.status = None
 
     def _set_print_help(self, args):
         """sets `argparse` help menu for current command"""
@@ -88,35 +104,87 @@ class Cmds(TntCommon):
         assert src, ToolError(e, self.print_help)
 
     def _multiprocess(self, worker, master, processors=1, **kwargs):
-        """multiprocessing handler for commands"""
+        """multiprocessing handler for commands
+
+        tasks are queued in the order chosen by the scheduler (see
+        `schedule.Scheduler`); every task is timed, to refine the cost
+        estimates of later runs; with `serve` set, the tasks are served to
+        remote ``lfptool worker`` processes instead (see `distrib`), with
+        `pool` set they run on the render daemon's worker processes (see
+        `daemon`)
+        """
+
+        scheduler = Scheduler(self.schedule)
+        order = scheduler.order(master, kwargs)
+        units = dict(order)
+
+        if self.serve or self.pool:
+            job = dict(worker=worker.__name__, kwds=kwargs,
+                       verbose=self.verbose)
+            queued = [n for n, _ in order]
+
+            if self.serve:
+                runner = distrib.Coordinator(self.serve, job, master, queued)
+                seconds = runner.serve()
+            else:
+                runner = self.pool.submit(job, master, queued, self.status)
+                seconds = runner.wait()
+
+            e = "{} of {} task(s) failed".format(len(runner.errors),
+                                                 len(master))
+            assert not runner.errors, ToolError(e, self.print_help)
+
+            scheduler.record(master, kwargs, units, seconds)
+            return
 
         lock = multiprocessing.Lock() if processors > 1 else None
         queue = multiprocessing.JoinableQueue()
+        timings = multiprocessing.Queue()
         procs = []
-        args = queue, kwargs, lock, self.verbose
+        args = _TimedQueue(queue, timings), kwargs, lock, self.verbose
 
         for _ in range(processors):
-            procs.append(multiprocessing.Process(target=worker, args=args))
+            target = traced_target(profiled(worker))
+            procs.append(multiprocessing.Process(target=target, args=args))
             procs[-1].daemon = True
             procs[-1].start()
 
-        [queue.put(x) for x in master]
-        queue.join()
+        with span('enqueue', 'queue', tasks=len(master)):
+            [queue.put((n, master[n])) for n, _ in order]
 
-        [queue.put('STOP') for _ in procs]
-        queue.join()
+        with span('wait', 'queue'):
+            queue.join()
 
-        [p.join() for p in procs]
+            [queue.put('STOP') for _ in procs]
+            queue.join()
+
+            [p.join() for p in procs]
+
+        seconds = dict(timings.get() for _ in master)
+
+        if processors > 1 and len(master) > processors:
+            scheduler.report(master, kwargs, order, seconds, processors)
+
+        scheduler.record(master, kwargs, units, seconds)
 
     @staticmethod
     def _mutual(args, action):
-        """checks for conflicting tnt arguments; warns if conflict present"""
+        """checks for conflicting tnt arguments; warns if conflict present
+
+        with a list of actions (``--plan``), only arguments that none of
+        the actions take are reported
+        """
 
         def arg(a): return arg_format(a, split='_', join='-', pre='--')
         dests = tnt.dests(combine=False)
         items = args.__dict__.items()
-        act = getattr(tnt, action)
-        act_arg = act.arg_alt or act.arg
+        actions = action if isinstance(action, list) else [action]
+
+        if len(actions) > 1:
+            act_arg = '--plan'
+        else:
+            act = getattr(tnt, actions[0])
+            act_arg = act.arg_alt or act.arg
 
         for key, value in items:
             if not any_(value, iter_=False):
@@ -128,7 +196,7 @@ class Cmds(TntCommon):
 
             cls = getattr(tnt, key)
             nix = [x for x in tnt.actions if x not in cls.actions]
-            if action not in nix:
+            if not all(a in nix for a in actions):
                 continue
 
             w = act_arg + ": ignoring incompatibility: " + cls.arg
@@ -155,6 +223,33 @@ class Cmds(TntCommon):
 
         assert rep in options, ToolError(e, self.print_help)
 
+    def _reps_sanity(self, action, imagerep, depthrep):
+        """checks imagerep and depthrep against the choices of an action
+
+        :raise: `ToolError` if a representation is invalid for `action`
+        """
+
+        image = []
+
+        if action == 'depth_out':
+            depth = tnt.depthrep_depth.choices
+        else:
+            depth = tnt.depthrep.choices
+
+        if action in ('lfp_out', 'unpack'):
+            image = tnt.imagerep_lfp.choices
+        elif action == 'image_out':
+            image = tnt.imagerep.choices
+        elif action == 'eslf_out':
+            image = tnt.imagerep_eslf.choices
+
+        if image and imagerep:
+            self._rep_sanity(action, imagerep, 'imagerep', image)
+
+        if depthrep:
+            self._rep_sanity(action, depthrep, 'depthrep', depth)
+
+    @traced(cat='cmd')
     def batch(self, args):
         """LFP Tool batch raw processing command
 
@@ -189,10 +284,12 @@ class Cmds(TntCommon):
 
         gen = Generator(args.recipe_in, total=s_total)
 
-        with msgutils.msg_indicator(read):
+        with msgutils.msg_indicator(read), span('read recipe', 'recipe'):
             gen.init()
             start, end = gen.recipe_in.duration
 
+        import numpy as np
+
         if args.per_lfp:
             lin = np.linspace(0, end, args.per_lfp)
             per_range = range(args.per_lfp)
@@ -236,7 +333,7 @@ class Cmds(TntCommon):
         read = meta() + status("making recipes", count=0)
 
         process_queue = []
-        with msgutils.msg_indicator(read):
+        with msgutils.msg_indicator(read), span('make recipes', 'recipe'):
 
             for item in master:
 
@@ -288,6 +385,60 @@ class Cmds(TntCommon):
             width=args.width,
             calibration_in=args.calibration_in)
 
+    def daemon(self, args):
+        """LFP Tool render daemon command
+
+        serves raw, warp and batch requests on a Unix socket until stopped,
+        with worker processes and caches kept warm between requests
+
+        :param args: `argparse.Namespace`, input arguments from LFP Tool
+        """
+
+        if self.debug:
+            pprint(vars(args))
+
+        self._set_print_help(args)
+
+        e = "--socket: no default socket path on this platform"
+        assert args.socket, ToolError(e, self.print_help)
+
+        render = daemon.Daemon(args.socket, args.processors, _remote_workers,
+                               self.__class__, args.make_parser,
+                               print_help=self.print_help)
+        render.serve()
+
+    @traced(cat='cmd')
+    def extract(self, args):
+        """LFP Tool embedded image extraction command
+
+        outputs:
+            encoded images and depth maps stored in packed warp LFP files,
+            copied from the file without TNT processing
+
+        :param args: `argparse.Namespace`, input arguments from LFP Tool
+        """
+
+        if self.debug:
+            pprint(vars(args))
+
+        self._set_print_help(args)
+
+        src = tool.search(args.paths, warp=True, unpacked=False,
+                          file_pattern=args.file_pattern,
+                          file_range=args.file_range,
+                          processors=args.processors)
+
+        self._assert_src(src, args.paths, 'extract', range_=args.file_range)
+        paths = [(x, y.path) for x, y in enumerate(src, start=1)]
+
+        self._multiprocess(
+            worker=_warp_worker,
+            master=paths,
+            processors=args.processors,
+            action='extract',
+            depth=args.depth,
+            dir_out=args.dir_out)
+
     def four_d(self, args):
         """LFP Tool 4D coordinate calculation command
 
@@ -391,14 +542,113 @@ class Cmds(TntCommon):
                 status(msg.format("displaying"))
                 msgutils.dumps(data, indent=False)
 
-    def raw(self, args):
-        """LFP Tool raw processing command
+    def _manifest_tasks(self, plan, src):
+        """expands the jobs of a manifest into unique raw tasks
 
-        outputs:
-            standard/lightfield/depth map image
-            warp LFP files
-            unpacked warp LFP images and metadata
-            base recipe metadata from raw LFP files
+        output directories, recipes and per-LFP render values are checked
+        or resolved once, however many tasks share them
+
+        :param plan: <Manifest>, job manifest
+        :param src: `list`, <Lfp> objects found for the manifest's inputs
+        :return: `tuple`, (count, path, task keyword arguments) tuples and
+                 the number of tasks before duplicates were dropped
+        :raise: `ToolError` if a job has no LFPs, sets invalid values or
+                arguments its action does not use, or two tasks write the
+                same output file
+        """
+
+        dirs, recipes, metas = {}, {}, {}
+        seen, outputs = set(), set()
+        tasks = []
+        expanded = 0
+
+        def check_dir(path):
+            if path not in dirs:
+                dirs[path] = self._check_dir(path)
+            return dirs[path]
+
+        for job in plan.jobs:
+            action = job['action']
+            where = "manifest job {}: ".format(job['name'])
+
+            lfps = plan.select(job, src)
+            e = where + "no valid LFP files found: " + ', '.join(job['inputs'])
+            assert lfps, ToolError(e, self.print_help)
+
+            for values in plan.variants(job):
+                ns = argparse.Namespace(**dict.fromkeys(manifest.arguments))
+                vars(ns).update(values)
+                self._manifest_values(ns, action)
+                kwds = self._raw_kwds(ns, action, check_dir(ns.dir_out))
+
+                unused = sorted(job['own'] - set(kwds))
+                e = where + "argument(s) not used by {}: {}".format(
+                    action, ', '.join(unused))
+                assert not unused, ToolError(e, self.print_help)
+
+                recipe = kwds.get('recipe_in')
+                if recipe:
+                    if recipe not in recipes:
+                        recipes[recipe] = self.set_recipe_in(recipe)
+                    kwds['recipe_in'] = recipes[recipe]
+
+                for lfp in lfps:
+                    expanded += 1
+                    kw = dict(kwds)
+
+                    if job['output']:
+                        kw['image_out'] = plan.output(job, lfp.path, kw)
+
+                    key = json.dumps([lfp.path, action, kw], sort_keys=True)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    if 'image_out' in kw:
+                        e = "manifest: more than one task writes " + \
+                            kw['image_out']
+                        assert kw['image_out'] not in outputs, \
+                            ToolError(e, self.print_help)
+                        outputs.add(kw['image_out'])
+                        check_dir(os.path.dirname(kw['image_out']))
+
+                    if action == 'image_out':
+                        m = lfp.path, kw['calibration_in'], kw['height'], \
+                            kw['width']
+                        if m not in metas:
+                            metas[m] = self.lfp_meta(lfp, *m[1:])
+                        kw['lfp_meta'] = metas[m]
+
+                    kw['action'] = action
+                    tasks.append((len(tasks) + 1, lfp.path, kw))
+
+        return tasks, expanded
+
+    def _manifest_values(self, args, action):
+        """checks and converts the argument values of one manifest task
+        as the command line parser would, so bad values fail while planning
+        rather than in a worker
+
+        :param args: `argparse.Namespace`, task arguments, updated in place
+        :param action: `str`, raw action of the task
+        :raise: `ToolError` if a value has the wrong type or is not one of
+                the argument's choices
+        """
+
+        for key in manifest.arguments:
+            value = getattr(args, key)
+            if value or value == 0:
+                setattr(args, key, getattr(tnt, key).type_(value))
+
+        self._reps_sanity(action, args.imagerep, args.depthrep)
+
+    @traced(cat='cmd')
+    def manifest(self, args):
+        """LFP Tool job manifest command
+
+        runs every job of a manifest (see `manifest`) as one multiprocessing
+        run: the inputs of all jobs are searched once, and tasks that more
+        than one job asks for are run once
 
         :param args: `argparse.Namespace`, input arguments from LFP Tool
         """
@@ -407,52 +657,46 @@ class Cmds(TntCommon):
             pprint(vars(args))
 
         self._set_print_help(args)
-        self._mutual(args, args.raw_action)
-        raw_in = args.raw_action == 'raw2lfp'
 
-        image = []
+        msg = msgutils.msg
 
-        if args.raw_action == 'depth_out':
-            depth = tnt.depthrep_depth.choices
-        else:
-            depth = tnt.depthrep.choices
+        def msg_item(a, b):
+            msg(msgutils.item(a, b, rjust=17), indent=True)
 
-        if args.raw_action in ('lfp_out', 'unpack'):
-            image = tnt.imagerep_lfp.choices
-        elif args.raw_action == 'image_out':
-            image = tnt.imagerep.choices
-        elif args.raw_action == 'eslf_out':
-            image = tnt.imagerep_eslf.choices
+        plan = Manifest(args.manifest, self.print_help)
+        src = tool.search(plan.inputs, raw=True, processors=args.processors)
+        self._assert_src(src, plan.inputs, 'manifest')
 
-        if image and args.imagerep:
-            _args = args.raw_action, args.imagerep, 'imagerep', image
-            self._rep_sanity(*_args)
+        tasks, expanded = self._manifest_tasks(plan, src)
 
-        if args.depthrep:
-            _args = args.raw_action, args.depthrep, 'depthrep', depth
-            self._rep_sanity(*_args)
+        msg("totals:")
+        msg_item("jobs", len(plan.jobs))
+        msg_item("LFPs", len(src))
+        msg_item("tasks", expanded)
+        msg_item("duplicates", expanded - len(tasks))
 
-        if raw_in:
-            src = tool.search_raw(args.paths)
-            src = [x for x in src]
-        else:
-            src = tool.search(args.paths, raw=True,
-                              file_range=args.file_range,
-                              file_pattern=args.file_pattern,
-                              processors=args.processors)
+        if self.verbose or args.dry_run:
+            msg("tasks:")
+            for i, path, kw in tasks:
+                out = kw.get('image_out') or kw.get('dir_out') or ''
+                msg_item(str(i).zfill(4), ' '.join(
+                    [kw['action'], path, out]).rstrip())
 
-        self._assert_src(src, args.paths, 'raw',
-                         raw_in=raw_in,
-                         range_=args.file_range)
+        if args.dry_run:
+            return
 
-        argutils.lens_match(perspective_u=args.perspective_u,
-                            perspective_v=args.perspective_v)
+        self._multiprocess(
+            worker=_raw_worker,
+            master=tasks,
+            processors=args.processors,
+            action='manifest')
 
-        dir_out = self._check_dir(args.dir_out)
-        args.recipe_in = self.set_recipe_in(args.recipe_in)
+    @staticmethod
+    def _raw_kwds(args, action, dir_out):
+        """:return: `dict`, keyword arguments of a ``raw`` action"""
 
         kwds = {}
-        if args.raw_action == 'image_out':
+        if action == 'image_out':
             kwds = dict(threads=args.threads,
                         calibration_in=args.calibration_in,
                         depth_in=args.depth_in,
@@ -466,7 +710,7 @@ class Cmds(TntCommon):
                         recipe_in=args.recipe_in,
                         width=args.width)
 
-        elif args.raw_action == 'lfp_out':
+        elif action == 'lfp_out':
             kwds = dict(threads=args.threads,
                         calibration_in=args.calibration_in,
                         depth_in=args.depth_in,
@@ -480,10 +724,10 @@ class Cmds(TntCommon):
                         recipe_in=args.recipe_in,
                         width=args.width)
 
-        elif args.raw_action == 'transcode':
+        elif action == 'transcode':
             kwds = dict(threads=args.threads)
 
-        elif args.raw_action == 'depth_out':
+        elif action == 'depth_out':
             kwds = dict(threads=args.threads,
                         dir_out=dir_out,
                         imagerep=args.imagerep,
@@ -492,17 +736,17 @@ class Cmds(TntCommon):
                         orientation=args.orientation,
                         calibration_in=args.calibration_in)
 
-        elif args.raw_action == 'eslf_out':
+        elif action == 'eslf_out':
             kwds = dict(threads=args.threads,
                         calibration_in=args.calibration_in,
                         dir_out=dir_out,
                         imagerep=args.imagerep)
 
-        elif args.raw_action == 'recipe_out':
+        elif action == 'recipe_out':
             kwds = dict(threads=args.threads,
                         dir_out=dir_out)
 
-        elif args.raw_action == 'unpack':
+        elif action == 'unpack':
             kwds = dict(threads=args.threads,
                         calibration_in=args.calibration_in,
                         depth_in=args.depth_in,
@@ -516,30 +760,152 @@ class Cmds(TntCommon):
                         recipe_in=args.recipe_in,
                         width=args.width)
 
-        elif args.raw_action == 'lfr2xraw':
+        elif action == 'lfr2xraw':
             kwds = dict(threads=args.threads,
                         calibration_in=args.calibration_in,
                         dir_out=dir_out)
 
-        elif args.raw_action == 'lfp2raw':
+        elif action == 'lfp2raw':
             kwds = dict(threads=args.threads,
                         dir_out=dir_out)
 
-        elif args.raw_action == 'raw2lfp':
+        elif action == 'raw2lfp':
             kwds = dict(threads=args.threads,
                         dir_out=dir_out)
 
-        def path(): return x, y if raw_in else y.path
+        return kwds
+
+    def _focus_sweep(self, args):
+        """expands ``--focus-sweep``/``--focus-list`` into focus values
+
+        :param args: `argparse.Namespace`, input arguments from LFP Tool
+        :return: `list`, focus values, None if no sweep was requested
+        :raise: `ToolError` if the sweep has less than two steps
+        """
+
+        if getattr(args, 'focus_list', None):
+            values = args.focus_list
+
+        elif getattr(args, 'focus_sweep', None):
+            start, stop, steps = args.focus_sweep
+            e = "--focus-sweep: STEPS must be an integer of 2 or more: "
+            e += str(steps)
+            valid = steps >= 2 and not steps % 1
+            assert valid, ToolError(e, self.print_help)
+
+            step = (stop - start) / (int(steps) - 1.0)
+            values = [round(start + step * n, 6) for n in range(int(steps))]
+
+        else:
+            return None
+
+        if args.focus is not None:
+            ToolWarn("--focus-sweep/--focus-list overrides --focus")
+        if args.recipe_in:
+            ToolWarn("using --recipe-in overrides the focus sweep")
+
+        return values
+
+    def _image_tasks(self, src, kwds):
+        """splits image renders into one task per (LFP, focus, u, v)
+
+        per-LFP values are resolved once, from the LFPs already read by the
+        search, and shared by all of an LFP's tasks; the focus and
+        perspective lists are removed from `kwds`
+
+        :param src: `list`, <Lfp> objects to render
+        :param kwds: `dict`, ``image_out`` keyword arguments
+        :return: `list`, (count, path, task keyword arguments) tuples
+        """
+
+        focus = kwds.pop('focus', None)
+        focus = focus if isinstance(focus, list) else [focus]
+        pers_u = kwds.pop('perspective_u', None) or [None]
+        pers_v = kwds.pop('perspective_v', None) or [None]
+        views = [dict(focus=f, perspective_u=u, perspective_v=v)
+                 for f in focus for u, v in zip(pers_u, pers_v)]
+
+        tasks = []
+        for lfp in src:
+            meta = self.lfp_meta(lfp, kwds['calibration_in'],
+                                 kwds['height'], kwds['width'])
+
+            for view in views:
+                task = dict(view, lfp_meta=meta)
+                tasks.append((len(tasks) + 1, lfp.path, task))
+
+        return tasks
+
+    @traced(cat='cmd')
+    def raw(self, args):
+        """LFP Tool raw processing command
+
+        outputs:
+            standard/lightfield/depth map image
+            warp LFP files
+            unpacked warp LFP images and metadata
+            base recipe metadata from raw LFP files
+
+        :param args: `argparse.Namespace`, input arguments from LFP Tool
+        """
+
+        if self.debug:
+            pprint(vars(args))
+
+        self._set_print_help(args)
+        actions = args.plan or [args.raw_action]
+        self._mutual(args, actions)
+
+        focus = self._focus_sweep(args)
+        if focus:
+            e = "--focus-sweep/--focus-list: requires --image-out"
+            assert 'image_out' in actions, ToolError(e, self.print_help)
+            args.focus = focus
+        raw_in = args.raw_action == 'raw2lfp' and not args.plan
+
+        for action in actions:
+            self._reps_sanity(action, args.imagerep, args.depthrep)
+
+        if raw_in:
+            src = tool.search_raw(args.paths)
+            src = [x for x in src]
+        else:
+            src = tool.search(args.paths, raw=True,
+                              file_range=args.file_range,
+                              file_pattern=args.file_pattern,
+                              processors=args.processors)
+
+        self._assert_src(src, args.paths, 'raw',
+                         raw_in=raw_in,
+                         range_=args.file_range)
+
+        argutils.lens_match(perspective_u=args.perspective_u,
+                            perspective_v=args.perspective_v)
+
+        dir_out = self._check_dir(args.dir_out)
+        args.recipe_in = self.set_recipe_in(args.recipe_in)
 
-        paths = [path() for x, y in enumerate(src, start=1)]
+        if args.plan:
+            kwds = dict(plan=od((a, self._raw_kwds(args, a, dir_out))
+                                for a in args.plan))
+            kwds['action'] = 'plan'
+        else:
+            kwds = self._raw_kwds(args, args.raw_action, dir_out)
+            kwds['action'] = args.raw_action
+
+        def path(): return x, y if raw_in else y.path
 
-        kwds['action'] = args.raw_action
+        if args.raw_action == 'image_out' and not args.plan:
+            paths = self._image_tasks(src, kwds)
+        else:
+            paths = [path() for x, y in enumerate(src, start=1)]
 
         self._multiprocess(
             worker=_raw_worker,
             master=paths,
             processors=args.processors, **kwds)
 
+    @traced(cat='cmd')
     def warp(self, args):
         """LFP Tool warp processing command
 
@@ -603,6 +969,79 @@ class Cmds(TntCommon):
             processors=args.processors,
             **kwds)
 
+    def watch(self, args):
+        """LFP Tool watch folder command
+
+        processes raw LFP files as they appear in (or change in) the watched
+        directories, each as a ``raw`` run with the given arguments, on
+        worker processes kept for the whole session (see `watch`)
+
+        :param args: `argparse.Namespace`, input arguments from LFP Tool
+        """
+
+        if self.debug:
+            pprint(vars(args))
+
+        self._set_print_help(args)
+
+        e = "--raw2lfp: RAW image files can not be watched"
+        raw_in = args.raw_action == 'raw2lfp' and not args.plan
+        assert not raw_in, ToolError(e, self.print_help)
+
+        file_filter = partial(utils.file_filter,
+                              file_range=args.file_range,
+                              file_pattern=args.file_pattern)
+
+        # keep the pool busy without a waiting thread per dropped file
+        watcher = watch.Watcher(args.paths, args.cursor, args.settle,
+                                file_filter, limit=args.processors * 2,
+                                print_help=self.print_help)
+
+        daemon.warm()
+        pool = daemon.Pool(args.processors, _remote_workers)
+
+        def handle(path):
+
+            # validates the file and caches it for the search `raw` does
+            if not tool.search(path, raw=True):
+                return 'invalid'
+
+            job = copy(args)
+            job.paths = [path]
+            job.print_help = object
+
+            cmds = self.__class__()
+            cmds.verbose = self.verbose
+            cmds.schedule = self.schedule
+            cmds.pool = pool
+            cmds.raw(job)
+            return 'done'
+
+        try:
+            watcher.run(handle, args.interval)
+        finally:
+            pool.close()
+
+    @traced(cat='cmd')
+    def worker(self, args):
+        """LFP Tool remote worker command
+
+        runs the tasks of a ``--serve`` coordinator; input and output paths
+        are used as given by the coordinator, so they must resolve to the
+        same files on this machine (a shared file system)
+
+        :param args: `argparse.Namespace`, input arguments from LFP Tool
+        """
+
+        if self.debug:
+            pprint(vars(args))
+
+        self._set_print_help(args)
+
+        count = distrib.work(args.connect, _remote_workers, name=args.name,
+                             print_help=self.print_help)
+        msgutils.msg("worker done: ({}) task(s)".format(str(count).zfill(4)))
+
 
 _work_cmds = TntCommon()
 
@@ -616,7 +1055,7 @@ def _batch_worker(task, kwds, lock=None, verbose=False):
     _work_cmds.verbose = verbose
     _work_cmds.validate_recipe = False
 
-    for item in iter(task.get, 'STOP'):
+    for item in iter(traced('get', 'queue')(task.get), 'STOP'):
         i, lfp, image, recipe = item
         process(lfp, i=i, image_out=image, recipe_in=recipe)
         task.task_done()
@@ -626,33 +1065,27 @@ def _batch_worker(task, kwds, lock=None, verbose=False):
 
 def _raw_worker(task, kwds, lock=None, verbose=False):
 
-    action = kwds['action']
+    default_action = kwds['action']
     del kwds['action']
 
     _work_cmds.lock = lock
     _work_cmds.verbose = verbose
     _work_cmds.validate_recipe = False
 
-    for item in iter(task.get, 'STOP'):
+    for item in iter(traced('get', 'queue')(task.get), 'STOP'):
 
-        i, path = item
+        i, path = item[:2]
         kw = copy(kwds)
 
-        if action == 'image_out':
-            image_out = partial(_work_cmds.raw_image_out, i=i)
-
-            pers_u = [u for u in kw['perspective_u']]
-            pers_v = [v for v in kw['perspective_v']]
+        # fanned out tasks carry their own arguments, see Cmds._image_tasks;
+        # manifest tasks their own action too, see Cmds._manifest_tasks
+        if len(item) > 2:
+            kw.update(item[2])
 
-            del kw['perspective_u']
-            del kw['perspective_v']
+        action = kw.pop('action', default_action)
 
-            if pers_u:
-                for j, u in enumerate(pers_u):
-                    v = pers_v[j]
-                    image_out(path, perspective_u=u, perspective_v=v, **kw)
-            else:
-                image_out(path, **kw)
+        if action == 'image_out':
+            _work_cmds.raw_image_out(path, i=i, **kw)
 
         elif action == 'lfp_out':
             _work_cmds.raw_lfp_out(path, i=i, **kw)
@@ -681,6 +1114,9 @@ def _raw_worker(task, kwds, lock=None, verbose=False):
         elif action == 'raw2lfp':
             _work_cmds.raw_raw2lfp(path, i=i, **kw)
 
+        elif action == 'plan':
+            _work_cmds.raw_plan(path, i=i, **kw)
+
         task.task_done()
 
     task.task_done()
@@ -695,7 +1131,7 @@ def _warp_worker(task, kwds, lock=None, verbose=False):
     _work_cmds.lock = lock
     _work_cmds.verbose = verbose
 
-    for item in iter(task.get, 'STOP'):
+    for item in iter(traced('get', 'queue')(task.get), 'STOP'):
 
         i, path = item
 
@@ -708,9 +1144,17 @@ def _warp_worker(task, kwds, lock=None, verbose=False):
         elif action == 'unpack':
             _work_cmds.warp_unpack(path, i=i, **kwds)
 
+        elif action == 'extract':
+            _work_cmds.warp_extract(path, i=i, **kwds)
+
         elif action == 'recipe_out':
             _work_cmds.recipe_out(path, i=i, **kwds)
 
         task.task_done()
 
     task.task_done()
+
+
+# worker functions ``lfptool worker`` may be asked to run
+_remote_workers = dict((w.__name__, w) for w in
+                       (_batch_worker, _raw_worker, _warp_worker))
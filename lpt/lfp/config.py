@@ -56,7 +56,17 @@ elif sys.platform == 'win32':
     lytro_home = abspath(profile, 'AppData\Local\Lytro')
 
 else:
-    raise OSError("unsupported operating system: " + sys.platform)
+    # other POSIX systems (e.g. Linux hosts running ``lfptool worker``) use
+    # the XDG config home; no TNT binary ships for them, so one has to be
+    # provided through $LPT_TNT
+    tnt = abspath(dir_bin, 'tnt')
+    home = os.getenv('XDG_CONFIG_HOME') or abspath(os.path.expanduser('~'),
+                                                   '.config')
+    lytro_home = abspath(home, 'lytro')
+
+# a TNT binary or configuration directory other than the platform's default
+tnt = os.getenv('LPT_TNT') or tnt
+lytro_home = os.getenv('LPT_LYTRO_HOME') or lytro_home
 
 output_jsn = '.jsn'
 output_lfp = '.lfp'
@@ -77,14 +87,24 @@ imagerep_lfp_out = 'jpeg', 'png', 'tiff'
 depthrep_lfp_out = 'bmp', 'png', 'dat'
 depthrep_depth_out = 'bmp', 'png'
 bools = True, False, None, 0, 1
-cpu_count = multiprocessing.cpu_count()
-cpus = range(1, cpu_count + 1)
-powertools_cfg = abspath(lytro_home, 'lytro-power-tools.cfg')
+powertools_cfg = abspath(lytro_home, 'lytro-power-tools.cfg') if lytro_home else None
+timings_json = abspath(lytro_home, 'lfptool-timings.json') if lytro_home else None
+schedules = 'longest', 'path'
+daemon_socket = abspath(lytro_home, 'lfptool.sock') if lytro_home else None
+watch_cursor = abspath(lytro_home, 'lfptool-watch.json') if lytro_home else None
+
+
+def cpu_count():
+    """:return: number of available processors"""
+
+    return multiprocessing.cpu_count()
+
+
+def cpus():
+    """:return: valid ``processors`` configuration values"""
+
+    return range(1, cpu_count() + 1)
 
-if os.path.exists(abspath(lytro_home, 'cameras')):
-    dflt_calibration_in = abspath(lytro_home, 'cameras')
-else:
-    dflt_calibration_in = None
 
 # user configuration initialization
 #
@@ -93,17 +113,63 @@ else:
 #
 #
 
-config = ConfigParser.ConfigParser()
-config.read(powertools_cfg)
-write = False
 
-if not config.has_section(__prog__):
-    config.add_section(__prog__)
-if not os.path.exists(lytro_home):
-    os.makedirs(lytro_home)
+class _Db(od):
+    """user configuration values
+
+    behaves as a `collections.OrderedDict`; the configuration file is only
+    read (and created/updated with missing defaults) on first access, which
+    keeps importing this module free of file system side effects
+
+    :param defaults: `list`, (option, default value) pairs
+    """
+
+    def __init__(self, defaults):
+
+        # populating defaults goes through __contains__; hold off loading
+        self._loaded = True
+        od.__init__(self, defaults)
+        self._loaded = False
+
+    def _load(self):
+
+        if self._loaded:
+            return
+
+        self._loaded = True
+        load(self)
+
+    def __getitem__(self, key):
+        self._load()
+        return od.__getitem__(self, key)
+
+    def __iter__(self):
+        self._load()
+        return od.__iter__(self)
 
-db = od([
-    ('calibration_in', dflt_calibration_in),
+    def __contains__(self, key):
+        self._load()
+        return od.__contains__(self, key)
+
+    def __len__(self):
+        self._load()
+        return od.__len__(self)
+
+    def __repr__(self):
+        self._load()
+        return od.__repr__(self)
+
+    def get(self, key, default=None):
+        self._load()
+        return od.get(self, key, default)
+
+    def copy(self):
+        self._load()
+        return od(self.items())
+
+
+db = _Db([
+    ('calibration_in', None),
     ('imagerep_raw_depth_out', 'tiff'),
     ('imagerep_raw_eslf_out', 'png'),
     ('imagerep_raw_image_out', 'tiff'),
@@ -121,35 +187,65 @@ db = od([
     ('verbose', False),
 ])
 
-for option, value in db.items():
-    if config.has_option(__prog__, option):
 
-        config_value = config.get(__prog__, option)
+def load(db_):
+    """reads user configuration into `db_`, writing missing defaults back
 
-        if re.match(r'^\d+?\.\d+?$', config_value):
-            config_value = config.getfloat(__prog__, option)
+    :param db_: `_Db`, configuration values to update
+    :raise: `OSError` on unsupported operating systems
+    """
 
-        elif config_value.isdigit():
-            config_value = config.getint(__prog__, option)
+    if not lytro_home:
+        raise OSError("unsupported operating system: " + sys.platform)
 
-        elif config_value in ('False', 'True'):
-            config_value = config.getboolean(__prog__, option)
+    if os.path.exists(abspath(lytro_home, 'cameras')):
+        od.__setitem__(db_, 'calibration_in', abspath(lytro_home, 'cameras'))
 
-        elif config_value == 'None':
-            config.set(__prog__, option, value)
-            config_value = value
+    config = ConfigParser.ConfigParser()
+    config.read(powertools_cfg)
+    write = False
+
+    if not config.has_section(__prog__):
+        config.add_section(__prog__)
+    try:
+        os.makedirs(lytro_home)
+    except OSError:
+        # several workers may start at once on a new host
+        if not os.path.isdir(lytro_home):
+            raise
+
+    for option, value in db_.items():
+        if config.has_option(__prog__, option):
+
+            config_value = config.get(__prog__, option)
+
+            if re.match(r'^\d+?\.\d+?$', config_value):
+                config_value = config.getfloat(__prog__, option)
+
+            elif config_value.isdigit():
+                config_value = config.getint(__prog__, option)
+
+            elif config_value in ('False', 'True'):
+                config_value = config.getboolean(__prog__, option)
+
+            elif config_value == 'None':
+                config.set(__prog__, option, value)
+                config_value = value
+                write = True
+
+            db_[option] = config_value
+
+        else:
             write = True
+            config.set(__prog__, option, value)
 
-        db[option] = config_value
+    if write:
+        with open(powertools_cfg, 'w') as f:
+            config.write(f)
+            config.read(powertools_cfg)
 
-    else:
-        write = True
-        config.set(__prog__, option, value)
+    _sanity(db_)
 
-if write:
-    with open(powertools_cfg, 'w') as f:
-        config.write(f)
-        config.read(powertools_cfg)
 
 # sanity checks
 #
@@ -158,27 +254,31 @@ if write:
 #
 #
 
-for obj, opts in [('imagerep_raw_depth_out', imagerep_image_out),
-                  ('imagerep_raw_image_out', imagerep_image_out),
-                  ('imagerep_raw_eslf_out', imagerep_eslf),
-                  ('imagerep_raw_lfp_out', imagerep_lfp_out),
-                  ('imagerep_raw_unpack', imagerep_lfp_out),
-                  ('imagerep_warp_pack', imagerep_lfp_out),
-                  ('imagerep_warp_unpack', imagerep_lfp_out),
-                  ('depthrep_raw_depth_out', depthrep_depth_out),
-                  ('depthrep_raw_lfp_out', depthrep_lfp_out),
-                  ('depthrep_raw_unpack', depthrep_lfp_out),
-                  ('depthrep_warp_pack', depthrep_lfp_out),
-                  ('depthrep_warp_unpack', depthrep_lfp_out),
-                  ('processors', cpus),
-                  ('verbose', bools),
-                  ('validate', bools)]:
-
-    opt_str = ', '.join([str(x) for x in opts])
-    val = db[obj]
-
-    err = "invalid {} option in {}'s configuration ({}): {}"
-    err = err.format(obj, __prog__, powertools_cfg, val)
-    err += " (options: {})".format(opt_str) if opts else ''
-
-    assert val in opts, err
+
+def _sanity(db_):
+    """:raise: `AssertionError` on invalid configuration items"""
+
+    for obj, opts in [('imagerep_raw_depth_out', imagerep_image_out),
+                      ('imagerep_raw_image_out', imagerep_image_out),
+                      ('imagerep_raw_eslf_out', imagerep_eslf),
+                      ('imagerep_raw_lfp_out', imagerep_lfp_out),
+                      ('imagerep_raw_unpack', imagerep_lfp_out),
+                      ('imagerep_warp_pack', imagerep_lfp_out),
+                      ('imagerep_warp_unpack', imagerep_lfp_out),
+                      ('depthrep_raw_depth_out', depthrep_depth_out),
+                      ('depthrep_raw_lfp_out', depthrep_lfp_out),
+                      ('depthrep_raw_unpack', depthrep_lfp_out),
+                      ('depthrep_warp_pack', depthrep_lfp_out),
+                      ('depthrep_warp_unpack', depthrep_lfp_out),
+                      ('processors', cpus()),
+                      ('verbose', bools),
+                      ('validate', bools)]:
+
+        opt_str = ', '.join([str(x) for x in opts])
+        val = db_[obj]
+
+        err = "invalid {} option in {}'s configuration ({}): {}"
+        err = err.format(obj, __prog__, powertools_cfg, val)
+        err += " (options: {})".format(opt_str) if opts else ''
+
+        assert val in opts, err
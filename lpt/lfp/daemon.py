@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - lfp package - long-running render daemon"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# render daemon
+#
+# a one-off lfptool call pays for interpreter start up, configuration and
+# argument parser set up, a full search and new worker processes.  the
+# daemon pays for these once: schema validators are built up front, worker
+# processes are started once (after the warm up, so they inherit it) and
+# kept for every job, and search results are cached by file path, size and
+# modification time (see `Tool.cache`).
+#
+# clients connect to a Unix socket and send one request, a JSON line with
+# the command line of a `raw`, `warp`, `batch` or `manifest` call:
+#
+#   {"argv": ["raw", "-i", "/data/IMG_0001.lfr", "--image-out"]}
+#
+# and receive JSON lines until the job is finished (see `distrib` for the
+# framing):
+#
+#   {"op": "accepted", "job": 1, "command": "raw"}
+#   {"op": "task", "job": 1, "task": 0, "done": 1, "total": 1,
+#    "seconds": 2.1, "error": null}
+#   {"op": "done", "job": 1, "seconds": 2.3}      or
+#   {"op": "error", "job": 1, "message": "..."}
+#
+
+import Queue
+import SocketServer
+import collections
+import copy
+import itertools
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from lpt.lfp import config
+from lpt.lfp.distrib import _Channel
+from lpt.lfp.tool import Tool
+from lpt.utils.jsonutils import JsonUtils
+from lpt.utils.msgutils import MsgUtils
+from lpt.utils.msgutils import ToolError
+from lpt.utils.utils import Utils
+
+jsonutils = JsonUtils()
+msgutils = MsgUtils()
+utils = Utils()
+
+commands = 'raw', 'warp', 'batch', 'manifest'
+poll = 1.
+
+
+def _message(e):
+    """:return: `str`, bare message of an exception"""
+
+    return str(e).split('ERROR: ', 1)[-1].strip() or e.__class__.__name__
+
+
+def warm():
+    """builds the caches shared by every job of a long-running process"""
+
+    # progress indicators add a fixed half second per search and per TNT
+    # call, and nobody watches a long-running process's output
+    Tool.mute = True
+    Tool.cache = collections.OrderedDict()
+
+    if config.db['validate']:
+        schemas = utils.walk_path(config.dir_schema,
+                                  pattern=r'.+_schema\.json$')
+        [jsonutils._validator(s) for s in schemas]
+
+
+class _OneTask(object):
+    """queue view that hands a `cmds` worker function a single task"""
+
+    def __init__(self, task):
+        self._items = [task, 'STOP']
+
+    def get(self):
+        return self._items.pop(0)
+
+    def task_done(self):
+        pass
+
+
+def _pool_worker(tasks, results, workers, lock):
+    """`Pool` process; runs tasks of any job until told to stop"""
+
+    pid = os.getpid()
+
+    for item in iter(tasks.get, 'STOP'):
+        job_id, n, name, kwds, verbose, task = item
+        results.put(('start', pid, job_id, n))
+
+        start = time.time()
+        error = None
+
+        try:
+            workers[name](_OneTask(task), copy.deepcopy(kwds), lock, verbose)
+        except Exception as e:
+            error = _message(e)
+
+        results.put(('done', pid, job_id, n, time.time() - start, error))
+
+
+class _Job(object):
+    """tasks of one `Cmds._multiprocess` call queued on a `Pool`
+
+    :param total: `int`, number of tasks
+    :param status: `object`, called with task, done, total, seconds and
+                   error keywords after every task
+    """
+
+    def __init__(self, total, status=None):
+
+        self.total = total
+        self.status = status
+        self.seconds = {}
+        self.errors = {}
+        self.failure = None
+        self._finished = threading.Event()
+
+        if not total:
+            self._finished.set()
+
+    def done(self, n, seconds, error=None):
+        """records a finished task"""
+
+        if n in self.seconds:
+            return
+
+        self.seconds[n] = seconds
+        if error:
+            self.errors[n] = error
+
+        if self.status:
+            self.status(task=n, done=len(self.seconds), total=self.total,
+                        seconds=seconds, error=error)
+
+        if len(self.seconds) == self.total:
+            self._finished.set()
+
+    @property
+    def finished(self):
+        return self._finished.is_set()
+
+    def fail(self, message):
+        """gives up on the tasks not yet done, see `wait`"""
+
+        self.failure = message
+        self._finished.set()
+
+    def wait(self, timeout=None):
+        """waits for every task
+
+        :param timeout: `float`, seconds to wait at most, None for no limit
+        :return: `dict`, measured seconds by task index
+        :raise: `ToolError` if the job timed out or was given up on
+        """
+
+        deadline = None if timeout is None else time.time() + timeout
+
+        while not self._finished.is_set():
+            wait = poll
+
+            if deadline is not None:
+                wait = min(wait, deadline - time.time())
+                e = "job timed out after {}s".format(timeout)
+                assert wait > 0, ToolError(e)
+
+            self._finished.wait(wait)
+
+        assert self.failure is None, ToolError(self.failure)
+        return self.seconds
+
+
+class Pool(object):
+    """worker processes shared by every job of the daemon
+
+    processes that die are replaced; the task they were running is failed.
+    jobs still queued when the pool is closed are given up on
+
+    :param processors: `int`, number of worker processes
+    :param workers: `dict`, `cmds` worker functions by name
+    """
+
+    def __init__(self, processors, workers):
+
+        self.workers = workers
+        self.lock = multiprocessing.Lock()
+        self.tasks = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        self.jobs = {}
+        self.procs = {}
+        self.running = {}
+
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        for _ in range(processors):
+            self._start()
+
+        collector = threading.Thread(target=self._collect)
+        collector.daemon = True
+        collector.start()
+
+    def _start(self):
+
+        args = self.tasks, self.results, self.workers, self.lock
+        p = multiprocessing.Process(target=_pool_worker, args=args)
+        p.daemon = True
+        p.start()
+        self.procs[p.pid] = p
+
+    def submit(self, job, master, order, status=None):
+        """queues the tasks of a job
+
+        :param job: `dict`, `worker` (worker function name), `kwds` (its
+                    keyword arguments) and `verbose`
+        :param master: `list`, tasks
+        :param order: `iter`, indices into `master` in queueing order
+        :param status: `object`, per task callback, see `_Job`
+        :return: `_Job`, handle to wait on
+        """
+
+        handle = _Job(len(master), status)
+
+        with self._lock:
+            job_id = next(self._ids)
+            self.jobs[job_id] = handle
+
+        for n in order:
+            self.tasks.put((job_id, n, job['worker'], job['kwds'],
+                            job['verbose'], master[n]))
+
+        return handle
+
+    def _done(self, job_id, n, seconds, error=None):
+
+        with self._lock:
+            handle = self.jobs.get(job_id)
+
+        if handle:
+            handle.done(n, seconds, error)
+            if handle.finished:
+                with self._lock:
+                    del self.jobs[job_id]
+
+    def _fail_jobs(self, message):
+
+        with self._lock:
+            jobs = self.jobs.values()
+            self.jobs = {}
+
+        [handle.fail(message) for handle in jobs]
+
+    def _result(self, result):
+        """handles one worker message
+        :return: `bool`, False once the pool is closed"""
+
+        if result == 'STOP':
+            return False
+
+        if result[0] == 'start':
+            _, pid, job_id, n = result
+            self.running[pid] = job_id, n, time.time()
+        else:
+            _, pid, job_id, n, seconds, error = result
+            self.running.pop(pid, None)
+            self._done(job_id, n, seconds, error)
+
+        return True
+
+    def _drain(self):
+        """handles every message already sent
+        :return: `bool`, False once the pool is closed"""
+
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except Queue.Empty:
+                return True
+
+            if not self._result(result):
+                return False
+
+    def _reap(self):
+        """replaces dead worker processes
+        :return: `bool`, False once the pool is closed"""
+
+        dead = [pid for pid, p in self.procs.items() if not p.is_alive()]
+
+        # a worker that finished its task and then died has sent the result
+        # before exiting; it counts, rather than the exit
+        if dead and not self._drain():
+            return False
+
+        for pid in dead:
+            p = self.procs.pop(pid, None)
+            if not p:
+                continue
+
+            self._start()
+
+            if pid in self.running:
+                job_id, n, start = self.running.pop(pid)
+                e = "worker process exited ({})".format(p.exitcode)
+                self._done(job_id, n, time.time() - start, e)
+
+        return True
+
+    def _collect(self):
+
+        try:
+            while self.procs:
+                try:
+                    result = self.results.get(timeout=poll)
+                except Queue.Empty:
+                    pass
+                else:
+                    if not self._result(result) or not self._drain():
+                        break
+
+                if not self._reap():
+                    break
+        finally:
+            self._fail_jobs("worker pool closed")
+
+    def close(self):
+        """stops the worker processes; unfinished jobs fail"""
+
+        procs = self.procs.values()
+        self.procs = {}
+
+        [self.tasks.put('STOP') for _ in procs]
+        [p.join(poll) for p in procs]
+        self.results.put('STOP')
+        self._fail_jobs("worker pool closed")
+
+
+class _Handler(SocketServer.StreamRequestHandler):
+    """serves one request"""
+
+    def handle(self):
+
+        channel = _Channel(self.request)
+
+        try:
+            request = channel.recv()
+        except (EOFError, ValueError, socket.error):
+            channel.close()
+            return
+
+        try:
+            self.server.daemon.run(request, channel)
+        finally:
+            channel.close()
+
+
+class _Server(SocketServer.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class Daemon(object):
+    """serves render requests from a warm worker pool
+
+    :param path: `str`, Unix socket path
+    :param processors: `int`, number of worker processes
+    :param workers: `dict`, `cmds` worker functions by name
+    :param factory: `object`, returns a new `Cmds` instance for a job
+    :param make_parser: `object`, returns the lfptool argument parser for a
+                        command line
+    :param print_help: `object`, passed to ToolError for command help menu
+    """
+
+    def __init__(self, path, processors, workers, factory, make_parser,
+                 print_help=object):
+
+        self.path = path
+        self.processors = processors
+        self.workers = workers
+        self.factory = factory
+        self.make_parser = make_parser
+        self.print_help = print_help
+
+        self.pool = None
+        self._ids = itertools.count(1)
+
+    def run(self, request, channel):
+        """runs one request, streaming its status to `channel`
+
+        :param request: `dict`, request; `argv`, lfptool command line
+        :param channel: `distrib._Channel`, client connection
+        """
+
+        job_id = next(self._ids)
+        argv = [str(a) for a in request.get('argv') or []]
+        start = time.time()
+
+        def send(op, **kwargs):
+            try:
+                channel.send(op, job=job_id, **kwargs)
+            except socket.error:
+                pass
+
+        def log(msg):
+            msgutils.msg("job {}: {}".format(job_id, msg))
+
+        log(' '.join(argv))
+
+        try:
+            e = "command must be one of: " + ', '.join(commands)
+            assert argv and argv[0] in commands, ToolError(e)
+
+            args = self.make_parser(argv).parse_args(argv)
+            args.print_help = object
+            cmds = self.factory()
+            cmds.verbose = args.verbose
+            cmds.schedule = args.schedule
+            cmds.pool = self.pool
+            cmds.status = lambda **kwargs: send('task', **kwargs)
+
+            send('accepted', command=argv[0])
+            getattr(cmds, argv[0])(args)
+
+        except (Exception, SystemExit) as e:
+            send('error', message=_message(e))
+            log("failed: " + _message(e))
+            return
+
+        seconds = time.time() - start
+        send('done', seconds=seconds)
+        log("done in {:.2f}s".format(seconds))
+
+    def _check_socket(self):
+        """removes a stale socket file
+        :raise: `ToolError` if another daemon is listening on it"""
+
+        if not os.path.exists(self.path):
+            return
+
+        sock = socket.socket(socket.AF_UNIX)
+
+        try:
+            sock.connect(self.path)
+        except socket.error:
+            os.remove(self.path)
+            return
+        finally:
+            sock.close()
+
+        e = "daemon already listening on " + self.path
+        raise ToolError(e, self.print_help)
+
+    def serve(self):
+        """serves requests until interrupted (SIGINT/SIGTERM)"""
+
+        self._check_socket()
+
+        # worker processes fork from a warm, single threaded daemon
+        warm()
+        self.pool = Pool(self.processors, self.workers)
+
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        server = _Server(self.path, _Handler)
+        server.daemon = self
+        os.chmod(self.path, 0600)
+
+        msg = "listening on {} with ({}) worker process(es)"
+        msgutils.msg(msg.format(self.path, str(self.processors).zfill(4)))
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.pool.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
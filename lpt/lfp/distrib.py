@@ -0,0 +1,465 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - lfp package - distributed task coordinator/worker"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# coordinator/worker mode
+#
+# the coordinator builds the task list as a local run would and serves it
+# over TCP; workers, on any machine that mounts the same file system, pull
+# tasks and run them with the regular `cmds` worker functions.  messages
+# are JSON objects, one per line:
+#
+#   worker              coordinator
+#   ------              -----------
+#   hello {worker}  ->
+#                   <-  job {worker, kwds, verbose}
+#   get             ->
+#                   <-  task {id, task} / wait / stop
+#   heartbeat {id}  ->                  (while a task runs)
+#   done {id, seconds, error}  ->
+#
+# a task is leased to a worker until it is done; leases that are not kept
+# alive by heartbeats, or whose worker disconnects, are requeued
+#
+# there is no authentication: anyone who can reach the port can take tasks
+# or feed back results, so the coordinator only listens on localhost unless
+# a host is given, and should only be exposed on trusted networks
+#
+
+import SocketServer
+import collections
+import copy
+import json
+import socket
+import threading
+import time
+
+from lpt.utils.jsonutils import JsonUtils
+from lpt.utils.msgutils import MsgUtils
+from lpt.utils.msgutils import ToolError
+from lpt.utils.msgutils import ToolWarn
+
+jsonutils = JsonUtils()
+msgutils = MsgUtils()
+
+od = collections.OrderedDict
+
+heartbeat = 5.
+lease = 30.
+poll = 1.
+connect_timeout = 30.
+localhost = '127.0.0.1'
+
+
+def parse_address(value):
+    """``[HOST]:PORT`` argument type
+
+    :param value: `str`, address to parse; an empty host means localhost,
+                  0.0.0.0 serves on all interfaces
+    :return: `tuple`, (host, port)
+    :raise: `ValueError` if `value` is not a valid address
+    """
+
+    host, sep, port = value.rpartition(':')
+
+    if not sep or not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(value)
+
+    return host, int(port)
+
+
+parse_address.__name__ = 'address'
+
+
+class _Channel(object):
+    """line delimited JSON messages over a socket
+
+    :param sock: `socket.socket`, connected socket
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.rfile = sock.makefile('rb')
+        self.wfile = sock.makefile('wb')
+        self.lock = threading.Lock()
+
+    def send(self, op, **kwargs):
+        """sends a message; safe to call from several threads"""
+
+        kwargs['op'] = op
+        line = json.dumps(kwargs) + '\n'
+
+        with self.lock:
+            self.wfile.write(line)
+            self.wfile.flush()
+
+    def recv(self):
+        """:return: `dict`, next message
+        :raise: `EOFError` if the connection was closed"""
+
+        line = self.rfile.readline()
+
+        if not line:
+            raise EOFError("connection closed")
+
+        return jsonutils.to_str(json.loads(line, object_pairs_hook=od))
+
+    def close(self):
+
+        for f in self.rfile, self.wfile:
+            try:
+                f.close()
+            except (IOError, socket.error):
+                pass
+
+        # processes forked meanwhile hold copies of the socket; shut the
+        # connection down rather than just dropping this reference
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+
+        self.sock.close()
+
+
+class _Handler(SocketServer.StreamRequestHandler):
+    """serves one worker connection"""
+
+    def handle(self):
+
+        coordinator = self.server.coordinator
+        channel = _Channel(self.request)
+        host, port = self.client_address[:2]
+        name = '{}:{}'.format(host, port)
+
+        try:
+            hello = channel.recv()
+            # leases are held per connection, worker names need not be unique
+            name = '{} ({})'.format(hello.get('worker') or host, name)
+            coordinator.joined(name)
+            channel.send('job', **coordinator.job)
+
+            while True:
+                message = channel.recv()
+                op = message['op']
+
+                if op == 'get':
+                    n, task = coordinator.lease(name)
+                    if n is None:
+                        channel.send(task)
+                        if task == 'stop':
+                            break
+                    else:
+                        channel.send('task', id=n, task=task)
+
+                elif op == 'heartbeat':
+                    coordinator.renew(message['id'], name)
+
+                elif op == 'done':
+                    coordinator.done(message['id'], name,
+                                     message.get('seconds', 0.),
+                                     message.get('error'))
+
+        except (EOFError, socket.error, ValueError):
+            pass
+
+        finally:
+            coordinator.lost(name)
+            channel.close()
+
+
+class _Server(SocketServer.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class Coordinator(object):
+    """serves tasks to remote workers and collects their results
+
+    :param address: `tuple`, (host, port) to listen on; an empty host
+                    listens on localhost only
+    :param job: `dict`, sent to every worker: `worker` (worker function
+                name), `kwds` (its keyword arguments) and `verbose`
+    :param master: `list`, tasks
+    :param order: `iter`, indices into `master` in queueing order
+    :param lease_time: `float`, seconds a task stays leased without a
+                       heartbeat
+    """
+
+    def __init__(self, address, job, master, order, lease_time=lease):
+
+        self.address = address[0] or localhost, address[1]
+        self.job = job
+        self.master = master
+        self.lease_time = lease_time
+
+        self.pending = collections.deque(order)
+        self.leases = {}
+        self.seconds = {}
+        self.errors = {}
+        self.workers = set()
+
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+
+        if not master:
+            self._finished.set()
+
+    def joined(self, name):
+        """notes a new worker connection"""
+
+        with self._lock:
+            self.workers.add(name)
+        msgutils.msg("worker connected : " + name)
+
+    def lease(self, name):
+        """hands out the next task
+
+        :param name: `str`, worker name
+        :return: `tuple`, (index, task), or (None, 'wait'/'stop') if no
+                 task is available now/anymore
+        """
+
+        with self._lock:
+            if self.pending:
+                n = self.pending.popleft()
+                self.leases[n] = [name, time.time() + self.lease_time]
+                return n, self.master[n]
+
+            if self._finished.is_set():
+                return None, 'stop'
+
+            return None, 'wait'
+
+    def renew(self, n, name):
+        """extends the lease of a running task"""
+
+        with self._lock:
+            held = self.leases.get(n)
+            if held and held[0] == name:
+                held[1] = time.time() + self.lease_time
+
+    def done(self, n, name, seconds, error=None):
+        """records a finished task; repeated results are ignored"""
+
+        with self._lock:
+            self.leases.pop(n, None)
+
+            if n in self.seconds:
+                return
+            if n in self.pending:
+                self.pending.remove(n)
+
+            self.seconds[n] = seconds
+            if error:
+                self.errors[n] = (name, error)
+
+            if len(self.seconds) == len(self.master):
+                self._finished.set()
+
+        if error:
+            ToolWarn("{}: task {} failed: {}".format(name, n, error))
+
+    def _requeue(self, leases, reason):
+        """puts leased tasks back at the front of the queue"""
+
+        for n in leases:
+            del self.leases[n]
+            self.pending.appendleft(n)
+            ToolWarn("requeued task {} ({})".format(n, reason))
+
+    def lost(self, name):
+        """requeues the tasks of a disconnected worker"""
+
+        with self._lock:
+            self.workers.discard(name)
+            held = [n for n, (w, _) in self.leases.items() if w == name]
+            self._requeue(held, "lost worker: " + name)
+
+    def reap(self):
+        """requeues tasks whose leases were not renewed in time"""
+
+        now = time.time()
+
+        with self._lock:
+            expired = [n for n, (_, t) in self.leases.items() if t < now]
+            self._requeue(expired, "missed heartbeats")
+
+    def serve(self):
+        """serves tasks until every task is done
+
+        :return: `dict`, measured seconds by task index
+        """
+
+        server = _Server(self.address, _Handler)
+        server.coordinator = self
+
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        host, port = server.server_address[:2]
+        msg = "serving ({}) task(s) on {}:{}, waiting for workers"
+        msgutils.msg(msg.format(str(len(self.master)).zfill(4), host, port))
+
+        try:
+            while not self._finished.wait(poll):
+                self.reap()
+
+            # let connected workers pick up their stop messages
+            deadline = time.time() + heartbeat
+            while self.workers and time.time() < deadline:
+                time.sleep(.1)
+
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        msg = "served ({}) task(s), ({}) failed"
+        msgutils.msg(msg.format(str(len(self.seconds)).zfill(4),
+                                str(len(self.errors)).zfill(4)))
+
+        return self.seconds
+
+
+class _RemoteQueue(object):
+    """worker side task queue backed by a coordinator connection
+
+    stands in for the `multiprocessing.JoinableQueue` handed to the
+    `cmds` worker functions
+
+    :param channel: `_Channel`, coordinator connection
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.stopped = False
+        self.count = 0
+        self._id = None
+        self._start = None
+        self._beat = None
+
+    def _heartbeat(self, n, stop):
+        while not stop.wait(heartbeat):
+            try:
+                self.channel.send('heartbeat', id=n)
+            except socket.error:
+                return
+
+    def get(self):
+
+        while True:
+            self.channel.send('get')
+            message = self.channel.recv()
+
+            if message['op'] == 'wait':
+                time.sleep(poll)
+                continue
+
+            if message['op'] == 'stop':
+                self.stopped = True
+                return 'STOP'
+
+            self.count += 1
+            self._id = message['id']
+            self._start = time.time()
+            self._beat = threading.Event()
+
+            args = self._id, self._beat
+            beat = threading.Thread(target=self._heartbeat, args=args)
+            beat.daemon = True
+            beat.start()
+
+            return message['task']
+
+    def _finish(self, error=None):
+
+        if self._id is None:
+            return
+
+        self._beat.set()
+        seconds = time.time() - self._start
+        self.channel.send('done', id=self._id, seconds=seconds, error=error)
+        self._id = None
+
+    def task_done(self):
+        self._finish()
+
+    def close(self):
+        """stops the heartbeat of a task left unfinished"""
+
+        if self._beat:
+            self._beat.set()
+
+    def fail(self, error):
+        """reports the running task, if any, as failed"""
+
+        self._finish(str(error).split('ERROR: ', 1)[-1].strip() or
+                     error.__class__.__name__)
+
+
+def work(address, workers, name=None, print_help=object):
+    """connects to a coordinator and runs its tasks until it is done
+
+    :param address: `tuple`, (host, port) of the coordinator
+    :param workers: `dict`, worker functions by name
+    :param name: `str`, name reported to the coordinator
+    :param print_help: `object`, passed to ToolError for command help menu
+    :return: `int`, number of tasks run
+    :raise: `ToolError` if the coordinator cannot be reached
+    """
+
+    host, port = address
+    host = host or localhost
+    name = name or socket.gethostname()
+    deadline = time.time() + connect_timeout
+
+    while True:
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except socket.error as e:
+            if time.time() > deadline:
+                e = "could not connect to {}:{}: {}".format(host, port, e)
+                raise ToolError(e, print_help)
+            time.sleep(poll)
+
+    channel = _Channel(sock)
+    channel.send('hello', worker=name)
+    job = channel.recv()
+
+    e = "unknown worker requested by coordinator: {}".format(job['worker'])
+    assert job['worker'] in workers, ToolError(e, print_help)
+
+    target = workers[job['worker']]
+    queue = _RemoteQueue(channel)
+    msgutils.msg("connected to {}:{} as {}".format(host, port, name))
+
+    try:
+        while not queue.stopped:
+            try:
+                target(queue, copy.deepcopy(job['kwds']), None, job['verbose'])
+            except (EOFError, socket.error):
+                ToolWarn("lost connection to {}:{}".format(host, port))
+                break
+            except Exception as e:
+                queue.fail(e)
+    finally:
+        queue.close()
+        channel.close()
+
+    return queue.count
@@ -16,11 +16,14 @@
 # SOFTWARE OR ITS DERIVATIVES.
 # </copyright>
 
+import collections
 import copy
+import hashlib
 import json
 import os
 import re
 import struct
+import sys
 
 from lpt.utils.argutils import ArgUtils
 from lpt.utils.jsonutils import JsonUtils
@@ -52,6 +55,7 @@ class Lfp(object):
     _header_struct = struct.Struct('>8sii')
     _blob_struct = struct.Struct('>8sq80s')
     _alignment = 16
+    _json_heads = '{', '['
 
     _recipe_pattern = re.compile('^recipe([0-9]+)?$')
 
@@ -156,10 +160,10 @@ class Lfp(object):
 
     @property
     def _get_blobs(self):
-        """:return: decoded LFP file blob data"""
+        """:return: decoded LFP file blob data, in file order"""
 
         decoder = json.JSONDecoder()
-        blobs = {}
+        blobs = collections.OrderedDict()
 
         with open(self.path, 'rb') as f:
             f.read(self._header_struct.size)
@@ -168,7 +172,16 @@ class Lfp(object):
                 data = f.read(self._blob_struct.size)
                 magic, length, ref = self._blob_struct.unpack(data)
                 ref = ref.rstrip('\x00')
-                blob = f.read(length)
+                offset = f.tell()
+
+                # only metadata blobs are JSON; image data is skipped over
+                # and read on demand (`blob_data`, `blob_copy`)
+                head = f.read(min(length, 1))
+                if head in self._json_heads or self._store_raw:
+                    blob = head + f.read(length - len(head))
+                else:
+                    blob = ''
+                    f.seek(offset + length)
 
                 try:
                     json_data, end = decoder.raw_decode(blob)
@@ -185,7 +198,9 @@ class Lfp(object):
                 encoded_ref = ref.encode('utf-8')
                 blobs[encoded_ref] = _Blob(magic_number=magic,
                                            metadata=json_data,
-                                           blob=blob)
+                                           blob=blob,
+                                           offset=offset,
+                                           length=length)
 
                 if f.tell() % self._alignment:
                     f.read(self._alignment - f.tell() % self._alignment)
@@ -313,6 +328,48 @@ class Lfp(object):
         obj = self.picture['picture'] if self.is_v1 else self.picture
         return obj[key] if key in obj else []
 
+    def blob_data(self, ref):
+        """reads a blob's data straight from the LFP file
+
+        :param ref: `str`, sha1 reference of the blob
+        :return: `memoryview` of the blob data
+        :raise: `ToolError` if `ref` is not a blob of the LFP file
+        """
+
+        e = "blob not found in {}: {}".format(self.path, ref)
+        assert ref in self.blobs, ToolError(e, self.print_help)
+
+        blob = self.blobs[ref]
+        data = bytearray(blob.length)
+
+        with open(self.path, 'rb') as f:
+            f.seek(blob.offset)
+            f.readinto(data)
+
+        return memoryview(data)
+
+    def blob_copy(self, ref, dest, size=1 << 20):
+        """streams a blob's data from the LFP file to another file
+
+        :param ref: `str`, sha1 reference of the blob
+        :param dest: `str`, file to write
+        :param size: `int`, bytes copied at a time
+        :raise: `ToolError` if `ref` is not a blob of the LFP file
+        """
+
+        e = "blob not found in {}: {}".format(self.path, ref)
+        assert ref in self.blobs, ToolError(e, self.print_help)
+
+        blob = self.blobs[ref]
+        remaining = blob.length
+
+        with open(self.path, 'rb') as f, open(dest, 'wb') as out:
+            f.seek(blob.offset)
+            while remaining:
+                data = f.read(min(size, remaining))
+                out.write(data)
+                remaining -= len(data)
+
     @property
     def depth_maps(self):
         """LFP depth map information
@@ -327,6 +384,53 @@ class Lfp(object):
 
         return [a['depthMap'] for a in accels if 'depthMap' in a]
 
+    @property
+    def embedded_images(self):
+        """encoded images and depth maps stored as blobs in the LFP
+
+        only view accelerations are considered (warp LFPs); raw sensor data
+        and externally stored (unpacked) assets are not included
+
+        :return: `list` of `dict` with kind, index, ref, representation,
+                 width and height of each image
+        """
+
+        if self.is_v1:
+            return []
+
+        embedded = []
+        maps = 'depthMap', 'confidenceMap'
+
+        def _add(kind, obj, parent):
+            if 'imageRef' not in obj or obj['imageRef'] not in self.blobs:
+                return
+
+            def get(k): return obj.get(k, parent.get(k))
+            index = len([x for x in embedded if x['kind'] == kind])
+            embedded.append({'kind': kind,
+                             'index': index,
+                             'ref': obj['imageRef'],
+                             'representation': get('representation'),
+                             'width': get('width'),
+                             'height': get('height')})
+
+        for accel in sum(self._view_accelerations, []):
+
+            kind = accel.get(self._kind_key, 'image')
+            frames = accel.get('perFrame', []) + [accel]
+
+            for frame in frames:
+                for image in frame.get(self._image_key, []):
+                    _add(kind, image, accel)
+
+            _add(kind, accel, {})
+
+            for key in maps:
+                if key in accel:
+                    _add(key, accel[key], {})
+
+        return embedded
+
     @property
     def has_compressed(self):
         """:return: True if LFP contains compressed data"""
@@ -516,7 +620,7 @@ class Lfp(object):
     def raw_dimensions(self):
         """LFP raw image dimensions
 
-        :return: all raw image dimensions
+        :return: (height, width) of every frame's raw image, in frame order
         """
 
         heights = []
@@ -536,15 +640,204 @@ class Lfp(object):
         return zip(heights, widths)
 
 
+class LfpWriter(object):
+    """rewrites JSON blobs of an LFP file without re-encoding its image data
+
+    edited blobs get new sha1 references; every JSON blob referring to an
+    edited blob (ultimately the master blob) is updated in turn, all other
+    blobs are streamed byte-for-byte from the source file
+
+    :param lfp_in: `str`/<Lfp>, path or Lfp object to rewrite
+    :param print_help: `object`, passed to ToolError for command help menu
+    :raise: `ToolError` if invalid LFP file
+    """
+
+    _copy_size = 1 << 20
+
+    def __init__(self, lfp_in, print_help=object):
+
+        self.print_help = print_help
+
+        if isinstance(lfp_in, Lfp):
+            self.lfp = lfp_in
+        else:
+            self.lfp = Lfp(lfp_in, print_help)
+
+        self._edits = {}
+
+    @staticmethod
+    def _sha1_ref(data):
+        """:return: blob reference for `data`"""
+
+        return 'sha1-' + hashlib.sha1(data).hexdigest()
+
+    def _read(self, f, ref):
+        """:return: blob data of `ref` from the source file"""
+
+        blob = self.lfp.blobs[ref]
+        f.seek(blob.offset)
+        return f.read(blob.length)
+
+    def set_blob(self, ref, metadata):
+        """replaces the content of a JSON blob
+
+        :param ref: `str`, sha1 reference of the blob to replace
+        :param metadata: `dict`, new blob content
+        :raise: `ToolError` if `ref` is not a JSON blob of the LFP file
+        """
+
+        blobs = self.lfp.blobs
+        e = "not a JSON blob in {}: {}".format(self.lfp.path, ref)
+        # image blobs are read with empty metadata
+        is_json = ref in blobs and isinstance(blobs[ref].metadata, dict) \
+            and blobs[ref].metadata
+        assert is_json, ToolError(e, self.print_help)
+
+        self._edits[ref] = json.dumps(metadata, indent=2)
+
+    def set_picture(self, picture):
+        """replaces the master (picture) blob
+
+        :param picture: `dict`, new picture metadata
+        """
+
+        self.set_blob(self.lfp._master_sha, picture)
+
+    def set_recipe(self, recipe, view=0):
+        """replaces the recipe embedded in a view of the picture
+
+        :param recipe: `dict`, recipe view parameters
+        :param view: `int`, index of the view to update
+        :raise: `ToolError` if the view holds no recipe
+        """
+
+        master_sha = self.lfp._master_sha
+
+        # Lfp.picture has referenced metadata merged in; start from the blob
+        if master_sha in self._edits:
+            picture = json.loads(self._edits[master_sha])
+        else:
+            with open(self.lfp.path, 'rb') as f:
+                picture = json.loads(self._read(f, master_sha))
+
+        views = picture.get('views', [])
+
+        e = "no recipe in view {} of {}".format(view, self.lfp.path)
+        assert view < len(views), ToolError(e, self.print_help)
+
+        pattern = self.lfp._recipe_pattern
+        keys = [k for k in views[view] if pattern.match(k)]
+        assert keys, ToolError(e, self.print_help)
+
+        for key in keys:
+            views[view][key] = recipe
+
+        self.set_picture(picture)
+
+    def _resolve(self, f):
+        """new content and reference for every blob that has to change
+
+        :param f: `file`, open source LFP file
+        :return: `dict`, {old reference: (new reference, new data)}
+        """
+
+        blobs = self.lfp.blobs
+        changed = {}
+
+        for ref, data in self._edits.items():
+            changed[ref] = self._sha1_ref(data), data
+
+        # blobs embedding an outdated reference change too; repeat until no
+        # new blob is affected (the master blob is always reached last)
+        pending = dict((r, None) for r, b in blobs.items()
+                       if isinstance(b.metadata, dict) and b.metadata)
+
+        while True:
+            renamed = [(old, new) for old, (new, _) in changed.items()
+                       if old != new]
+            found = False
+
+            for ref in pending:
+                if ref in changed:
+                    data = changed[ref][1]
+                else:
+                    data = pending[ref] or self._read(f, ref)
+                    pending[ref] = data
+
+                update = data
+
+                for old, new in renamed:
+                    update = update.replace(old, new)
+
+                if update != data:
+                    changed[ref] = self._sha1_ref(update), update
+                    found = True
+
+            if not found:
+                return changed
+
+    def _copy(self, f, out, start, size):
+        """streams `size` bytes at `start` of `f` to `out`"""
+
+        f.seek(start)
+
+        while size > 0:
+            data = f.read(min(size, self._copy_size))
+            out.write(data)
+            size -= len(data)
+
+    def write(self, lfp_out=None):
+        """writes the edited LFP file
+
+        :param lfp_out: `str`, destination path; rewrites the source file
+                        in place if not specified
+        :return: `str`, path of the written LFP file
+        """
+
+        lfp_out = lfp_out or self.lfp.path
+        temp_out = lfp_out + '.tmp'
+        blob_struct = Lfp._blob_struct
+        alignment = Lfp._alignment
+
+        with open(self.lfp.path, 'rb') as f, open(temp_out, 'wb') as out:
+
+            changed = self._resolve(f)
+            self._copy(f, out, 0, Lfp._header_struct.size)
+
+            for ref, blob in self.lfp.blobs.items():
+
+                if ref in changed:
+                    new_ref, data = changed[ref]
+                    out.write(blob_struct.pack(blob.magic_number, len(data),
+                                               new_ref))
+                    out.write(data)
+                else:
+                    start = blob.offset - blob_struct.size
+                    self._copy(f, out, start, blob_struct.size + blob.length)
+
+                if out.tell() % alignment:
+                    out.write('\x00' * (alignment - out.tell() % alignment))
+
+        if os.path.exists(lfp_out) and sys.platform == 'win32':
+            os.remove(lfp_out)
+        os.rename(temp_out, lfp_out)
+
+        return lfp_out
+
+
 class _Blob(object):
     """data blobs with extracted metadata
 
     :param magic_number: `struct`, blob identifier
     :param metadata: `dict`, metadata for LFP blob
     :param blob: `binary`, raw LFP blob data
+    :param offset: `int`, file offset of the blob data
+    :param length: `int`, blob data length in bytes
     """
 
-    def __init__(self, magic_number, metadata, blob=None):
+    def __init__(self, magic_number, metadata, blob=None, offset=0, length=0):
         self.magic_number = magic_number
         self.metadata = metadata
         self.raw_data = blob
+        self.offset = offset
+        self.length = length
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - lfp package - batch job manifests"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# job manifests
+#
+# a manifest describes many `raw` runs in one JSON file:
+#
+#   {
+#     "inputs": ["shoot/"],
+#     "args": {"dir_out": "renders/", "threads": 4},
+#     "jobs": [
+#       {"name": "previews",
+#        "action": "image_out",
+#        "args": {"imagerep": "jpeg"},
+#        "variants": {"focus": [-1, 0, 1], "size": [[540, 540]]},
+#        "output": "{dir_out}/{name}_{focus}.jpg"},
+#       {"action": "eslf_out", "inputs": ["shoot/IMG_0001.lfr"]}
+#     ]
+#   }
+#
+# top-level `inputs` and `args` are defaults for every job.  `action` is a
+# raw action (as in --plan), `args` are raw arguments by their long option
+# names (underscored), checked and converted like their command line values,
+# and every `variants` entry lists values of one argument; a job renders
+# every combination of them.  `perspective` ([u, v]) and `size` ([height,
+# width]) variants set two arguments at once.
+# `output` (image_out only) is a file name template, see `Manifest.output`.
+# relative paths are relative to the manifest file
+#
+
+import collections
+import itertools
+import json
+import os
+
+from lpt.utils.jsonutils import JsonUtils
+from lpt.utils.msgutils import ToolError
+from lpt.utils.utils import Utils
+
+jsonutils = JsonUtils()
+utils = Utils()
+
+od = collections.OrderedDict
+
+# raw actions a job may run; raw2lfp reads RAW images, not LFPs
+actions = ('depth_out', 'eslf_out', 'image_out', 'lfp2raw', 'lfp_out',
+           'lfr2xraw', 'recipe_out', 'transcode', 'unpack')
+
+# raw arguments a job may set (see `Cmds._raw_kwds`)
+arguments = ('calibration_in', 'depth_in', 'depthrep', 'dir_out', 'focus',
+             'height', 'imagerep', 'orientation', 'perspective_u',
+             'perspective_v', 'recipe_in', 'threads', 'width')
+
+_paths = 'calibration_in', 'depth_in', 'dir_out', 'recipe_in'
+_pairs = {'perspective': ('perspective_u', 'perspective_v'),
+          'size': ('height', 'width')}
+_keys = 'action', 'args', 'inputs', 'name', 'output', 'variants'
+
+
+class Manifest(object):
+    """job manifest file
+
+    :param path: `str`, manifest file
+    :param print_help: `object`, passed to ToolError for command help menu
+    :raise: `ToolError` if the manifest is malformed
+    """
+
+    def __init__(self, path, print_help=object):
+
+        self.print_help = print_help
+        self.path = utils.full_path(path)
+        self.root = os.path.dirname(self.path)
+
+        try:
+            with open(self.path) as f:
+                data = jsonutils.to_str(json.load(f, object_pairs_hook=od))
+        except (IOError, ValueError) as e:
+            self._assert(False, e)
+
+        self._assert(isinstance(data, dict), "not a JSON object")
+        self._assert(data.get('jobs'), "no jobs")
+
+        inputs = self._paths(data.get('inputs', []), 'inputs')
+        args = self._args(data.get('args', {}), 'args')
+        self.jobs = [self._job(job, n, inputs, args)
+                     for n, job in enumerate(data['jobs'], start=1)]
+
+    def _assert(self, cond, e):
+        e = "manifest {}: {}".format(self.path, e)
+        assert cond, ToolError(e, self.print_help)
+
+    def _abspath(self, path):
+        return os.path.join(self.root, os.path.expanduser(path))
+
+    def _paths(self, paths, where):
+        self._assert(isinstance(paths, list), where + ": not a list")
+        return [os.path.normpath(self._abspath(p)) for p in paths]
+
+    def _args(self, args, where):
+
+        self._assert(isinstance(args, dict), where + ": not an object")
+        unknown = sorted(set(args) - set(arguments))
+        self._assert(not unknown, "{}: unknown argument(s): {}".format(
+            where, ', '.join(unknown)))
+
+        return od((k, self._abspath(v) if k in _paths and v else v)
+                  for k, v in args.items())
+
+    def _job(self, job, n, inputs, args):
+        """validates a job and applies the manifest's defaults
+
+        :return: `dict`, job; `own` holds the arguments the job sets itself
+                 (not inherited from the manifest's `args`)
+        """
+
+        where = "job {}".format(n)
+        self._assert(isinstance(job, dict), where + ": not an object")
+
+        name = str(job.get('name', n))
+        where = "job {}".format(name)
+
+        unknown = sorted(set(job) - set(_keys))
+        self._assert(not unknown, "{}: unknown key(s): {}".format(
+            where, ', '.join(unknown)))
+
+        action = job.get('action')
+        self._assert(action in actions, "{}: action must be one of: {}"
+                     .format(where, ', '.join(actions)))
+
+        self._assert(isinstance(job.get('variants', {}), dict),
+                     where + ": variants: not an object")
+
+        variants = od()
+        for key, values in job.get('variants', {}).items():
+            ok = isinstance(values, list) and values
+            self._assert(ok, "{}: variants {}: not a list of values"
+                         .format(where, key))
+
+            if key in _pairs:
+                ok = all(isinstance(v, list) and len(v) == 2 for v in values)
+                self._assert(ok, "{}: variants {}: values must be pairs"
+                             .format(where, key))
+                variants[key] = values
+            else:
+                self._assert(key in arguments, "{}: variants: unknown "
+                             "argument: {}".format(where, key))
+                variants[key] = [self._abspath(v) if key in _paths and v
+                                 else v for v in values]
+
+        output = job.get('output')
+        self._assert(not output or action == 'image_out',
+                     where + ": output templates need action image_out")
+
+        job_args = od(args)
+        job_args.update(self._args(job.get('args', {}), where + ": args"))
+
+        job_inputs = job.get('inputs')
+        job_inputs = self._paths(job_inputs, where + ": inputs") \
+            if job_inputs is not None else inputs
+        self._assert(job_inputs, where + ": no inputs")
+
+        own = set(job.get('args', {}))
+        for key in variants:
+            own.update(_pairs.get(key, [key]))
+
+        return dict(name=name, action=action, args=job_args, own=own,
+                    inputs=job_inputs, variants=variants,
+                    output=output)
+
+    @staticmethod
+    def _under(path, inputs):
+        """:return: `bool`, True if `path` is or is inside one of `inputs`"""
+
+        return any(path == p or path.startswith(p.rstrip(os.sep) + os.sep)
+                   for p in inputs)
+
+    @property
+    def inputs(self):
+        """:return: `list`, every job's inputs, leaving out those inside
+                 another input directory, so no file is searched twice"""
+
+        inputs = list(od.fromkeys(p for job in self.jobs
+                                  for p in job['inputs']))
+
+        return [p for p in inputs
+                if not self._under(p, [q for q in inputs if q != p])]
+
+    def select(self, job, src):
+        """:return: `list`, <Lfp> objects of `src` that are `job` inputs"""
+
+        return [lfp for lfp in src if self._under(lfp.path, job['inputs'])]
+
+    @staticmethod
+    def variants(job):
+        """combinations of a job's variant values
+
+        :param job: `dict`, job
+        :yield: `collections.OrderedDict`, job arguments of one combination
+        """
+
+        keys = job['variants'].keys()
+
+        for combo in itertools.product(*job['variants'].values()):
+            args = od(job['args'])
+
+            for key, value in zip(keys, combo):
+                if key in _pairs:
+                    args.update(zip(_pairs[key], value))
+                else:
+                    args[key] = value
+
+            yield args
+
+    def output(self, job, lfp_path, kwds):
+        """expands a job's output template for one task
+
+        fields: {name} (input file name without extension), {dir} (input
+        directory), {job}, {action}, {dir_out}, {focus}, {u}, {v},
+        {height}, {width}, {imagerep} and {recipe} (recipe file name
+        without extension); unset values expand to an empty string
+
+        :param job: `dict`, job
+        :param lfp_path: `str`, input LFP file
+        :param kwds: `dict`, task keyword arguments
+        :return: `str`, output file path
+        :raise: `ToolError` if the template is invalid
+        """
+
+        def base(p): return os.path.splitext(os.path.basename(p))[0]
+        def blank(v): return '' if v is None else v
+
+        recipe = kwds.get('recipe_in')
+        fields = dict(name=base(lfp_path),
+                      dir=os.path.dirname(lfp_path),
+                      job=job['name'],
+                      action=job['action'],
+                      dir_out=blank(kwds.get('dir_out')),
+                      focus=blank(kwds.get('focus')),
+                      u=blank(kwds.get('perspective_u')),
+                      v=blank(kwds.get('perspective_v')),
+                      height=blank(kwds.get('height')),
+                      width=blank(kwds.get('width')),
+                      imagerep=blank(kwds.get('imagerep')),
+                      recipe=base(recipe) if recipe else '')
+
+        try:
+            path = job['output'].format(**fields)
+            return os.path.normpath(self._abspath(path))
+        except (KeyError, IndexError, ValueError) as e:
+            e = "job {}: output template {}: {}".format(
+                job['name'], job['output'], e)
+            raise ToolError(e, self.print_help)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - lfp package - packed raw sensor image decoding"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# packed Bayer sensor data of raw LFP frames (``imageRef``)
+#
+# the blob is memory mapped in place and unpacked with vectorised bit
+# operations, a row range at a time; 10-bit data packs four pixels into five
+# bytes (Illum: little endian, low bits of all four pixels in the fifth
+# byte), 12-bit data two pixels into three bytes (first generation: big
+# endian)
+#
+
+import numpy as np
+
+from lpt.lfp.lfp import Lfp
+from lpt.utils.msgutils import ToolError
+
+
+class RawImage(object):
+    """packed raw sensor image of a raw LFP frame
+
+    :param lfp_in: `str`/<Lfp>, path or Lfp object of a raw LFP file
+    :param frame: `int`, index of the frame to decode
+    :param print_help: `object`, passed to ToolError for command help menu
+    :raise: `ToolError` if the frame has no raw image or an unsupported
+            packing
+    """
+
+    # bits per pixel: (pixels, bytes) per packed group
+    _groups = {10: (4, 5), 12: (2, 3)}
+    _endianness = {10: 'little', 12: 'big'}
+
+    def __init__(self, lfp_in, frame=0, print_help=object):
+
+        self.print_help = print_help
+
+        if isinstance(lfp_in, Lfp):
+            self.lfp = lfp_in
+        else:
+            self.lfp = Lfp(lfp_in, print_help)
+
+        frames = [f['frame'] for f in self.lfp._frames]
+        e = "no raw image for frame {} in {}".format(frame, self.lfp.path)
+        has_image = frame < len(frames) and 'imageRef' in frames[frame]
+        assert has_image, ToolError(e, print_help)
+
+        refs = frames[frame]
+        self.blob = self.lfp.blobs[refs['imageRef']]
+        metadata = self.lfp.blobs[refs['metadataRef']].metadata
+
+        dimensions = self.lfp.raw_dimensions
+        e = "no raw image dimensions for frame {} in {}"
+        e = e.format(frame, self.lfp.path)
+        assert frame < len(dimensions), ToolError(e, print_help)
+
+        self.height, self.width = dimensions[frame]
+        self.bits, self.endianness = self._packing(metadata)
+
+        e = "unsupported raw packing in {}: {} bit, {} endian"
+        e = e.format(self.lfp.path, self.bits, self.endianness)
+        assert self.bits in self._groups, ToolError(e, print_help)
+
+        pixels, size = self._groups[self.bits]
+        e = "raw image width {} is not a multiple of {} pixels: {}"
+        e = e.format(self.width, pixels, self.lfp.path)
+        assert not self.width % pixels, ToolError(e, print_help)
+
+        self.row_bytes = self.width // pixels * size
+
+        e = "raw image blob too small for {}x{} pixels: {}"
+        e = e.format(self.width, self.height, self.lfp.path)
+        fits = self.row_bytes * self.height <= self.blob.length
+        assert fits, ToolError(e, print_help)
+
+        self._mmap = None
+
+    def _packing(self, metadata):
+        """:return: bits per pixel and endianness from frame metadata"""
+
+        image = metadata.get('image', {})
+        packing = image.get('rawDetails', {}).get('pixelPacking', {})
+        sensor = metadata.get('devices', {}).get('sensor', {})
+
+        bits = packing.get('bitsPerPixel', sensor.get('bitsPerPixel'))
+        endianness = packing.get('endianness', self._endianness.get(bits))
+        return bits, endianness
+
+    @property
+    def packed(self):
+        """:return: `numpy.memmap` of the packed blob, rows of packed bytes"""
+
+        if self._mmap is None:
+            shape = self.height, self.row_bytes
+            self._mmap = np.memmap(self.lfp.path, dtype=np.uint8, mode='r',
+                                   offset=self.blob.offset, shape=shape)
+        return self._mmap
+
+    @property
+    def shape(self):
+        """:return: `tuple`, decoded image (height, width)"""
+
+        return self.height, self.width
+
+    def rows(self, start=0, stop=None):
+        """decodes a range of sensor rows
+
+        only the requested rows are read from the memory map
+
+        :param start: `int`, first row
+        :param stop: `int`, row to stop before, defaults to the image height
+        :return: `numpy.ndarray`, uint16 pixel values, (rows, width)
+        :raise: `ToolError` if the range holds no rows of the image
+        """
+
+        stop = self.height if stop is None else min(stop, self.height)
+
+        e = "invalid row range {}:{} for a raw image of {} rows: {}"
+        e = e.format(start, stop, self.height, self.lfp.path)
+        assert 0 <= start < stop, ToolError(e, self.print_help)
+
+        packed = self.packed[start:stop]
+        pixels, size = self._groups[self.bits]
+
+        # one row per packed group: (rows * groups, bytes per group)
+        g = packed.reshape(-1, size).astype(np.uint16)
+        out = np.empty((g.shape[0], pixels), dtype=np.uint16)
+
+        if self.bits == 10 and self.endianness == 'little':
+            out[:] = g[:, :4] << 2
+            out |= (g[:, 4:] >> np.array([0, 2, 4, 6], np.uint16)) & 0x03
+
+        elif self.bits == 10:
+            out[:, 0] = (g[:, 0] << 2) | (g[:, 1] >> 6)
+            out[:, 1] = ((g[:, 1] & 0x3f) << 4) | (g[:, 2] >> 4)
+            out[:, 2] = ((g[:, 2] & 0x0f) << 6) | (g[:, 3] >> 2)
+            out[:, 3] = ((g[:, 3] & 0x03) << 8) | g[:, 4]
+
+        elif self.endianness == 'little':
+            out[:, 0] = g[:, 0] | ((g[:, 1] & 0x0f) << 8)
+            out[:, 1] = (g[:, 1] >> 4) | (g[:, 2] << 4)
+
+        else:
+            out[:, 0] = (g[:, 0] << 4) | (g[:, 1] >> 4)
+            out[:, 1] = ((g[:, 1] & 0x0f) << 8) | g[:, 2]
+
+        return out.reshape(stop - start, self.width)
+
+    def chunks(self, rows=256):
+        """decodes the image a block of rows at a time
+
+        :param rows: `int`, rows per block
+        :yield: `tuple`, (first row, `numpy.ndarray` of decoded rows)
+        """
+
+        for start in range(0, self.height, rows):
+            yield start, self.rows(start, start + rows)
+
+    def decode(self):
+        """:return: `numpy.ndarray`, the whole decoded image"""
+
+        return self.rows()
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - lfp package - multiprocessing task scheduling"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# longest job first
+#
+# workers pull tasks from a single shared queue, so whichever worker is free
+# takes the next task; queueing the most expensive tasks first keeps a few
+# large renders from being left for the end of a batch.  a task's cost is
+# its input size (MB) times its output size (megapixels, when set) times the
+# rate of its action in seconds per unit; tasks of one run can have
+# different actions (job manifests), each is costed and timed by its own.
+# rates start out as rough relative weights and are replaced by measured
+# ones, kept in the user's Lytro directory, after every run
+#
+
+import collections
+import heapq
+import json
+import os
+import time
+
+from lpt.lfp import config
+from lpt.utils.msgutils import MsgUtils
+from lpt.utils.utils import Utils
+
+msgutils = MsgUtils()
+utils = Utils()
+
+# decay of the measured rates; the weight of the latest run
+_learn = .5
+
+# rough relative seconds per unit, until timings have been measured
+_weights = {
+    'batch': 1.,
+    'depth_out': 1.5,
+    'eslf_out': .5,
+    'extract': .05,
+    'image_out': 1.,
+    'lfp2raw': .3,
+    'lfp_out': 2.,
+    'lfr2xraw': 1.,
+    'pack': 1.,
+    'raw2lfp': .3,
+    'recipe_out': .2,
+    'transcode': .3,
+    'unpack': 2.5}
+
+
+class _TimedQueue(object):
+    """worker side view of a task queue that times every task
+
+    tasks are queued as (index, task) pairs; workers get the bare task and
+    the time from `get` to `task_done` is put on `timings` as
+    (index, seconds)
+
+    :param queue: `multiprocessing.JoinableQueue`, task queue
+    :param timings: `multiprocessing.Queue`, receives task timings
+    """
+
+    def __init__(self, queue, timings):
+        self.queue = queue
+        self.timings = timings
+        self._index = None
+        self._start = None
+
+    def get(self):
+
+        item = self.queue.get()
+
+        if item == 'STOP':
+            self._index = None
+            return item
+
+        self._index, task = item
+        self._start = time.time()
+        return task
+
+    def task_done(self):
+
+        if self._index is not None:
+            seconds = time.time() - self._start
+            self.timings.put((self._index, seconds))
+            self._index = None
+
+        self.queue.task_done()
+
+
+class Scheduler(object):
+    """orders `Cmds._multiprocess` tasks and learns from their timings
+
+    :param policy: `str`, 'longest' (longest job first) or 'path' (input
+                   order)
+    :param path: `str`, timings file, None to not keep timings
+    """
+
+    def __init__(self, policy='longest', path=config.timings_json):
+        self.policy = policy
+        self.path = path
+        self._rates = None
+
+    @property
+    def rates(self):
+        """:return: `dict`, measured seconds per unit by action"""
+
+        if self._rates is None:
+            self._rates = {}
+
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path) as f:
+                        self._rates = json.load(f)
+                except ValueError:
+                    pass
+
+        return self._rates
+
+    @staticmethod
+    def action(kwargs, default='batch'):
+        """:return: `str`, timing key of a `_multiprocess` call"""
+
+        if 'plan' in kwargs:
+            return '+'.join(kwargs['plan'])
+        return kwargs.get('action', default)
+
+    @classmethod
+    def task_action(cls, task, kwargs):
+        """:return: `str`, timing key of a single task
+
+        tasks that carry their own action (see `Cmds._manifest_tasks`) are
+        keyed by it, all others by the action of the whole call
+        """
+
+        if len(task) > 2 and isinstance(task[2], dict):
+            if 'action' in task[2]:
+                return task[2]['action']
+        return cls.action(kwargs)
+
+    def rate(self, action):
+        """:return: `float`, estimated seconds per unit of `action`"""
+
+        if action in self.rates:
+            return self.rates[action]
+
+        return sum(_weights.get(a, 1.) for a in action.split('+'))
+
+    @staticmethod
+    def units(task, kwargs):
+        """estimated size of a task
+
+        :param task: `tuple`, queued task; the input path is its second
+                     element, per-task keyword arguments its third, if any
+        :param kwargs: `dict`, keyword arguments shared by all tasks
+        :return: `float`, input MB times output megapixels (if set)
+        """
+
+        try:
+            size = os.path.getsize(task[1]) / 1e6
+        except (OSError, TypeError, IndexError):
+            size = 1.
+
+        kw = dict(kwargs.get('plan', {}).get('image_out', kwargs))
+
+        if len(task) > 2 and isinstance(task[2], dict):
+            kw.update(task[2])
+            kw.update(task[2].get('lfp_meta', {}))
+
+        height, width = kw.get('height'), kw.get('width')
+        pixels = height * width / 1e6 if height and width else 1.
+
+        return max(size, .001) * max(pixels, .001)
+
+    def order(self, master, kwargs):
+        """orders tasks for queueing
+
+        :param master: `list`, tasks in input order
+        :param kwargs: `dict`, keyword arguments shared by all tasks
+        :return: `list`, (index into `master`, estimated units) in queueing
+                 order
+        """
+
+        units = [(n, self.units(t, kwargs)) for n, t in enumerate(master)]
+
+        if self.policy == 'longest':
+            rates = [self.rate(self.task_action(t, kwargs)) for t in master]
+            units.sort(key=lambda x: -x[1] * rates[x[0]])
+
+        return units
+
+    def record(self, master, kwargs, units, seconds):
+        """folds a run's timings into the stored rate of each task action
+
+        :param master: `list`, tasks in input order
+        :param kwargs: `dict`, keyword arguments shared by all tasks
+        :param units: `dict`, estimated units by index into `master`
+        :param seconds: `dict`, measured seconds by index into `master`
+        """
+
+        if not self.path:
+            return
+
+        timed = {}
+
+        for n in seconds:
+            action = self.task_action(master[n], kwargs)
+            timed.setdefault(action, ([], []))
+            timed[action][0].append(units[n])
+            timed[action][1].append(seconds[n])
+
+        for action, (units_, seconds_) in timed.items():
+            if not sum(units_):
+                continue
+
+            rate = sum(seconds_) / sum(units_)
+
+            if action in self.rates:
+                rate = (1 - _learn) * self.rates[action] + _learn * rate
+
+            self.rates[action] = rate
+
+        # concurrent runs each replace the whole file; neither leaves the
+        # other a half written one to load
+        rates = collections.OrderedDict(sorted(self.rates.items()))
+
+        try:
+            utils.write(self.path, rates, atomic=True)
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def makespan(seconds, processors):
+        """simulates workers pulling tasks from a shared queue
+
+        :param seconds: `list`, task durations in queueing order
+        :param processors: `int`, number of workers
+        :return: `float`, time at which the last task finishes
+        """
+
+        free = [0.] * max(processors, 1)
+
+        for s in seconds:
+            heapq.heappush(free, heapq.heappop(free) + s)
+
+        return max(free)
+
+    def report(self, master, kwargs, order, seconds, processors):
+        """prints the makespan of the run against input order queueing
+
+        both are simulated from the measured task durations, so worker
+        start up and queue overhead are left out; the estimate is what the
+        stored rates predicted before the run
+
+        :param master: `list`, tasks in input order
+        :param kwargs: `dict`, keyword arguments shared by all tasks
+        :param order: `list`, (index into master, units) in queueing order
+        :param seconds: `dict`, measured seconds by index into master
+        :param processors: `int`, number of workers
+        """
+
+        queued = [seconds[n] for n, _ in order if n in seconds]
+        in_path = [seconds[n] for n in sorted(seconds)]
+        guess = [u * self.rate(self.task_action(master[n], kwargs))
+                 for n, u in order]
+
+        span = self.makespan(queued, processors)
+        base = self.makespan(in_path, processors)
+        guess = self.makespan(guess, processors)
+        change = (span - base) / base * 100 if base else 0.
+
+        msg = ("schedule: {}, makespan {:.2f}s (estimated {:.2f}s), "
+               "input order {:.2f}s ({:+.1f}%)")
+        msgutils.msg(msg.format(self.policy, span, guess, base, change))
@@ -26,6 +26,7 @@ from lpt.utils.argutils import ArgUtils
 from lpt.utils.jsonutils import JsonUtils
 from lpt.utils.msgutils import MsgUtils
 from lpt.utils.msgutils import ToolError
+from lpt.utils.traceutils import traced
 from lpt.utils.utils import Utils
 
 argutils = ArgUtils()
@@ -179,6 +180,7 @@ class Tnt(object):
             self._command.extend(set_)
             self.arg_sets.append(set_)
 
+    @traced(cat='tnt')
     def execute(self, failure=object, lock=None):
         """executes the TNT command
 
@@ -20,6 +20,7 @@ import os
 import glob
 import re
 import shutil
+import collections
 
 from lpt.lfp import config
 from lpt.lfp.lfp import Lfp
@@ -28,6 +29,7 @@ from lpt.lfp.tool import Tool
 from lpt.recipe.recipe import Recipe
 from lpt.utils.argutils import ArgUtils
 from lpt.utils.msgutils import MsgUtils
+from lpt.utils.traceutils import traced
 from lpt.utils.utils import Utils
 
 utils = Utils()
@@ -35,6 +37,8 @@ msgutils = MsgUtils()
 argutils = ArgUtils()
 tool = Tool()
 
+od = collections.OrderedDict
+
 
 class TntCommon(object):
     """common TNT commands and miscellaneous related functions
@@ -60,6 +64,23 @@ class TntCommon(object):
 
     _db = config.db
 
+    # outputs TNT renders from a single decode of a raw LFP with the same
+    # image arguments; these share one TNT call when requested together in
+    # a plan.  eslf_out and recipe_out take their own representation and
+    # arguments and always run as stages of their own
+    _fusable = 'image_out', 'depth_out'
+
+    # plan actions and their `TntCommon` methods
+    _plan_actions = od([
+        ('image_out', 'raw_image_out'),
+        ('depth_out', 'raw_depth_out'),
+        ('eslf_out', 'raw_eslf_out'),
+        ('recipe_out', 'recipe_out'),
+        ('lfp_out', 'raw_lfp_out'),
+        ('unpack', 'raw_unpack'),
+        ('lfr2xraw', 'raw_lfr2xraw'),
+        ('lfp2raw', 'raw_lfp2raw')])
+
     print_help = object
 
     def __init__(self, verbose=False, debug=False):
@@ -309,7 +330,7 @@ class TntCommon(object):
 
         def sign(x): return '_{}'.format(pad(x)) if x >= 0 else pad(x)
 
-        f = 'f{}'.format(sign(focus) % focus) if focus else ''
+        f = 'f{}'.format(sign(focus) % focus) if focus is not None else ''
         u = 'u{}'.format(sign(upers) % upers) if upers else ''
         v = 'v{}'.format(sign(vpers) % vpers) if vpers else ''
 
@@ -321,7 +342,10 @@ class TntCommon(object):
     def _set_calibration_in(self, lfp_in, calibration_in):
         """intercepts LFP and determines if calibration in is required"""
 
-        lfp = Lfp(lfp_in, self.print_help)
+        if isinstance(lfp_in, Lfp):
+            lfp = lfp_in
+        else:
+            lfp = Lfp(lfp_in, self.print_help)
         return None if lfp.has_xraw else calibration_in
 
     @staticmethod
@@ -333,6 +357,23 @@ class TntCommon(object):
         else:
             return tool.dimensions_ratio(lfp_in, height, width)
 
+    def lfp_meta(self, lfp_in, calibration_in=None, height=None, width=None):
+        """resolves the per-LFP values of an image render
+
+        computed once per LFP and shared by every render of it, so that
+        tasks of a sweep need not read the LFP again
+
+        :param lfp_in: `str`/<Lfp>, source LFP file or object
+        :param calibration_in: `str`, calibration directory
+        :param height: `int`, resolution height (in pixels)
+        :param width: `int`, resolution width (in pixels)
+        :return: `dict`, calibration_in, height and width to render with
+        """
+
+        calibration_in = self._set_calibration_in(lfp_in, calibration_in)
+        height, width = self._set_height_width(lfp_in, height, width)
+        return dict(calibration_in=calibration_in, height=height, width=width)
+
     def set_recipe_in(self, recipe_in, i=0):
         """intercepts and validates local recipe file
 
@@ -382,6 +423,7 @@ class TntCommon(object):
         else:
             _func()
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def raw_depth_out(self, lfp_in, calibration_in=None, depth_in=None,
                       depthrep=None, dir_out=None, imagerep=None,
                       orientation=None, threads=None, i=0):
@@ -423,6 +465,7 @@ class TntCommon(object):
         tnt.depth_in(depth_in)
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def raw_eslf_out(self, lfp_in, calibration_in=None, dir_out=None,
                      imagerep=None, threads=None, i=0):
         """TNT process: raw LFR to lightfield image out
@@ -453,11 +496,12 @@ class TntCommon(object):
         tnt.calibration_in(calibration_in)
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def raw_image_out(self, lfp_in, image_out=None, calibration_in=None,
                       depth_in=None, dir_out=None, focus=None, height=None,
                       imagerep=None, orientation=None, perspective_u=None,
                       perspective_v=None, recipe_in=None, threads=None,
-                      width=None, i=0):
+                      width=None, lfp_meta=None, i=0):
         """TNT process: raw LFR to image out
 
         :param lfp_in: `str`, source LFP file
@@ -474,12 +518,16 @@ class TntCommon(object):
         :param recipe_in: `str`, input recipe file
         :param threads: `int`, number of processing threads to use
         :param width: `int`, resolution width (in pixels)
+        :param lfp_meta: `dict`, values already resolved by `lfp_meta`
         :param i: `int`, iteration during multi file-out process
         """
 
-        calibration_in = self._set_calibration_in(lfp_in, calibration_in)
+        if lfp_meta is None:
+            lfp_meta = self.lfp_meta(lfp_in, calibration_in, height, width)
+
+        calibration_in = lfp_meta['calibration_in']
+        height, width = lfp_meta['height'], lfp_meta['width']
         imagerep = imagerep or self._db['imagerep_raw_image_out']
-        height, width = self._set_height_width(lfp_in, height, width)
         u, v = perspective_u, perspective_v
 
         recipe_in = self.set_recipe_in(recipe_in, i)
@@ -510,6 +558,7 @@ class TntCommon(object):
 
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def raw_lfp_out(self, lfp_in, calibration_in=None, depth_in=None,
                     depthrep=None, dir_out=None, height=None, imagerep=None,
                     orientation=None, perspective_u=(), perspective_v=(),
@@ -561,6 +610,7 @@ class TntCommon(object):
         tnt.perspective_v(perspective_v)
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def raw_lfp2raw(self, lfp_in, dir_out=None, threads=None, i=0):
         """TNT process: unpackage RAW and corresponding TXT
 
@@ -586,6 +636,7 @@ class TntCommon(object):
         tnt.lfp2raw()
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def raw_lfr2xraw(self, lfp_in, calibration_in=None, dir_out=None,
                      threads=None, i=0):
         """TNT process: raw LFR to xraw LFR
@@ -614,6 +665,7 @@ class TntCommon(object):
         tnt.calibration_in(calibration_in)
         self._execute(tnt)
 
+    @traced(cat='action', args=('raw_in', 'i'))
     def raw_raw2lfp(self, raw_in, dir_out=None, threads=None, i=0):
         """TNT process: package RAW and corresponding TXT
 
@@ -637,6 +689,7 @@ class TntCommon(object):
         tnt.raw2lfp()
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def raw_transcode(self, lfp_in, lfp_out=None, threads=None, i=0):
         """TNT process: raw LFP to raw LFP
 
@@ -657,6 +710,7 @@ class TntCommon(object):
         tnt.transcode()
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def raw_unpack(self, lfp_in, calibration_in=None, depth_in=None,
                    depthrep=None, dir_out=None, height=None, imagerep=None,
                    orientation=None, perspective_u=None, perspective_v=None,
@@ -715,6 +769,157 @@ class TntCommon(object):
             self.recipe_out(lfp_out, threads=threads, i=i)
             self.warp_depth_map_json_out(lfp_out, i=i)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
+    def raw_fused(self, lfp_in, outputs, calibration_in=None, depth_in=None,
+                  depthrep=None, dir_out=None, focus=None, height=None,
+                  imagerep=None, orientation=None, perspective_u=None,
+                  perspective_v=None, recipe_in=None, threads=None,
+                  width=None, i=0):
+        """TNT process: raw LFR image and depth map from a single TNT call
+
+        output file names match those of the individual actions; a depth
+        map's companion image is the ``image_out`` image when both are
+        requested
+
+        :param lfp_in: `str`, source LFP file
+        :param outputs: `iter`, outputs to write, see `TntCommon._fusable`
+        :param calibration_in: `str`, calibration directory
+        :param depth_in: `str`, depth map input file
+        :param depthrep: `str`, depth map representation
+        :param dir_out: `str`, directory out
+        :param focus: `float`, image focus point
+        :param height: `int`, resolution height (in pixels)
+        :param imagerep: `str`, image representation for processed LFP
+        :param orientation: `int`, image orientation
+        :param perspective_u: `float`, perspective u coordinate
+        :param perspective_v: `float`, perspective v coordinate
+        :param recipe_in: `str`, input recipe file
+        :param threads: `int`, number of processing threads to use
+        :param width: `int`, resolution width (in pixels)
+        :param i: `int`, iteration during multi file-out process
+        """
+
+        u, v = perspective_u, perspective_v
+        basedir, name, ext = self._split_path(lfp_in)
+        dir_out = self._check_dir(dir_out) if dir_out else basedir
+
+        tnt = Tnt(verbose=self.verbose)
+        tnt.threads(threads)
+        tnt.lfp_in(lfp_in)
+        dest = []
+
+        image_out = None
+
+        calibration_in = self._set_calibration_in(lfp_in, calibration_in)
+        tnt.calibration_in(calibration_in)
+        tnt.orientation(orientation)
+        tnt.depth_in(depth_in)
+
+        if 'image_out' in outputs:
+            rep = imagerep or self._db['imagerep_raw_image_out']
+            height, width = self._set_height_width(lfp_in, height, width)
+            image_out = self.image_out(dir_out, name, rep)
+            image_out = self._image_id(image_out, focus, u, v)
+            image_out = utils.sanitize_path(image_out)
+
+            tnt.imagerep(rep)
+            tnt.height(height)
+            tnt.width(width)
+            tnt.recipe_in(self.set_recipe_in(recipe_in, i))
+            tnt.focus(focus)
+            tnt.perspective_u(u)
+            tnt.perspective_v(v)
+
+        if 'depth_out' in outputs:
+            rep = depthrep or self._db['depthrep_raw_depth_out']
+            depth_out = self.depth_out(dir_out, name, rep)
+            depth_out = utils.sanitize_path(depth_out)
+
+            if not image_out:
+                rep = imagerep or self._db['imagerep_raw_depth_out']
+                image_out = self.image_out(dir_out, name, rep)
+                image_out = utils.sanitize_path(image_out)
+
+            tnt.depth_out(depth_out)
+            dest += [depth_out, self.jsn_out(image_out)]
+
+        tnt.image_out(image_out)
+        dest.insert(0, image_out)
+
+        action_out = ', '.join(x.replace('_', ' ') for x in outputs)
+        self._status(action_out, "raw", src=lfp_in, dest=tuple(dest), i=i)
+        self._execute(tnt)
+
+    @classmethod
+    def plan_stages(cls, plan):
+        """splits a multi-output plan into TNT stages
+
+        compatible outputs are merged into one fused stage, run first; every
+        other action is a stage of its own, in plan order, followed by the
+        stages it chains (e.g., ``unpack`` writes a recipe and depth map
+        json files for the unpacked LFP)
+
+        :param plan: `collections.OrderedDict`, action: keyword arguments
+        :return: `list`, (actions, keyword arguments) per stage
+        """
+
+        def sweep(kw):
+            return (isinstance(kw.get('focus'), list) or
+                    len(kw.get('perspective_u') or ()) > 1)
+
+        fused = [a for a, kw in plan.items()
+                 if a in cls._fusable and not sweep(kw)]
+
+        if len(fused) < 2:
+            fused = []
+
+        stages = []
+        if fused:
+            kwds = {}
+            [kwds.update(plan[a]) for a in fused]
+            stages.append((tuple(fused), kwds))
+
+        for action, kwds in plan.items():
+            if action not in fused:
+                stages.append(((action,), kwds))
+
+        return stages
+
+    def raw_plan(self, lfp_in, plan, i=0):
+        """runs a multi-output plan on a single raw LFP file
+
+        :param lfp_in: `str`, source LFP file
+        :param plan: `collections.OrderedDict`, action: keyword arguments
+        :param i: `int`, iteration during multi file-out process
+        """
+
+        for actions, kwds in self.plan_stages(plan):
+            kw = dict(kwds)
+
+            if len(actions) > 1:
+                for key in 'perspective_u', 'perspective_v':
+                    kw[key] = (kw.get(key) or [None])[0]
+                self.raw_fused(lfp_in, actions, i=i, **kw)
+                continue
+
+            action, = actions
+            process = getattr(self, self._plan_actions[action])
+
+            if action != 'image_out':
+                process(lfp_in, i=i, **kw)
+                continue
+
+            focus = kw.pop('focus', None)
+            focus = focus if isinstance(focus, list) else [focus]
+            pers_u = kw.pop('perspective_u', None) or [None]
+            pers_v = kw.pop('perspective_v', None) or [None]
+
+            for f in focus:
+                for u, v in zip(pers_u, pers_v):
+                    process(lfp_in, focus=f, perspective_u=u,
+                            perspective_v=v, i=i, **kw)
+
+    @traced(cat='action', args=('lfp_in', 'i'))
     def recipe_out(self, lfp_in, dir_out=None, threads=None, i=0):
         """TNT process: raw LFR/warp LFP to recipe file
 
@@ -737,6 +942,7 @@ class TntCommon(object):
         tnt.recipe_out(recipe_out)
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def warp_depth_map_json_out(self, lfp_in, dir_out=None, i=0):
         """generates min/max lambda json file(s) from LFP metadata
 
@@ -770,6 +976,42 @@ class TntCommon(object):
 
             utils.write(dest, data)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
+    def warp_extract(self, lfp_in, depth=True, dir_out=None, i=0):
+        """copies embedded images (and depth maps) out of a warp LFP
+
+        the encoded blobs are written as they are stored, no TNT involved
+
+        :param lfp_in: `str`, source LFP file
+        :param depth: `bool`, also extract depth and confidence maps
+        :param dir_out: `str`, directory out
+        :param i: `int`, iteration during multi file-out process
+        """
+
+        lfp = Lfp(lfp_in, self.print_help)
+        maps = 'depthMap', 'confidenceMap'
+
+        images = lfp.embedded_images
+        if not depth:
+            images = [x for x in images if x['kind'] not in maps]
+
+        basedir, name, ext = self._split_path(lfp_in)
+        dir_out = self._check_dir(dir_out) if dir_out else basedir
+
+        dests = []
+        for image in images:
+            base = '{}_{}_{:02d}'.format(name, image['kind'], image['index'])
+            rep = image['representation'] or 'dat'
+            dest = self.image_out(dir_out, base, rep)
+            dests.append((utils.sanitize_path(dest), image['ref']))
+
+        dest = [x for x, _ in dests]
+        self._status("embedded images", "warp", src=lfp_in, dest=dest, i=i)
+
+        for dest, ref in dests:
+            lfp.blob_copy(ref, dest)
+
+    @traced(cat='action', args=('lfp_in', 'i'))
     def warp_pack(self, lfp_in, depthrep=None, dir_out=None, height=None,
                   imagerep=None, threads=None, width=None, i=0):
         """TNT process: unpacked warp LFP to warp LFP
@@ -808,6 +1050,7 @@ class TntCommon(object):
         tnt.width(width)
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def warp_transcode(self, lfp_in, lfp_out=None, threads=None, i=0):
         """TNT process: warp LFP to warp LFP
 
@@ -828,6 +1071,7 @@ class TntCommon(object):
         tnt.transcode()
         self._execute(tnt)
 
+    @traced(cat='action', args=('lfp_in', 'i'))
     def warp_unpack(self, lfp_in, depthrep=None, dir_out=None, height=None,
                     imagerep=None, threads=None, width=None, i=0):
         """TNT process: warp LFP to unpacked warp LFP
@@ -20,6 +20,7 @@ import os
 import re
 import functools
 import multiprocessing
+import threading
 
 from lpt.lfp import config
 from lpt.lfp.lfp import Lfp
@@ -28,6 +29,10 @@ from lpt.utils.jsonutils import JsonUtils
 from lpt.utils.msgutils import MsgUtils
 from lpt.utils.msgutils import ToolError
 from lpt.utils.msgutils import ToolWarn
+from lpt.utils.profutils import profiled
+from lpt.utils.traceutils import span
+from lpt.utils.traceutils import traced
+from lpt.utils.traceutils import traced_target
 from lpt.utils.utils import Utils
 
 utils = Utils()
@@ -43,9 +48,17 @@ class Tool(object):
     raw_pattern = re.compile('^.+\.(raw|exr)$', flags=re.IGNORECASE)
     _file_pattern = config.file_pattern
     _schema_dir = config.dir_schema
-    _validate = config.db['validate']
 
     print_help = object
+    mute = False
+
+    # `collections.OrderedDict` of search results by (path, size, mtime,
+    # criteria); only set by long-running processes (see `daemon`), which
+    # search the same files over and over, from several threads; searches
+    # with a cache validate their misses without forking
+    cache = None
+    cache_size = 4096
+    _cache_lock = threading.Lock()
 
     def set_print_help(self, print_help):
         """sets `argparse` help menu for current command
@@ -139,9 +152,10 @@ class Tool(object):
 
         return image_paths
 
+    @traced(cat='search')
     def search(self, paths, raw=None, xraw=None, warp=None, unpacked=None,
-               compressed=None, v2=None, validate=_validate, file_range=(0, 0),
-               file_pattern=_file_pattern, processors=1, mute=False):
+               compressed=None, v2=None, validate=None, file_range=(0, 0),
+               file_pattern=_file_pattern, processors=1, mute=None):
         """searches for valid LFP files from a list of files or directories
 
         optional LFP types can be filtered for or out
@@ -158,8 +172,10 @@ class Tool(object):
         :param unpacked: `bool`, filter out or for unpacked LFP files
         :param compressed: `bool`, filter out or for compressed LFP files
         :param v2: `bool`, check if LFP is v2 LFP (keep True)
-        :param validate: `bool`, enable/disable lfp schema validation
-        :param mute: `bool`, mute messaging system when searching for LFP files
+        :param validate: `bool`, enable/disable lfp schema validation;
+                         defaults to the ``validate`` configuration value
+        :param mute: `bool`, mute messaging system when searching for LFP
+                     files; defaults to `Tool.mute`
         :param file_pattern: passed to utils.utils.Utils.file_filter
         :param file_range: passed to utils.utils.Utils.file_filter
         :param processors: `int`, amount of processors to use for analyzing
@@ -171,6 +187,11 @@ class Tool(object):
             xraw = False
             compressed = False
 
+        if validate is None:
+            validate = config.db['validate']
+        if mute is None:
+            mute = self.mute
+
         file_filter = functools.partial(utils.file_filter,
                                         file_pattern=file_pattern,
                                         file_range=file_range)
@@ -203,34 +224,51 @@ class Tool(object):
                 master.extend(fp for fp in file_paths if file_filter(fp))
 
         master = [(i, path) for i, path in enumerate(master, start=1)]
+        cached = self._cached(master, valid)
 
-        def _search():
+        def _fork(todo):
             queue = multiprocessing.Queue()
             done = multiprocessing.JoinableQueue()
             results = []
             procs = []
-            [queue.put(x) for x in master]
+            [queue.put(x) for x in todo]
 
             args = queue, done, valid
 
-            for _ in range(processors):
-                p = multiprocessing.Process(target=_search_worker, args=args)
+            for _ in range(min(processors, len(todo))):
+                target = traced_target(profiled(_search_worker))
+                p = multiprocessing.Process(target=target, args=args)
                 p.daemon = True
                 p.start()
                 procs.append(p)
 
-            for _ in range(len(master)):
+            for _ in range(len(todo)):
                 results.append(done.get())
                 done.task_done()
 
-            for _ in range(processors):
+            for _ in procs:
                 queue.put('STOP')
 
             done.join()
+            [p.join() for p in procs]
             queue.close()
             done.close()
+            return results
 
-            results = [x for x in results if x]
+        def _search():
+            todo = [x for x in master if x[1] not in cached]
+
+            # processes with a cache (see `daemon`) search from several
+            # threads, and forking a threaded process can deadlock; their
+            # misses, usually a few new files, are validated in this thread
+            if self.cache is not None:
+                results = [_search_one(self, path, valid) for _, path in todo]
+            else:
+                results = _fork(todo)
+
+            self._cache_put(results, valid)
+            results = [x for _, x in results if x]
+            results.extend(x for x in cached.values() if x)
             results.sort(key=lambda obj: obj.path)
             return results
 
@@ -243,6 +281,42 @@ class Tool(object):
             with msgutils.msg_indicator(data_status):
                 return _search()
 
+    @staticmethod
+    def _cache_key(path, valid):
+        """:return: `tuple`, search cache key, None if `path` is gone"""
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        return path, st.st_size, st.st_mtime, tuple(sorted(valid.items()))
+
+    def _cached(self, master, valid):
+        """:return: `dict`, cached search results (`Lfp` or None) by path"""
+
+        if self.cache is None:
+            return {}
+
+        keys = [(path, self._cache_key(path, valid)) for _, path in master]
+
+        with self._cache_lock:
+            return dict((p, self.cache[k]) for p, k in keys if k in self.cache)
+
+    def _cache_put(self, results, valid):
+        """caches (path, `Lfp` or None) search results, if caching is on"""
+
+        if self.cache is None:
+            return
+
+        keys = [(self._cache_key(path, valid), lfp) for path, lfp in results]
+
+        with self._cache_lock:
+            self.cache.update((k, lfp) for k, lfp in keys if k)
+
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
     def search_raw(self, paths):
         """searches for RAW file types from a list of files or directories
 
@@ -308,7 +382,7 @@ class Tool(object):
                     jsonutils.validate(frame, schema_file)
 
     def valid_lfp_file(self, lfp_path, compressed=None, raw=None, xraw=None,
-                       unpacked=None, v2=None, validate=_validate, warp=None):
+                       unpacked=None, v2=None, validate=None, warp=None):
         """verify that a file is a valid LFP
 
         optional LFP types can be filtered for or out
@@ -325,7 +399,8 @@ class Tool(object):
         :param warp: `bool`, check if LFP is warp
         :param unpacked: `bool`, check if LFP is unpacked
         :param compressed: `bool`, check if LFP is compressed
-        :param validate: `bool`, enable/disable lfp schema validation
+        :param validate: `bool`, enable/disable lfp schema validation;
+                         defaults to the ``validate`` configuration value
         :return: True if path is a valid LFP and all criteria was matched
         """
 
@@ -341,6 +416,8 @@ class Tool(object):
             ToolWarn(w)
             return False
 
+        if validate is None:
+            validate = config.db['validate']
         if validate:
             self.validate(lfp)
 
@@ -371,11 +448,18 @@ class Tool(object):
             assert os.path.isfile(path), ToolError(e, self.print_help)
 
 
+def _search_one(tool, file_path, types):
+    """:return: `tuple`, (path, `Lfp` or None) search result of one file"""
+
+    with span('valid_lfp_file', 'search', path=file_path):
+        valid_lfp = tool.valid_lfp_file(file_path, **types)
+    return file_path, valid_lfp if valid_lfp else None
+
+
 def _search_worker(q, done_q, types):
     """Tool.search multiprocessing worker"""
 
     tool = Tool()
     for item in iter(q.get, 'STOP'):
         index, file_path = item
-        valid_lfp = tool.valid_lfp_file(file_path, **types)
-        done_q.put(valid_lfp if valid_lfp else None)
+        done_q.put(_search_one(tool, file_path, types))
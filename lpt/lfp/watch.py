@@ -0,0 +1,577 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - lfp package - watch folder ingest"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# watch folders
+#
+# on Linux, watched directories are followed through inotify(7) (called
+# through ctypes, Python 2 has no binding): after one full scan, a poll
+# only stats the files the kernel reported as changed.  elsewhere, or if
+# inotify can not be set up (e.g. out of watches), directories are polled:
+# a directory is only listed again once its modification time changes, and
+# the files matching the LFP pattern are stat'ed.  files are not opened
+# until they are handed on.  a file is handed on once its size and
+# modification time have held still for the settle time, which leaves
+# files that are still being copied in alone.  the size and modification
+# time of every file handled are kept in a cursor file, so unchanged files
+# are not handled again, even after a restart.  failures may not last (a
+# file locked or a disk full), so a failed file is tried again after a
+# delay that doubles each time, and only recorded as handled once it has
+# failed `retries` times
+#
+
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import select
+import signal
+import stat
+import struct
+import sys
+import threading
+import time
+
+from lpt.lfp.daemon import _message
+from lpt.lfp.tool import Tool
+from lpt.utils.msgutils import MsgUtils
+from lpt.utils.msgutils import ToolError
+from lpt.utils.msgutils import ToolWarn
+from lpt.utils.utils import Utils
+
+msgutils = MsgUtils()
+utils = Utils()
+
+interval = 5.
+settle = 2.
+retries = 3
+backoff = 30.
+
+# coarsest file system timestamp (FAT); a directory listed within this long
+# of its last change may have been changed again in the same tick
+_tick = 2.
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0x00080000
+
+_event = struct.Struct('iIII')
+
+
+class _Inotify(object):
+    """Linux inotify(7) instance, through ctypes
+
+    :raise: `OSError` if inotify is not available
+    """
+
+    mask = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM |
+            _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_ONLYDIR)
+
+    def __init__(self):
+
+        e = "inotify is only available on Linux"
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, e)
+
+        try:
+            self.libc = ctypes.CDLL(ctypes.util.find_library('c'),
+                                    use_errno=True)
+            init = self.libc.inotify_init1
+        except (OSError, AttributeError):
+            raise OSError(errno.ENOSYS, e)
+
+        self.fd = init(_IN_NONBLOCK | _IN_CLOEXEC)
+        self._check(self.fd)
+        self.paths = {}
+
+    @staticmethod
+    def _check(result):
+        if result < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        return result
+
+    def add(self, path):
+        """watches a directory (not its subdirectories)"""
+
+        wd = self.libc.inotify_add_watch(self.fd, path, self.mask)
+        self.paths[self._check(wd)] = path
+
+    def forget(self, path):
+        """stops watching a directory and every directory inside it"""
+
+        prefix = path.rstrip(os.sep) + os.sep
+
+        for wd, p in self.paths.items():
+            if p == path or p.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.paths[wd]
+
+    def wait(self, timeout):
+        """waits up to `timeout` seconds for an event"""
+
+        try:
+            select.select([self.fd], [], [], timeout)
+        except select.error as e:
+            if e.args[0] != errno.EINTR:
+                raise
+
+    def read(self):
+        """:return: `list`, (path, mask) of every event queued"""
+
+        events = []
+
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EINTR):
+                    return events
+                raise
+
+            i = 0
+            while i < len(data):
+                wd, mask, _, length = _event.unpack_from(data, i)
+                name = data[i + _event.size:i + _event.size + length]
+                i += _event.size + length
+
+                if mask & _IN_Q_OVERFLOW:
+                    events.append((None, mask))
+                elif mask & _IN_IGNORED:
+                    self.paths.pop(wd, None)
+                elif wd in self.paths:
+                    name = name.rstrip('\0')
+                    path = self.paths[wd]
+                    events.append((os.path.join(path, name) if name
+                                   else path, mask))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Watcher(object):
+    """finds new and changed LFP files in watched directories
+
+    :param paths: `list`, directories (or single files) to watch
+    :param cursor: `str`, cursor file, None to not keep one
+    :param settle: `float`, seconds a file's size and modification time
+                   must hold still before it is handed on
+    :param file_filter: `object`, returns False for file paths to ignore
+    :param limit: `int`, most files handed on at a time, None for no limit
+    :param retries: `int`, times a file is tried before its failure is
+                    recorded as handled
+    :param backoff: `float`, seconds before the first retry of a failed
+                    file, doubled for every further one
+    :param notify: `bool`, follow changes through inotify where available,
+                   rather than polling
+    :param print_help: `object`, passed to ToolError for command help menu
+    :raise: `ToolError` if a watched path does not exist
+    """
+
+    def __init__(self, paths, cursor=None, settle=settle, file_filter=None,
+                 limit=None, retries=retries, backoff=backoff, notify=True,
+                 print_help=object):
+
+        self.paths = [utils.full_path(p) for p in paths]
+        self.cursor = cursor
+        self.settle = settle
+        self.file_filter = file_filter or (lambda path: path)
+        self.limit = limit
+        self.retries = retries
+        self.backoff = backoff
+        self.print_help = print_help
+
+        for path in self.paths:
+            e = "not a valid file or directory : {}".format(path)
+            assert os.path.exists(path), ToolError(e, self.print_help)
+
+        self.seen = self._load()
+        self.failed = {}
+        self.pending = {}
+        self.busy = set()
+        self._lock = threading.Lock()
+
+        # (mtime, listed at, LFP file names, subdirectory names) by
+        # directory, see `_scan_dir`
+        self._dirs = {}
+        self._files = None
+        self._notify = None
+
+        if notify:
+            try:
+                self._notify = _Inotify()
+            except OSError:
+                pass
+
+    def _load(self):
+        """:return: `dict`, [size, mtime, status] of handled files by path"""
+
+        if not self.cursor or not os.path.exists(self.cursor):
+            return {}
+
+        try:
+            with open(self.cursor) as f:
+                data = json.load(f)
+        except (IOError, ValueError) as e:
+            ToolWarn("ignoring cursor file {}: {}".format(self.cursor, e))
+            return {}
+
+        return dict((path.encode('utf-8'), v) for path, v in data.items())
+
+    def _save(self):
+
+        if not self.cursor:
+            return
+
+        with self._lock:
+            data = dict(self.seen)
+
+        try:
+            utils.write(self.cursor, data, atomic=True)
+        except (IOError, OSError) as e:
+            ToolWarn("could not write cursor file {}: {}".format(
+                self.cursor, e))
+
+    def _watched(self, path):
+        return any(path == p or path.startswith(p.rstrip(os.sep) + os.sep)
+                   for p in self.paths)
+
+    def _stat(self, path, found):
+        """adds the (size, mtime) of a file to `found`, or drops it"""
+
+        found.pop(path, None)
+
+        if not self.file_filter(path):
+            return
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+
+        if not stat.S_ISDIR(st.st_mode):
+            found[path] = st.st_size, st.st_mtime
+
+    def _scan_dir(self, path, found, dirs, watch=False):
+        """stats the LFP files of a directory tree
+
+        a directory is only listed again once its modification time has
+        changed; like `Utils.walk_path`, symbolic links to directories are
+        not followed
+
+        :param path: `str`, directory
+        :param found: `dict`, (size, mtime) by path, added to
+        :param dirs: `dict`, listings by directory, added to
+        :param watch: `bool`, add an inotify watch for every directory
+        """
+
+        listed = time.time()
+
+        try:
+            mtime = os.stat(path).st_mtime
+            if watch:
+                self._notify.add(path)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise
+            return
+
+        cached = self._dirs.get(path)
+
+        if cached and cached[0] == mtime and cached[1] - mtime > _tick:
+            listing = cached
+        else:
+            try:
+                names = os.listdir(path)
+            except OSError:
+                return
+
+            files, subdirs = [], []
+
+            for name in names:
+                name_path = os.path.join(path, name)
+                if os.path.isdir(name_path):
+                    if not os.path.islink(name_path):
+                        subdirs.append(name)
+                elif Tool.lfp_pattern.match(name):
+                    files.append(name)
+
+            listing = mtime, listed, files, subdirs
+
+        dirs[path] = listing
+
+        for name in listing[2]:
+            self._stat(os.path.join(path, name), found)
+
+        for name in listing[3]:
+            self._scan_dir(os.path.join(path, name), found, dirs, watch)
+
+    def _scan(self, watch=False):
+        """:return: `dict`, (size, mtime) of every watched file by path"""
+
+        found, dirs = {}, {}
+
+        for path in self.paths:
+            if os.path.isdir(path):
+                self._scan_dir(path, found, dirs, watch)
+            else:
+                if watch:
+                    self._notify.add(os.path.dirname(path))
+                self._stat(path, found)
+
+        self._dirs = dirs
+        return found
+
+    def _wanted(self, path):
+        """:return: `bool`, True if `path` is a file to watch"""
+
+        if path in self.paths:
+            return True
+
+        return bool(Tool.lfp_pattern.match(os.path.basename(path)) and
+                    self._watched(path))
+
+    def _update(self):
+        """applies the inotify events queued since the last poll"""
+
+        changed = set()
+
+        for path, mask in self._notify.read():
+
+            if mask & _IN_Q_OVERFLOW:
+                self._files = self._scan(watch=True)
+                return
+
+            if not mask & _IN_ISDIR:
+                changed.add(path)
+                continue
+
+            if not self._watched(path):
+                continue
+
+            if mask & (_IN_CREATE | _IN_MOVED_TO):
+                # files may have been added before the watch was
+                dirs = {}
+                self._scan_dir(path, self._files, dirs, watch=True)
+                self._dirs.update(dirs)
+
+            elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                self._notify.forget(path)
+                prefix = path + os.sep
+                for file_path in list(self._files):
+                    if file_path.startswith(prefix):
+                        del self._files[file_path]
+
+        for path in changed:
+            if self._wanted(path):
+                self._stat(path, self._files)
+
+    def _found(self):
+        """:return: `dict`, (size, mtime) of every watched file by path"""
+
+        if not self._notify:
+            return self._scan()
+
+        try:
+            if self._files is None:
+                # watches go up before the listings, so nothing added in
+                # between is missed
+                self._files = self._scan(watch=True)
+            else:
+                self._update()
+
+        except OSError as e:
+            ToolWarn("inotify: {}; polling instead".format(e.strerror))
+            self.close()
+            return self._scan()
+
+        return dict(self._files)
+
+    def close(self):
+        """stops following changes through inotify"""
+
+        if self._notify:
+            self._notify.close()
+            self._notify = None
+
+    def wait(self, timeout):
+        """waits up to `timeout` seconds, less once inotify reports a
+        change"""
+
+        if self._notify:
+            self._notify.wait(timeout)
+        else:
+            time.sleep(timeout)
+
+    def poll(self):
+        """scans the watched paths once
+
+        :return: `list`, new or changed files that have settled; they are
+                 busy until passed to `handled`
+        """
+
+        now = time.time()
+        found = self._found()
+        ready = []
+
+        with self._lock:
+            for path, stat in sorted(found.items()):
+                if path in self.busy:
+                    continue
+
+                seen = self.seen.get(path)
+                if seen and tuple(seen[:2]) == stat:
+                    self.pending.pop(path, None)
+                    continue
+
+                # a changed file gets a fresh set of tries
+                failed = self.failed.get(path)
+                if failed and tuple(failed[:2]) != stat:
+                    del self.failed[path]
+                elif failed and now < failed[3]:
+                    continue
+
+                held = self.pending.get(path)
+                if not held or held[0] != stat:
+                    self.pending[path] = stat, now
+                    continue
+
+                settled = now - held[1] >= self.settle and stat[0]
+                room = not self.limit or len(self.busy) < self.limit
+
+                if settled and room:
+                    del self.pending[path]
+                    self.busy.add(path)
+                    ready.append(path)
+
+            for path in set(self.pending) - set(found):
+                del self.pending[path]
+
+            for path in set(self.failed) - set(found):
+                del self.failed[path]
+
+            gone = [p for p in self.seen if p not in found and
+                    self._watched(p)]
+            for path in gone:
+                del self.seen[path]
+
+        if gone:
+            self._save()
+
+        return ready
+
+    def handled(self, path, status):
+        """records a file handed out by `poll`
+
+        a failed file is handed out again after a delay, until it has
+        failed `retries` times
+
+        :param path: `str`, file path
+        :param status: `str`, 'done', 'failed' or 'invalid'
+        """
+
+        # stat after the fact, so that actions rewriting their input in
+        # place (transcode) do not make it look changed
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+
+        with self._lock:
+            self.busy.discard(path)
+            self.pending.pop(path, None)
+            tries = self.failed.pop(path, [0] * 4)[2]
+
+            if not st:
+                return
+
+            if status == 'failed' and tries + 1 < self.retries:
+                delay = self.backoff * 2 ** tries
+                self.failed[path] = [st.st_size, st.st_mtime, tries + 1,
+                                     time.time() + delay]
+                return
+
+            self.seen[path] = [st.st_size, st.st_mtime, status]
+
+        self._save()
+
+    def _handle(self, handle, path):
+
+        start = time.time()
+
+        try:
+            status = handle(path)
+        except (Exception, SystemExit) as e:
+            ToolWarn("{}: failed: {}".format(path, _message(e)))
+            status = 'failed'
+
+        self.handled(path, status)
+
+        msg = "{} : {} ({:.2f}s)"
+        msgutils.msg(msg.format(status, path, time.time() - start))
+
+    def run(self, handle, interval=interval):
+        """hands every new or changed file to `handle` until interrupted
+        (SIGINT/SIGTERM)
+
+        every file is handled in its own thread, so a slow file does not
+        hold up the ones behind it
+
+        :param handle: `object`, called with a file path; returns its
+                       status, see `handled`; a raised exception fails it
+        :param interval: `float`, seconds between polls; with inotify, a
+                         change polls at once
+        """
+
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+        msg = "watching ({}) path(s), ({}) file(s) handled before{}"
+        msgutils.msg(msg.format(str(len(self.paths)).zfill(4),
+                                str(len(self.seen)).zfill(4),
+                                " (inotify)" if self._notify else ''))
+
+        try:
+            while True:
+                for path in self.poll():
+                    args = handle, path
+                    thread = threading.Thread(target=self._handle, args=args)
+                    thread.daemon = True
+                    thread.start()
+
+                # files settling are looked at again when they could be due
+                timeout = interval
+                if self.pending:
+                    timeout = min(interval, max(self.settle, .1))
+
+                self.wait(timeout)
+
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
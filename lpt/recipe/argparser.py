@@ -17,6 +17,7 @@
 # </copyright>
 
 import argparse
+import collections
 import functools
 from copy import deepcopy
 
@@ -127,7 +128,41 @@ class ArgParser(BaseView):
         if self.type_:
             self.type_.keywords['arg'] = self.key_arg
 
-    def add_parser(self, properties, subparsers, view):
+    _param_table = None
+
+    @property
+    def param_table(self):
+        """enabled view parameters, grouped, with their sub command metadata
+
+        computed once; lets the tool register a sub command for every view
+        parameter without building its arguments
+
+        :return: `collections.OrderedDict`, {group: [(parser key, help line,
+                 view parameter class properties), ...]}
+        """
+
+        if ArgParser._param_table is None:
+
+            param_dests = params.dests(
+                cls=True,
+                enabled=True,
+                exclude=('priorities',),
+                grouped=True)
+
+            table = collections.OrderedDict()
+
+            for group, dests in param_dests.items():
+                table[group] = []
+                for dest in dests:
+                    prop = getattr(params, dest)
+                    help_ = prop.help_.split('\n')[0]
+                    table[group].append((prop.key_parser, help_, prop))
+
+            ArgParser._param_table = table
+
+        return ArgParser._param_table
+
+    def add_parser(self, properties, subparsers, view=None):
         """creates a subparser based off of view parameter class properties
 
         :param properties: `params.Param`, view parameter class properties
@@ -215,10 +250,11 @@ class ArgParser(BaseView):
             dest='view_all')
 
     @staticmethod
-    def arg_recipe_in(parser):
+    def arg_recipe_in(parser, processors=True):
         """adds recipe input argument to given parser
 
         :param parser: `argparse.Namespace`, parser to add arguments to
+        :param processors: `bool`, also add the processors argument
         """
 
         title = "input arguments"
@@ -227,6 +263,12 @@ class ArgParser(BaseView):
                                         files or scanned directories
         ''')
 
+        if processors:
+            desc += '\n' + utils.dedent('''
+            --processors <INT>              recipe files to process
+                                            concurrently (default: 1)
+            ''')
+
         recipe = parser.add_argument_group(title=title, description=desc)
         recipe.add_argument(
             '-i', '--recipe-in',
@@ -235,11 +277,22 @@ class ArgParser(BaseView):
             dest='paths',
             help=argparse.SUPPRESS)
 
+        if not processors:
+            return
+
+        recipe.add_argument(
+            '--processors',
+            default=1,
+            type=functools.partial(argutils.processors, arg='--processors'),
+            dest='processors',
+            help=argparse.SUPPRESS)
+
     @staticmethod
-    def arg_recipe_out(parser):
+    def arg_recipe_out(parser, processors=False):
         """adds recipe output argument to given parser
 
         :param parser: `argparse.Namespace`, parser to add arguments to
+        :param processors: `bool`, also add the processors argument
         """
 
         title = "output arguments"
@@ -247,6 +300,12 @@ class ArgParser(BaseView):
         -o, --recipe-out [<PATH> ...]   recipe output file path(s)
         ''')
 
+        if processors:
+            desc += '\n' + utils.dedent('''
+            --processors <INT>              recipe files to write
+                                            concurrently (default: 1)
+            ''')
+
         parser.add_argument_group(title=title, description=desc)
         parser.add_argument(
             '-o', '--recipe-out',
@@ -255,6 +314,16 @@ class ArgParser(BaseView):
             dest='paths',
             help=argparse.SUPPRESS)
 
+        if not processors:
+            return
+
+        parser.add_argument(
+            '--processors',
+            default=1,
+            type=functools.partial(argutils.processors, arg='--processors'),
+            dest='processors',
+            help=argparse.SUPPRESS)
+
     @staticmethod
     def arg_select(parser):
         """select argument
@@ -630,12 +699,18 @@ class ArgParser(BaseView):
         steps = dflt(self._auto_steps)
 
         anim_args = []
+        anim_props = []
 
         for group, props in groups.items():
             props = [p for p in props if p.animation]
+            anim_props.extend(props)
             for prop in props:
                 anim_args.append((prop.key_arg, prop.dest))
 
+        # --t0/--t1 come from `self.animation`; animation times are typed
+        # alike for every parameter, so any animated one will do
+        self._init(anim_props[-1])
+
         anim_args.sort()
         flags, merge_list = zip(*anim_args)
         flags_desc = self._flag_desc(flags)
@@ -866,6 +941,18 @@ class ArgParser(BaseView):
             vals['help'] = argparse.SUPPRESS
             group.add_argument(*args, **vals)
 
+    def add_view_argument(self, properties, view):
+        """adds a view parameter's argument to the ``view`` sub command
+
+        :param properties: `params.Param`, view parameter class properties
+        :param view: `argparse.Namespace`, ``view`` argument group
+        """
+
+        self._init(properties)
+
+        if not (self.crop or self.luminance_tone_curve):
+            self.args_view(view)
+
     def args_view_store_true(self, parser, groups):
 
         """`argparse` ``store_bool`` action using `self` view argument
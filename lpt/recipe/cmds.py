@@ -16,23 +16,29 @@
 # SOFTWARE OR ITS DERIVATIVES.
 # </copyright>
 
+import argparse
 import random
 import collections
+import multiprocessing
+import Queue
 
 from functools import partial
 
 import dictdiffer
 
-from lpt.lfp.tnt import Tnt
 from lpt.lfp.tool import Tool
 from lpt.recipe.make import Make
 from lpt.recipe.params import Params
 from lpt.recipe.recipe import Recipe
+from lpt.recipe.template import Template
 from lpt.utils.argutils import ArgUtils
 from lpt.utils.calcutils import CalcUtils
+from lpt.utils.jsonutils import JsonUtils
 from lpt.utils.msgutils import MsgUtils
 from lpt.utils.msgutils import ToolError
 from lpt.utils.msgutils import ToolWarn
+from lpt.utils.profutils import profiled
+from lpt.utils.traceutils import traced_target
 from lpt.utils.utils import Utils
 
 tool = Tool()
@@ -40,6 +46,7 @@ msgutils = MsgUtils()
 utils = Utils()
 argutils = ArgUtils()
 calcutils = CalcUtils()
+jsonutils = JsonUtils()
 view_params = Params()
 
 od = collections.OrderedDict
@@ -153,6 +160,10 @@ class Cmds(Make):
         """
 
         self._set_print_help(args)
+
+        if getattr(args, 'processors', 1) > 1:
+            return self._current_parallel(args)
+
         recipe_files = self.search(args.paths)
 
         i = 0
@@ -181,6 +192,115 @@ class Cmds(Make):
         count = str(i).zfill(4)
         msgutils.msg("({}) file(s) completed processing".format(count))
 
+    def _current_parallel(self, args):
+        """`current` across several processes
+
+        every file is read once, validated once (when written) and written
+        atomically; per-file messages are muted and results are reported
+        once all files are done
+
+        :param args: `argparse.Namespace`, input arguments from recipe
+        :raise: `ToolError` if no valid files processed
+        """
+
+        master = list(enumerate(self.search(args.paths, verify=False), 1))
+
+        # workers rebuild the arguments; bound methods do not pickle
+        kwds = dict((k, v) for k, v in vars(args).items() if not callable(v))
+        kwds['action'] = args.action.__name__
+
+        queue = multiprocessing.Queue()
+        done = multiprocessing.Queue()
+        lock = multiprocessing.Lock()
+        procs = []
+        [queue.put(x) for x in master]
+
+        for _ in range(args.processors):
+            target = traced_target(profiled(_current_worker))
+            p = multiprocessing.Process(target=target,
+                                        args=(queue, done, kwds, lock))
+            p.daemon = True
+            p.start()
+            procs.append(p)
+            queue.put('STOP')
+
+        # a worker killed mid-file never reports it; stop waiting once
+        # every worker is gone and fail whatever was not reported
+        results = []
+        while len(results) < len(master):
+            try:
+                results.append(done.get(timeout=.5))
+            except Queue.Empty:
+                if not any(p.is_alive() for p in procs):
+                    break
+
+        while len(results) < len(master):
+            try:
+                results.append(done.get(timeout=.1))
+            except Queue.Empty:
+                break
+
+        [p.join() for p in procs]
+
+        reported = set(r[0] for r in results)
+        results.extend((path, 'failed', 'worker process exited')
+                       for _, path in master if path not in reported)
+
+        processed = [r for r in results if r[1] == 'done']
+        failed = sorted(r for r in results if r[1] == 'failed')
+
+        for path, _, message in failed:
+            ToolWarn("{}: {}".format(path, message))
+
+        e = "no valid input files found : " + ', '.join(args.paths)
+        assert processed or failed, ToolError(e, self.print_help)
+
+        msg = "({}) file(s) completed processing"
+        msgutils.msg(msg.format(str(len(processed)).zfill(4)))
+
+        if failed:
+            msg = "({}) file(s) failed"
+            msgutils.msg(msg.format(str(len(failed)).zfill(4)))
+
+    def current_file(self, args, recipe_file, lock, i=0):
+        """runs a `current` action on a single recipe file
+
+        the file is read once, validated when written and written atomically
+
+        :param args: `argparse.Namespace`, input arguments from recipe
+        :param recipe_file: `str`, recipe file to process
+        :param lock: `multiprocessing.Lock`, held while writing to stdout
+        :param i: `int`, file count, for messaging
+        :return: False if `recipe_file` is not a recipe file, else True
+        """
+
+        data = jsonutils.data(recipe_file)
+
+        if data is False or not all(k in view_params.recipe_keys for k in data):
+            return False
+
+        status = partial(msgutils.status, src=recipe_file, count=i,
+                         answer=True)
+
+        recipe = Recipe(recipe_file, args.print_help, data=data,
+                        validate=False)
+        before = recipe.store if args.verbose else {}
+
+        # keep each file's output together
+        if args.action.__name__ == 'info':
+            with lock:
+                args.action(args, recipe, status)
+        else:
+            args.action(args, recipe, status)
+
+        if args.verbose:
+            diff = list(dictdiffer.diff(before, recipe.store))
+            with lock:
+                msgutils.dumps(diff)
+
+        recipe.flush()
+        return True
+
     def destroy(self, args, recipe, status):
         """destroy command -- destroys view parameters
 
@@ -427,18 +547,52 @@ class Cmds(Make):
     def new(self, args):
         """new command -- creates new recipes
 
+        recipes are copies of TNT's default recipe, which is generated once
+        per TNT binary (see `template.Template`); with ``--processors``
+        the copies are written concurrently
+
         :param args: `argparse.Namespace`, input arguments from recipe
         """
 
         self._set_print_help(args)
 
-        for i, file_path in enumerate(args.paths, start=1):
-            recipe_out = utils.sanitize_path(file_path)
-            msgutils.status("generating new recipe file",
-                            count=i, dest=recipe_out)
-            Tnt(recipe_out=recipe_out).execute()
-            recipe = Recipe(recipe_out, self.print_help)
-            recipe.flush()
+        template = Template(self.print_help)
+        zulu_time = utils.zulu_time()
+        processors = getattr(args, 'processors', 1)
+
+        if processors == 1:
+            for i, file_path in enumerate(args.paths, start=1):
+                recipe_out = utils.sanitize_path(file_path)
+                msgutils.status("generating new recipe file",
+                                count=i, dest=recipe_out)
+                template.stamp(recipe_out, zulu_time)
+            return
+
+        # names are reserved up front; files are only written by workers
+        taken = set()
+        for file_path in args.paths:
+            taken.add(utils.sanitize_path(file_path, taken=taken))
+
+        master = sorted(taken)
+        msgutils.msg("generating ({}) new recipe file(s)".format(
+            str(len(master)).zfill(4)))
+
+        queue = multiprocessing.Queue()
+        lock = multiprocessing.Lock()
+        procs = []
+        [queue.put(x) for x in master]
+
+        for _ in range(min(processors, len(master))):
+            target = traced_target(profiled(_new_worker))
+            p = multiprocessing.Process(
+                target=target,
+                args=(queue, template.data, zulu_time, lock, args.verbose))
+            p.daemon = True
+            p.start()
+            procs.append(p)
+            queue.put('STOP')
+
+        [p.join() for p in procs]
 
     def plot(self, args, recipe, status):
         """plot command -- graphs out animation parameter values
@@ -647,3 +801,44 @@ class Cmds(Make):
                 index(points[0])
             else:
                 control_points(points)
+
+
+_work_cmds = Cmds()
+
+
+def _current_worker(task, done, kwds, lock):
+    """Cmds.current multiprocessing worker
+
+    puts a (path, 'done'/'skipped'/'failed', message) tuple per file
+    """
+
+    args = argparse.Namespace(**kwds)
+    args.action = getattr(_work_cmds, kwds['action'])
+    args.print_help = object
+    _work_cmds._set_print_help(args)
+
+    for item in iter(task.get, 'STOP'):
+        i, path = item
+
+        try:
+            if _work_cmds.current_file(args, path, lock, i=i):
+                done.put((path, 'done', ''))
+            else:
+                done.put((path, 'skipped', ''))
+        except Exception as e:
+            # drop the timestamped prefix of ToolError messages
+            message = str(e).split('ERROR: ', 1)[-1].strip()
+            done.put((path, 'failed', message))
+
+
+def _new_worker(task, data, zulu_time, lock, verbose):
+    """Cmds.new multiprocessing worker; stamps out template copies"""
+
+    template = Template(data=data)
+
+    for recipe_out in iter(task.get, 'STOP'):
+        template.stamp(recipe_out, zulu_time)
+
+        if verbose:
+            with lock:
+                msgutils.msg("generated new recipe file : " + recipe_out)
@@ -58,12 +58,22 @@ elif sys.platform == 'win32':
     schema_file = abspath(dir_schema, 'lfp/picture/2.1.7/picture_schema.json')
 
 else:
-    raise OSError("unsupported operating system: " + sys.platform)
+    # other POSIX systems (e.g. Linux render workers): XDG config home and
+    # the newest recipe format
+    home = os.getenv('XDG_CONFIG_HOME') or abspath(os.path.expanduser('~'),
+                                                   '.config')
+    lytro_home = abspath(home, 'lytro')
+    recipe_version = 5
+    schema_dummy = abspath(dir_schema, 'picture_schema_2.1.7_dummy.json')
+    schema_file = abspath(dir_schema, 'lfp/picture/2.1.7/picture_schema.json')
+
+lytro_home = os.getenv('LPT_LYTRO_HOME') or lytro_home
 
 recipe_json = 'recipe.json'
 recipe_versions = 1, 2, 3, 4, 5
 bools = True, False, None, 0, 1
 powertools_cfg = abspath(lytro_home, 'lytro-power-tools.cfg')
+dir_templates = abspath(lytro_home, 'recipe-templates')
 auto_buffer = .0001
 
 # user configuration initialization
@@ -20,7 +20,6 @@ import collections
 import os
 import re
 import tempfile
-import numpy as np
 
 from functools import partial
 from collections import deque
@@ -631,6 +630,8 @@ class Make(object):
                         }
         """
 
+        import numpy as np
+
         recipe = self._recipe(recipe)
         t_ones = [x['t1'] for x in master.values()]
         duration = max(t_ones)
@@ -686,14 +687,18 @@ class Make(object):
 
                 index_t0 += span
 
-    def search(self, paths):
+    def search(self, paths, verify=True):
         """search a file or directory for recipe files
 
         :param paths:  `list`, list of files or directories to search
+        :param verify: `bool`, read and check each candidate file; if False,
+                       every JSON file found is yielded unread
         :yield: valid recipe files
         :raise: `ToolError` if a specified path is invalid
         """
 
+        def valid(x): return self.verify(x) if verify else True
+
         paths = utils.make_iter(paths)
         msg = "searching for valid v{} recipe files".format(self._version)
         isdir = os.path.isdir
@@ -707,14 +712,14 @@ class Make(object):
             e = "not a valid file or directory : " + path
             assert (isdir(path) or isfile(path)), ToolError(e, self.print_help)
 
-            if os.path.isfile(path) and self.verify(path):
+            if os.path.isfile(path) and valid(path):
                 yield os.path.abspath(path)
 
             elif os.path.isdir(path):
                 file_paths = utils.walk_path(path, ext='json')
 
                 for file_path in file_paths:
-                    if self.verify(file_path):
+                    if valid(file_path):
                         yield os.path.abspath(file_path)
 
     def verify(self, path):
@@ -732,9 +737,7 @@ class Make(object):
         else:
             if data is False:
                 return False
-            keys = data.keys()
-            dests = params.dests(meta=True, include_animation=True)
-            return all(k in dests for k in keys)
+            return all(k in params.recipe_keys for k in data)
 
     def view_params(self, **kwargs):
         """parses through kwargs for, and formats, view parameters
@@ -60,6 +60,62 @@ unsigned_int_150_meta = meta_range(unsigned_int_150)
 print_help_obj = object
 
 
+class KeyFormats(object):
+    """view parameter key formats, computed once per key
+
+    maps a recipe key (``viewFocusSpread``) to its class (``focus_spread``),
+    argument (``--focus-spread``), parser (``focus-spread``) and title
+    (``Focus Spread``) formats; `Params` registers every view parameter up
+    front, any other key is registered on first lookup
+    """
+
+    forms = od([
+        ('cls', dict(join='_')),
+        ('arg', dict(join='-', pre='--')),
+        ('parser', dict(join='-')),
+        ('title', dict(join=' '))])
+
+    def __init__(self):
+
+        self._table = {}
+
+    def __call__(self, key, form='cls', ver=False):
+        """
+        :param key: `str`, recipe key to look up
+        :param form: `str`, key format; one of `self.forms`
+        :param ver: `bool`, strip version integers from the key
+        :return: formatted key
+        """
+
+        try:
+            return self._table[key, ver][form]
+        except KeyError:
+            return self.register(key, ver)[form]
+
+    def register(self, key, ver=False):
+        """computes every format of `key`, if not already known
+
+        :param key: `str`, recipe key to register
+        :param ver: `bool`, strip version integers from the key
+        :return: `dict`, {form: formatted key}
+        """
+
+        if (key, ver) not in self._table:
+
+            formats = {}
+            for form, kw in self.forms.items():
+                formats[form] = arg_format(key, camel=True, rm='view',
+                                           ver=ver, **kw)
+
+            formats['title'] = formats['title'].title()
+            self._table[key, ver] = formats
+
+        return self._table[key, ver]
+
+
+key_formats = KeyFormats()
+
+
 class BaseView(object):
     """base parser object for adding view parameters as subparsers"""
 
@@ -101,8 +157,8 @@ class BaseView(object):
     luminance_tone_curve = {}
     fx = {}
 
-    def _key(self, **kw):
-        return arg_format(self.dest, camel=True, rm='view', ver=self.ver, **kw)
+    def _key(self, form):
+        return key_formats(self.dest, form, self.ver)
 
     @property
     def key_arg(self):
@@ -111,7 +167,7 @@ class BaseView(object):
         :return: formatted string
         """
 
-        return self._key(join='-', pre='--')
+        return self._key('arg')
 
     @property
     def key_cls(self):
@@ -120,7 +176,7 @@ class BaseView(object):
         :return: formatted string
         """
 
-        return self._key(join='_')
+        return self._key('cls')
 
     @property
     def key_parser(self):
@@ -129,7 +185,7 @@ class BaseView(object):
         :return: formatted string
         """
 
-        return self._key(join='-')
+        return self._key('parser')
 
     @property
     def key_title(self):
@@ -138,7 +194,7 @@ class BaseView(object):
         :return: formatted string
         """
 
-        return self._key(join=' ').title()
+        return self._key('title')
 
 
 class _Partial(functools.partial):
@@ -1799,20 +1855,26 @@ class Params(object):
         self.fx = None
         self.priorities = None
         self.zulu_time = None
+        self._recipe_keys = None
+
+        self._views = []
+        for key, cls in sorted(globals().items()):
+            if key.startswith('View') or key == 'ZuluTime':
+                self._views.append(cls())
 
-        [setattr(self, cls.key_cls, cls) for cls in self._globals]
+        for view in self._views:
+            setattr(self, view.key_cls, view)
+
+            for ver in True, False:
+                key_formats.register(view.dest, ver)
+                if view.animation:
+                    key_formats.register(view.dest + 'Animation', ver)
 
     @property
     def _globals(self):
         """global params items"""
 
-        items = globals().items()
-        items.sort()
-
-        for key, cls in items:
-            if not (key.startswith('View') or key == 'ZuluTime'):
-                continue
-            yield cls()
+        return iter(self._views)
 
     @property
     def dependencies(self):
@@ -1822,6 +1884,16 @@ class Params(object):
             if attr.depends:
                 yield attr.key_cls, attr.depends
 
+    @property
+    def recipe_keys(self):
+        """:return: `frozenset`, every valid top-level recipe key"""
+
+        if self._recipe_keys is None:
+            dests = self.dests(meta=True, include_animation=True)
+            self._recipe_keys = frozenset(dests)
+
+        return self._recipe_keys
+
     def dests(self, cls=False, enabled=False, exclude=(), grouped=False,
               include_animation=False, meta=False, version=_version):
         """filter for destinations in params classes
@@ -22,6 +22,7 @@ from functools import partial
 
 from lpt.recipe import config
 from lpt.recipe.params import Params
+from lpt.recipe.params import key_formats
 from lpt.utils.argutils import ArgUtils
 from lpt.utils.jsonutils import JsonUtils
 from lpt.utils.msgutils import MsgUtils
@@ -37,12 +38,11 @@ jsonutils = JsonUtils()
 
 od = collections.OrderedDict
 all_or_none = argutils.all_or_none
-arg_format = argutils.arg_format
 
 all_ = partial(utils.all_, iter_=False)
 any_ = partial(utils.any_, iter_=False)
 dumps = partial(msgutils.dumps, answer=True, sort_keys=False)
-key_cls = partial(arg_format, camel=True, rm='view', join='_', ver=True)
+key_cls = partial(key_formats, form='cls', ver=True)
 flatten = partial(utils.flatten, iter_=False)
 print_help_obj = object
 
@@ -153,6 +153,9 @@ class Recipe(collections.MutableMapping):
 
     :param path: `str`, path to recipe file
     :param print_help: `object`, passed to ToolError for command help menu
+    :param data: `dict`, recipe file content if already read from `path`
+    :param validate: `bool`, validate the recipe file when it is read; if
+                     False, validation is left to `flush`
     """
 
     _parameters = sorted(params.dests(meta=True))
@@ -163,7 +166,10 @@ class Recipe(collections.MutableMapping):
     _ver_str = '' if _version == 1 else str(_version)
     _recipe_key = 'recipe{}'.format(_ver_str)
 
-    def __init__(self, path=None, print_help=object):
+    _dummy = None
+
+    def __init__(self, path=None, print_help=object, data=None,
+                 validate=True):
 
         self._special = {
             'viewCrop': _DictCrop,
@@ -185,7 +191,7 @@ class Recipe(collections.MutableMapping):
         self.init()
 
         if path:
-            self.import_(path)
+            self.import_(path, data=data, validate=validate)
             self.load()
 
         self.zulu_time = getattr(self, 'zulu_time', lambda: utils.zulu_time())
@@ -324,16 +330,23 @@ class Recipe(collections.MutableMapping):
         assert self.path, ToolError(e, print_help_obj)
         store = self.store
         store.update(self.unsupported_data)
-        utils.write(self.path, od(sorted(store.items())))
+        utils.write(self.path, od(sorted(store.items())), atomic=True)
 
-    def import_(self, recipe_file):
+    def import_(self, recipe_file, data=None, validate=True):
         """reads input recipe file and loads raw data into `self`
 
         :param recipe_file: `str`, path to recipe file
+        :param data: `dict`, recipe file content if already read
+        :param validate: `bool`, validate the recipe file content
         """
 
-        raw_data = jsonutils.data(recipe_file, valid=True)
-        self.validate(data=raw_data)
+        if data is None:
+            raw_data = jsonutils.data(recipe_file, valid=True)
+        else:
+            raw_data = data
+
+        if validate:
+            self.validate(data=raw_data)
         self.raw_data = raw_data
         self._raw_copy = copy.deepcopy(raw_data)
         self.path = recipe_file
@@ -407,7 +420,11 @@ class Recipe(collections.MutableMapping):
         """
 
         data = data or self.store
-        dummy = jsonutils.data(self._schema_dummy)
+
+        if Recipe._dummy is None:
+            Recipe._dummy = jsonutils.data(self._schema_dummy)
+
+        dummy = Recipe._dummy
         dummy['views'][0][self._recipe_key] = data
         jsonutils.validate(dummy, self._schema_file, raise_=True)
 
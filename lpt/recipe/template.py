@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - recipe package - cached default recipe template"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# default recipe template
+#
+# TNT's default recipe only changes with the TNT binary, so it is generated
+# once, validated and normalized through `Recipe`, and kept under the user's
+# Lytro directory; the cache file is named after the binary's path, size and
+# modification time (and this tool's version), so replacing TNT regenerates it
+#
+
+import collections
+import hashlib
+import json
+import os
+
+from lpt.lfp.tnt import Tnt
+from lpt.recipe import config
+from lpt.recipe.recipe import Recipe
+from lpt.utils.msgutils import ToolError
+from lpt.utils.utils import Utils
+
+utils = Utils()
+
+od = collections.OrderedDict
+
+
+class Template(object):
+    """default recipe produced by TNT, cached per TNT binary
+
+    :param print_help: `object`, passed to ToolError for command help menu
+    :param data: `collections.OrderedDict`, template content already read
+                 (e.g. by a parent process), None to read it when needed
+    """
+
+    def __init__(self, print_help=object, data=None):
+        self.print_help = print_help
+        self._data = data
+
+    @property
+    def key(self):
+        """:return: `str`, cache key of the installed TNT binary"""
+
+        exe = os.path.realpath(Tnt._exe)
+        e = "tnt binary not found: {}".format(exe)
+        assert os.path.exists(exe), ToolError(e, self.print_help)
+
+        st = os.stat(exe)
+        ident = '|'.join([exe, str(st.st_size), str(int(st.st_mtime)),
+                          config.__version__])
+        return hashlib.sha1(ident).hexdigest()[:16]
+
+    @property
+    def path(self):
+        """:return: `str`, cache file path of the installed TNT binary"""
+
+        return os.path.join(config.dir_templates, self.key + '.json')
+
+    def _generate(self, path):
+        """runs TNT once and caches its (validated) default recipe
+
+        :param path: `str`, cache file to write
+        :raise: `ToolError` if TNT did not write a recipe
+        """
+
+        if not os.path.exists(config.dir_templates):
+            os.makedirs(config.dir_templates)
+
+        tmp = '{}.{}.tnt'.format(path, os.getpid())
+        Tnt(recipe_out=tmp).execute()
+
+        e = "tnt did not generate a recipe file: {}".format(tmp)
+        assert os.path.exists(tmp), ToolError(e, self.print_help)
+
+        try:
+            Recipe(tmp, self.print_help).flush()
+            # another process may have cached the same template meanwhile
+            if not os.path.exists(path):
+                os.rename(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    @property
+    def data(self):
+        """:return: `collections.OrderedDict`, default recipe content"""
+
+        if self._data is None:
+            path = self.path
+
+            if not os.path.exists(path):
+                self._generate(path)
+
+            with open(path) as f:
+                self._data = json.load(f, object_pairs_hook=od)
+
+        return self._data
+
+    def stamp(self, recipe_out, zulu_time=None):
+        """writes a new recipe file from the template
+
+        :param recipe_out: `str`, recipe file to write
+        :param zulu_time: `str`, recipe time stamp, defaults to now
+        """
+
+        data = od(self.data)
+        data['zuluTime'] = zulu_time or utils.zulu_time()
+        utils.write(recipe_out, data, atomic=True)
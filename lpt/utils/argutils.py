@@ -22,10 +22,11 @@ import glob
 import multiprocessing
 import os
 import re
+import sys
 import pytweening
 
-from numpy import less_equal as le
-from numpy import greater_equal as ge
+from operator import le
+from operator import ge
 
 from lpt.utils.utils import Utils
 from lpt.utils.jsonutils import JsonUtils
@@ -665,3 +666,45 @@ class ArgumentParser(argparse.ArgumentParser):
             default=False,
             help=argparse.SUPPRESS,
             action='store_true')
+
+        self.add_argument(
+            '--profile',
+            default=None,
+            help="profile the command and its worker processes; per-process "
+                 "and merged pstats files are written to DIR",
+            metavar='DIR',
+            dest='profile')
+
+        self.add_argument(
+            '--trace',
+            default=None,
+            help="record a Chrome Trace Event timeline of the command and its "
+                 "worker processes to DIR",
+            metavar='DIR',
+            dest='trace')
+
+    def invoked(self, commands, argv=None):
+        """sub command named on the command line, if any
+
+        lets a tool build arguments for the invoked sub command only; every
+        other sub command needs nothing more than its name and help line
+
+        :param commands: `iter`, valid sub command names
+        :param argv: `list`, arguments to inspect, default ``sys.argv[1:]``
+        :return: invoked sub command name, None if missing or unrecognized
+        """
+
+        argv = sys.argv[1:] if argv is None else argv
+        actions = self._option_string_actions
+        skip = False
+
+        for arg in argv:
+            if skip:
+                skip = False
+            elif arg.startswith('-'):
+                # values of top-level options (e.g. --profile DIR) are not
+                # sub command names
+                action = actions.get(arg)
+                skip = bool(action and action.nargs is None)
+            else:
+                return arg if arg in commands else None
@@ -18,16 +18,15 @@
 
 import pytweening
 import collections
-import numpy as np
-
-from scipy import interpolate
 
 from lpt.utils.utils import Utils
 from lpt.utils.msgutils import ToolError
 
 utils = Utils()
 od = collections.OrderedDict
-interp1d = interpolate.interp1d
+
+# numpy and scipy are imported where they are used; they account for most of
+# the start up time of every command, including those that never need them
 
 
 class CalcUtils(object):
@@ -78,6 +77,8 @@ class CalcUtils(object):
         e = "array contains non-unique values"
         assert len(array) == len(set(array)), ToolError(e, self.print_help)
 
+        import numpy as np
+
         array = self._array(array)
         value = min(array, key=lambda x: abs(x - number))
         index = np.where(array == value)[0][0]
@@ -87,6 +88,8 @@ class CalcUtils(object):
     def _array(array, type_=float):
         """converts lst to numpy.array"""
 
+        import numpy as np
+
         return np.array([type_(x) for x in array])
 
     def interp(self, x, y, num=None, **kwargs):
@@ -99,6 +102,9 @@ class CalcUtils(object):
         :return: interpolated list of x/y points
         """
 
+        import numpy as np
+        from scipy.interpolate import interp1d
+
         x = self._array(x)
         y = self._array(y)
         a = x[0]
@@ -154,6 +160,8 @@ class CalcUtils(object):
         :return: tweened x/y points
         """
 
+        import numpy as np
+
         x_line = np.linspace(a, b, num)
         y_line = self._array([func(n) for n in x_line])
         return x_line, y_line
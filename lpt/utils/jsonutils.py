@@ -16,9 +16,9 @@
 # SOFTWARE OR ITS DERIVATIVES.
 # </copyright>
 
+import collections
 import json
 import os
-import jsonschema
 
 from lpt.utils.msgutils import MsgUtils
 from lpt.utils.msgutils import ToolError
@@ -31,7 +31,6 @@ msgutils = MsgUtils()
 class JsonUtils(object):
     """Lytro Power Tools json file manipulation functions"""
 
-    ValidationError = jsonschema.ValidationError
     print_help = object
 
     def set_print_help(self, print_help):
@@ -43,6 +42,24 @@ class JsonUtils(object):
         self.print_help = print_help
         utils.set_print_help(print_help)
 
+    @staticmethod
+    def to_str(obj):
+        """converts decoded JSON strings back to `str`
+
+        :param obj: decoded JSON data; objects keep their key order
+        :return: `obj` with every `unicode` string UTF-8 encoded
+        """
+
+        if isinstance(obj, unicode):
+            return obj.encode('utf-8')
+        elif isinstance(obj, list):
+            return [JsonUtils.to_str(x) for x in obj]
+        elif isinstance(obj, dict):
+            return collections.OrderedDict(
+                (JsonUtils.to_str(k), JsonUtils.to_str(v))
+                for k, v in obj.items())
+        return obj
+
     @staticmethod
     def _load_schema(schema_file):
         """load Lytro schema as a json object"""
@@ -125,13 +142,33 @@ class JsonUtils(object):
         :raise: `ToolError` if `raise_` is True and validation fails
         """
 
-        schema = self._load_schema(schema_file)
-        try:
-            jsonschema.validate(json_data, schema)
-        except jsonschema.ValidationError as e:
-            if raise_:
-                raise ToolError(e, self.print_help)
-            else:
-                return False
-        else:
+        import jsonschema
+
+        validator = self._validator(schema_file)
+        e = jsonschema.exceptions.best_match(validator.iter_errors(json_data))
+
+        if e is None:
             return True
+        elif raise_:
+            raise ToolError(e, self.print_help)
+        else:
+            return False
+
+    _validators = {}
+
+    def _validator(self, schema_file):
+        """schema validator for `schema_file`, checked and cached on first use
+
+        checking the schema itself costs far more than validating a recipe
+        against it, and the same schema is used for every recipe of a run
+        """
+
+        import jsonschema
+
+        if schema_file not in self._validators:
+            schema = self._load_schema(schema_file)
+            cls = jsonschema.validators.validator_for(schema)
+            cls.check_schema(schema)
+            self._validators[schema_file] = cls(schema)
+
+        return self._validators[schema_file]
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - utilities package - shared profiling utilities"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# cross-process profiling
+#
+# the parent process is profiled for the duration of a command; worker
+# process targets are wrapped so that each child profiles itself and dumps
+# its own pstats file next to the parent's.  the run is handed to children
+# through environment variables so that nothing has to be threaded through
+# the worker argument tuples
+#
+
+import contextlib
+import cProfile
+import glob
+import os
+import pstats
+import sys
+
+env_dir = 'LPT_PROFILE_DIR'
+env_run = 'LPT_PROFILE_RUN'
+stats_ext = '.pstats'
+report_lines = 30
+
+
+def _stats_path(dir_out, run, pid):
+    """:return: per-process pstats file path"""
+
+    return os.path.join(dir_out, '{}.{}{}'.format(run, pid, stats_ext))
+
+
+class _Profiled(object):
+    """profiles a worker process target, dumping stats when it returns
+
+    instances are picklable as long as the wrapped target is, so they may be
+    handed to `multiprocessing.Process` on platforms that spawn children
+
+    :param target: `function`, worker process target
+    :param dir_out: `str`, directory to write stats to
+    :param run: `str`, profiled run name, prefixes stats file names
+    """
+
+    def __init__(self, target, dir_out, run):
+        self.target = target
+        self.dir_out = dir_out
+        self.run = run
+
+    def __call__(self, *args, **kwargs):
+
+        profiler = cProfile.Profile()
+
+        try:
+            return profiler.runcall(self.target, *args, **kwargs)
+        finally:
+            path = _stats_path(self.dir_out, self.run, os.getpid())
+            profiler.dump_stats(path)
+
+
+def profiled(target):
+    """wraps a worker process target when the current run is profiled
+
+    :param target: `function`, worker process target
+    :return: profiled target, or `target` itself if not profiling
+    """
+
+    dir_out = os.getenv(env_dir)
+    run = os.getenv(env_run)
+
+    if dir_out and run:
+        return _Profiled(target, dir_out, run)
+    return target
+
+
+def merge(dir_out, run, stream=sys.stdout):
+    """merges a run's per-process stats into a single report
+
+    :param dir_out: `str`, directory stats were written to
+    :param run: `str`, profiled run name
+    :param stream: `file`, where to print the merged report
+    :return: `str`, merged stats file path, None if nothing was collected
+    """
+
+    pattern = os.path.join(dir_out, '{}.*{}'.format(run, stats_ext))
+    paths = sorted(glob.glob(pattern))
+
+    if not paths:
+        return None
+
+    stats = pstats.Stats(*paths, stream=stream)
+    path_out = os.path.join(dir_out, run + stats_ext)
+    stats.dump_stats(path_out)
+
+    stream.write("\nprofile: {} process(es) merged into {}\n"
+                 .format(len(paths), path_out))
+    stats.sort_stats('cumulative').print_stats(report_lines)
+    return path_out
+
+
+@contextlib.contextmanager
+def profile(dir_out, prog):
+    """profiles the enclosed block and every worker process it starts
+
+    per-process stats are written to ``<dir_out>/<prog>-<pid>.<pid>.pstats``
+    and merged into ``<dir_out>/<prog>-<pid>.pstats`` on exit, where the
+    first pid is the parent's; a no-op if `dir_out` is empty
+
+    :param dir_out: `str`, directory to write stats to
+    :param prog: `str`, name of the profiled program
+    """
+
+    if not dir_out:
+        yield
+        return
+
+    dir_out = os.path.abspath(os.path.expanduser(dir_out))
+    if not os.path.exists(dir_out):
+        os.makedirs(dir_out)
+
+    run = '{}-{}'.format(prog, os.getpid())
+    os.environ[env_dir] = dir_out
+    os.environ[env_run] = run
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(_stats_path(dir_out, run, os.getpid()))
+        del os.environ[env_dir]
+        del os.environ[env_run]
+        merge(dir_out, run)
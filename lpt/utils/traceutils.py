@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - utilities package - shared span tracing utilities"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# timeline tracing
+#
+# spans are recorded as Chrome Trace Event "complete" events, one buffer per
+# process; every process writes its buffer to its own file and the parent
+# merges them into a single trace (chrome://tracing, Perfetto) on exit.
+# when no trace is running, spans cost a single attribute check
+#
+
+import contextlib
+import functools
+import glob
+import inspect
+import json
+import os
+import threading
+import time
+
+env_dir = 'LPT_TRACE_DIR'
+env_run = 'LPT_TRACE_RUN'
+trace_ext = '.trace.json'
+
+
+class _Recorder(object):
+    """per-process span buffer"""
+
+    def __init__(self):
+        self.run = None
+        self.dir_out = None
+        self.events = []
+
+    def start(self, dir_out, run, process_name):
+        """starts recording for the current process"""
+
+        self.run = run
+        self.dir_out = dir_out
+        self.events = [dict(name='process_name', ph='M', pid=os.getpid(),
+                            tid=0, args=dict(name=process_name))]
+
+    def stop(self):
+        """stops recording and writes the process' events to disk"""
+
+        if not self.run:
+            return
+
+        name = '{}.{}{}'.format(self.run, os.getpid(), trace_ext)
+        with open(os.path.join(self.dir_out, name), 'w') as f:
+            json.dump(self.events, f)
+
+        self.run = None
+        self.events = []
+
+    def add(self, name, cat, start, end, args):
+        """appends a complete event; times in seconds since the epoch"""
+
+        self.events.append(dict(name=name, cat=cat, ph='X',
+                                ts=int(start * 1e6),
+                                dur=int((end - start) * 1e6),
+                                pid=os.getpid(),
+                                tid=threading.current_thread().ident,
+                                args=args))
+
+
+_recorder = _Recorder()
+
+
+@contextlib.contextmanager
+def span(name, cat='lpt', **args):
+    """records the enclosed block as a span
+
+    :param name: `str`, span name
+    :param cat: `str`, span category
+    :param args: extra values shown with the span in trace viewers
+    """
+
+    if not _recorder.run:
+        yield
+        return
+
+    start = time.time()
+    try:
+        yield
+    finally:
+        _recorder.add(name, cat, start, time.time(), args)
+
+
+def traced(name=None, cat='lpt', args=()):
+    """decorator; records every call of the decorated function as a span
+
+    :param name: `str`, span name, defaults to the function name
+    :param cat: `str`, span category
+    :param args: `tuple`, names of call arguments to show with the span
+    """
+
+    def decorator(func):
+
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*a, **kw):
+
+            if not _recorder.run:
+                return func(*a, **kw)
+
+            values = {}
+            if args:
+                call = inspect.getcallargs(func, *a, **kw)
+                values = dict((k, str(call[k])) for k in args if k in call)
+
+            with span(span_name, cat, **values):
+                return func(*a, **kw)
+
+        return wrapper
+
+    return decorator
+
+
+class _Traced(object):
+    """records a worker process' spans, writing them when it returns
+
+    :param target: `function`, worker process target
+    :param dir_out: `str`, directory to write events to
+    :param run: `str`, traced run name, prefixes event file names
+    """
+
+    def __init__(self, target, dir_out, run):
+        self.target = target
+        self.dir_out = dir_out
+        self.run = run
+
+    def __call__(self, *args, **kwargs):
+
+        name = getattr(self.target, '__name__', 'worker')
+        _recorder.start(self.dir_out, self.run, name.strip('_'))
+
+        try:
+            with span(name, 'worker'):
+                return self.target(*args, **kwargs)
+        finally:
+            _recorder.stop()
+
+
+def traced_target(target):
+    """wraps a worker process target when the current run is traced
+
+    :param target: `function`, worker process target
+    :return: traced target, or `target` itself if not tracing
+    """
+
+    dir_out = os.getenv(env_dir)
+    run = os.getenv(env_run)
+
+    if dir_out and run:
+        return _Traced(target, dir_out, run)
+    return target
+
+
+def merge(dir_out, run):
+    """merges a run's per-process events into a single trace file
+
+    :param dir_out: `str`, directory events were written to
+    :param run: `str`, traced run name
+    :return: `str`, merged trace file path, None if nothing was collected
+    """
+
+    pattern = os.path.join(dir_out, '{}.*{}'.format(run, trace_ext))
+    paths = sorted(glob.glob(pattern))
+
+    if not paths:
+        return None
+
+    events = []
+    for path in paths:
+        with open(path) as f:
+            events.extend(json.load(f))
+
+    path_out = os.path.join(dir_out, run + trace_ext)
+    with open(path_out, 'w') as f:
+        json.dump(dict(traceEvents=events, displayTimeUnit='ms'), f)
+
+    return path_out
+
+
+@contextlib.contextmanager
+def trace(dir_out, prog):
+    """traces the enclosed block and every worker process it starts
+
+    per-process events are written to ``<dir_out>/<prog>-<pid>.<pid>``
+    ``.trace.json`` and merged into ``<dir_out>/<prog>-<pid>.trace.json``
+    on exit, where the first pid is the parent's; a no-op if `dir_out` is
+    empty
+
+    :param dir_out: `str`, directory to write traces to
+    :param prog: `str`, name of the traced program
+    """
+
+    if not dir_out:
+        yield
+        return
+
+    dir_out = os.path.abspath(os.path.expanduser(dir_out))
+    if not os.path.exists(dir_out):
+        os.makedirs(dir_out)
+
+    run = '{}-{}'.format(prog, os.getpid())
+    os.environ[env_dir] = dir_out
+    os.environ[env_run] = run
+    _recorder.start(dir_out, run, prog)
+
+    try:
+        with span(prog, 'main'):
+            yield
+    finally:
+        _recorder.stop()
+        del os.environ[env_dir]
+        del os.environ[env_run]
+        merge(dir_out, run)
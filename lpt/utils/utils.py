@@ -20,6 +20,7 @@ import datetime
 import json
 import os
 import re
+import sys
 import textwrap
 
 from lpt.utils.msgutils import MsgUtils
@@ -257,14 +258,16 @@ class Utils(object):
         except OSError as e:
             raise ToolError(e, self.print_help)
 
-    def sanitize_path(self, path):
+    def sanitize_path(self, path, taken=()):
         """creates unique filename based off of provided path
 
         :param path: `str`, path to make unique
+        :param taken: `set`, paths to treat as existing, e.g., reserved for
+                      files that have not been written yet
         :return: unique version of the path
         """
 
-        if not os.path.exists(path):
+        if not os.path.exists(path) and path not in taken:
             return path
 
         if os.path.isdir(path):
@@ -277,7 +280,7 @@ class Utils(object):
 
         i = -1
         unique_path = path
-        while os.path.exists(unique_path):
+        while os.path.exists(unique_path) or unique_path in taken:
             i += 1
             unique_path = os.path.join(d_root, unique())
 
@@ -378,7 +381,7 @@ class Utils(object):
                     yield file_path
 
     @staticmethod
-    def write(file_path, obj, write='w'):
+    def write(file_path, obj, write='w', atomic=False):
         """writes an object to disk
 
         if the object is a dict or list, file is written out as a json object
@@ -386,14 +389,24 @@ class Utils(object):
         :param file_path: `str`, file to write out object to
         :param obj: `type`, object to write
         :param write: `str`, write method: w=overwrite, a=append
+        :param atomic: `bool`, write to a temporary file and rename it over
+                       `file_path`, so readers never see a partial file
+                       (overwrite only)
         """
 
-        with open(file_path, write) as f:
+        path = file_path + '.tmp' if atomic else file_path
+
+        with open(path, write) as f:
             if isinstance(obj, (list, dict)):
                 f.write(json.dumps(obj, indent=2, separators=(',', ': ')))
             else:
                 f.write("{}".format(obj.encode('utf-8').strip()))
 
+        if atomic:
+            if sys.platform == 'win32' and os.path.exists(file_path):
+                os.remove(file_path)
+            os.rename(path, file_path)
+
     @staticmethod
     def zulu_time():
         """datetime in zulu time format
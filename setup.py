@@ -23,9 +23,9 @@ import os
 
 err = ('''
 
-Lytro Power Tools installation requires Mac OS X or Windows with Python 2
-(version 2.7.10 or greater), see Lytro Power Tools documentation for more
-information.
+Lytro Power Tools installation requires Mac OS X, Linux (or another POSIX
+system) or Windows with Python 2 (version 2.7.10 or greater), see Lytro Power
+Tools documentation for more information.
 ''')
 
 os_err = "Invalid operating system: " + sys.platform + err
@@ -35,7 +35,8 @@ if not (2, 7, 10) <= sys.version_info < (3, 0, 0):
     sys.stderr.write(py_err)
     exit(1)
 
-if sys.platform not in ('darwin', 'win32'):
+# Linux hosts run the command line tools and workers against $LPT_TNT
+if sys.platform != 'win32' and os.name != 'posix':
     sys.stderr.write(os_err)
     exit(1)
 
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - fake adb test case"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# every test gets a fresh $FAKE_ADB_ROOT and an ``adb`` executable (a
+# wrapper running fake_adb.py with this interpreter) to hand to the camera
+# classes; see fake_adb.py for how devices are simulated
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_tests, '..'))
+fake_adb = os.path.join(dir_tests, 'fake_adb.py')
+sys.path.insert(0, dir_root)
+
+_environ = ('FAKE_ADB_ROOT', 'FAKE_ADB_LAG', 'FAKE_ADB_CORRUPT',
+            'FAKE_ADB_LOG')
+
+
+class FakeAdbTestCase(unittest.TestCase):
+    """test case with simulated cameras
+
+    :cvar serials: `tuple`, serial numbers of the devices to attach
+    """
+
+    serials = 'ILLUM0001',
+
+    def setUp(self):
+
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+        self.root = os.path.join(self.tmp, 'devices')
+        self.adb = os.path.join(self.tmp, 'adb')
+        self.log = os.path.join(self.tmp, 'adb.log')
+
+        with open(self.adb, 'w') as f:
+            f.write('#!/bin/sh\nexec "{}" "{}" "$@"\n'.format(sys.executable,
+                                                            fake_adb))
+        os.chmod(self.adb, 0755)
+
+        self._environ = dict((k, os.environ.get(k)) for k in _environ)
+        os.environ['FAKE_ADB_ROOT'] = self.root
+        os.environ['FAKE_ADB_LOG'] = self.log
+        for key in _environ[1:-1]:
+            os.environ.pop(key, None)
+
+        for serial in self.serials:
+            self.device(serial)
+
+    def tearDown(self):
+
+        for key, value in self._environ.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def device(self, serial):
+        """:return: `str`, file system root of a (new) simulated device"""
+
+        path = os.path.join(self.root, serial)
+        if not os.path.exists(path):
+            os.makedirs(os.path.join(path, '.state', 'model'))
+        return path
+
+    def device_file(self, serial, path, data=''):
+        """writes a file on a simulated device
+
+        :return: `str`, host path of the file
+        """
+
+        path = os.path.join(self.device(serial), path)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def model(self, serial, key, value=None):
+        """reads (or first sets) a value of a simulated camera model"""
+
+        path = os.path.join(self.device(serial), '.state', 'model',
+                            key.lower())
+        if value is not None:
+            with open(path, 'w') as f:
+                f.write('{}\n'.format(value))
+        with open(path) as f:
+            return f.read().strip()
+
+    def adb_calls(self):
+        """:return: `list`, adb command lines run so far"""
+
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as f:
+            return f.read().splitlines()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - fake adb"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# stands in for ``adb`` with cameras simulated by local directories: every
+# subdirectory of $FAKE_ADB_ROOT is one attached device, named by its serial
+# number, and is the root of that device's file system.  device shells are a
+# POSIX ``sh`` started in the device directory, with the camera commands of
+# fake_device/bin (``model``, ``state``, ``diagfsalb``...) on the path
+#
+# an interactive ``adb shell`` runs on a pseudo terminal, like the real one
+# does for the camera: input is echoed, a prompt is printed and lines end in
+# \r\n until the session turns these off
+#
+# supported: devices, [-s SERIAL] shell [CMD...], pull, push, root
+#
+# environment:
+#   FAKE_ADB_ROOT      directory of device directories (required)
+#   FAKE_ADB_LAG       seconds before ``model set``/``lyt capture`` take effect
+#   FAKE_ADB_CORRUPT   file name whose pulled copies get a byte flipped
+#   FAKE_ADB_LOG       append one line per invocation to this file
+
+import errno
+import fcntl
+import os
+import pty
+import select
+import shutil
+import subprocess
+import sys
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+dir_device_bin = os.path.join(dir_tests, 'fake_device', 'bin')
+prompt = 'root@illum:/ # '
+
+
+def devices(root):
+    """:return: `list`, serial numbers of the simulated devices"""
+
+    return sorted(d for d in os.listdir(root)
+                  if os.path.isdir(os.path.join(root, d)))
+
+
+def device_path(device, path):
+    """:return: `str`, host path of a device path"""
+
+    return os.path.join(device, path.lstrip('/'))
+
+
+def environ(device):
+    """:return: `dict`, environment of a device shell"""
+
+    env = dict(os.environ)
+    env['PATH'] = dir_device_bin + os.pathsep + env.get('PATH', '')
+    env['FAKE_ADB_DEVICE'] = device
+    env['PS1'] = prompt
+    env.pop('ENV', None)
+    return env
+
+
+def interactive(device):
+    """runs a shell on a pseudo terminal, relaying it to stdin/stdout
+
+    :return: `int`, exit status of the shell
+    """
+
+    pid, master = pty.fork()
+
+    if pid == 0:
+        os.chdir(device)
+        os.execve('/bin/sh', ['sh', '-i'], environ(device))
+
+    flags = fcntl.fcntl(master, fcntl.F_GETFL)
+    fcntl.fcntl(master, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    pending = b''
+    stdin_open = True
+
+    while True:
+        readers = [master] + ([0] if stdin_open else [])
+        writers = [master] if pending else []
+        readable, writable, _ = select.select(readers, writers, [])
+
+        if 0 in readable:
+            data = os.read(0, 4096)
+            if data:
+                pending += data
+            else:
+                stdin_open = False
+                pending += b'\x04'
+
+        if master in writable:
+            try:
+                pending = pending[os.write(master, pending):]
+            except OSError as e:
+                if e.errno != errno.EAGAIN:
+                    break
+
+        if master in readable:
+            try:
+                data = os.read(master, 4096)
+            except OSError:
+                break
+            if not data:
+                break
+            os.write(1, data)
+
+    status = os.waitpid(pid, 0)[1]
+    return os.WEXITSTATUS(status) if os.WIFEXITED(status) else 1
+
+
+def main(argv=None):
+
+    argv = sys.argv[1:] if argv is None else argv
+    root = os.environ['FAKE_ADB_ROOT']
+
+    log = os.getenv('FAKE_ADB_LOG')
+    if log:
+        with open(log, 'a') as f:
+            f.write(' '.join(argv) + '\n')
+
+    serial = None
+    if argv[:1] == ['-s']:
+        serial, argv = argv[1], argv[2:]
+
+    if argv[:1] == ['devices']:
+        sys.stdout.write('List of devices attached\n')
+        for name in devices(root):
+            sys.stdout.write('{}\tdevice\n'.format(name))
+        return 0
+
+    attached = devices(root)
+    if serial is None and len(attached) != 1:
+        sys.stderr.write('error: more than one device and emulator\n')
+        return 1
+    if serial is not None and serial not in attached:
+        sys.stderr.write("error: device '{}' not found\n".format(serial))
+        return 1
+
+    device = os.path.join(root, serial or attached[0])
+    command, args = argv[0], argv[1:]
+
+    if command == 'shell' and not args:
+        return interactive(device)
+
+    elif command == 'shell':
+        return subprocess.call(['/bin/sh', '-c', ' '.join(args)],
+                               cwd=device, env=environ(device))
+
+    elif command == 'pull':
+        remote, local = args
+        shutil.copyfile(device_path(device, remote), local)
+
+        if os.path.basename(remote) == os.getenv('FAKE_ADB_CORRUPT'):
+            with open(local, 'r+b') as f:
+                byte = f.read(1)
+                f.seek(0)
+                f.write(b'\x00' if byte == b'\xff' else b'\xff')
+
+        sys.stdout.write('0 KB/s (0 bytes in 0.000s)\n')
+        return 0
+
+    elif command == 'push':
+        local, remote = args
+        shutil.copyfile(local, device_path(device, remote))
+        return 0
+
+    elif command == 'root':
+        sys.stdout.write('adbd is already running as root\n')
+        return 0
+
+    sys.stderr.write('fake adb: unsupported command: {}\n'.format(command))
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
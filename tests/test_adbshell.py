@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - persistent adb shell session"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+import unittest
+
+from adbtest import FakeAdbTestCase
+
+from lpt.camera.camerabin import AdbShell
+from lpt.camera.camerabin import CameraControls
+
+
+class AdbShellTest(FakeAdbTestCase):
+
+    def setUp(self):
+        FakeAdbTestCase.setUp(self)
+        self.session = AdbShell([self.adb, 'shell'])
+
+    def tearDown(self):
+        self.session.close()
+        FakeAdbTestCase.tearDown(self)
+
+    def test_replies_are_clean(self):
+        # no echoed input, no prompt and no \r from the pseudo terminal
+        self.assertEqual(self.session.run('echo hello'), ('hello\n', 0))
+        self.assertEqual(self.session.run('echo a; echo b'), ('a\nb\n', 0))
+
+    def test_output_without_newline(self):
+        self.assertEqual(self.session.run('printf partial'), ('partial', 0))
+        self.assertEqual(self.session.run('true'), ('', 0))
+
+    def test_exit_status(self):
+        self.assertEqual(self.session.run('false')[1], 1)
+        self.assertEqual(self.session.run("sh -c 'exit 7'")[1], 7)
+        self.assertEqual(self.session.run('no_such_command')[1], 127)
+        self.assertEqual(self.session.run('echo still open'),
+                         ('still open\n', 0))
+
+    def test_pipeline(self):
+        cmds = ['echo {}'.format(i) for i in range(50)] + ['false']
+        replies = self.session.pipeline(cmds)
+
+        self.assertEqual(len(replies), len(cmds))
+        self.assertEqual(replies[:3], [('0\n', 0), ('1\n', 0), ('2\n', 0)])
+        self.assertEqual(replies[49], ('49\n', 0))
+        self.assertEqual(replies[50], ('', 1))
+
+    def test_one_process(self):
+        self.session.run('true')
+        pid = self.session.proc.pid
+        self.session.pipeline(['true'] * 10)
+        self.session.run('true')
+
+        self.assertEqual(self.session.proc.pid, pid)
+        self.assertEqual(self.adb_calls(), ['shell'])
+
+    def test_closed_session(self):
+        self.session.run('true')
+        with self.assertRaises(IOError):
+            self.session.run('exit')
+
+        self.session.close()
+        self.assertEqual(self.session.run('echo reopened'),
+                         ('reopened\n', 0))
+
+
+class CameraControlsSessionTest(FakeAdbTestCase):
+
+    def setUp(self):
+        FakeAdbTestCase.setUp(self)
+        self.cam = CameraControls(adb_bin=self.adb)
+
+    def tearDown(self):
+        self.cam.session.close()
+        FakeAdbTestCase.tearDown(self)
+
+    def test_getters(self):
+        self.model('ILLUM0001', 'iso', 400)
+        self.model('ILLUM0001', 'shutterSpeed', 0.004)
+
+        self.assertEqual(self.cam.get_iso(True), '400\n')
+        self.assertEqual(self.cam.get_shutter_speed(True), '0.004\n')
+        self.assertEqual(self.adb_calls(), ['shell'])
+
+    def test_send_cmds(self):
+        self.cam.check_if_running_adb(True)
+        self.cam.press_power(sleep=0, adb_state=True)
+
+        with open(self.device('ILLUM0001') + '/.state/events') as f:
+            events = f.read().splitlines()
+
+        self.assertEqual(len(events), 4)
+        self.assertEqual(events[0], 'sendevent /dev/input/event1 1 356 1')
+        self.assertEqual(self.adb_calls(), ['shell'])
+
+    def round_trips(self):
+        """:return: `list`, command batches the session sends from now on"""
+
+        self.cam.session.run('true')
+        batches = []
+        pipeline = self.cam.session.pipeline
+
+        def counted(cmds):
+            batches.append(list(cmds))
+            return pipeline(cmds)
+
+        self.cam.session.pipeline = counted
+        return batches
+
+    def test_snapshot(self):
+        self.model('ILLUM0001', 'iso', 400)
+        batches = self.round_trips()
+
+        state = self.cam.snapshot(True)
+        self.assertEqual(batches, [CameraControls.state_cmds])
+        self.assertEqual(state['model get iso'], 'model value : 400\n')
+
+        # getters read the snapshot
+        self.cam.get_iso(True)
+        self.cam.get_shutter_speed(True)
+        self.assertEqual(len(batches), 1)
+
+    def test_get_all(self):
+        batches = self.round_trips()
+        state = self.cam.get_all(True)
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(state), 24)
+
+    def test_snapshot_dropped_after_set(self):
+        self.model('ILLUM0001', 'iso', 400)
+        self.cam.snapshot(True)
+
+        self.cam.set_iso(200, True)
+        self.assertIsNone(self.cam.state)
+
+        batches = self.round_trips()
+        self.assertEqual(self.cam.get_iso(True), '200\n')
+        self.assertEqual(batches, [['model get iso']])
+
+    def test_snapshot_expires(self):
+        self.model('ILLUM0001', 'iso', 400)
+        self.cam.snapshot(True)
+        self.model('ILLUM0001', 'iso', 800)
+
+        self.assertEqual(self.cam.get_iso(True), '400\n')
+        self.cam.state_time -= self.cam.state_ttl
+        self.assertEqual(self.cam.get_iso(True), '800\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
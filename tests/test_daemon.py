@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - long-running render daemon"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# ``lfptool daemon`` processes listen on a Unix socket in a temporary
+# directory and render synthetic LFRs with the stub TNT engine (see
+# benchmarks/); the daemon's only child processes are its pool workers, so
+# killing those leaves the TNT calls they started to finish on their own
+
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_tests, '..'))
+dir_benchmarks = os.path.join(dir_root, 'benchmarks')
+sys.path.insert(0, dir_root)
+sys.path.insert(0, dir_benchmarks)
+
+import synthetic
+
+from lpt.lfp import daemon
+
+lfptool = os.path.join(dir_root, 'lpt', 'bin', 'lfptool.py')
+stub_tnt = os.path.join(dir_benchmarks, 'stub_tnt.py')
+
+
+class JobTest(unittest.TestCase):
+
+    def test_done(self):
+        status = []
+        job = daemon._Job(2, lambda **kwargs: status.append(kwargs))
+
+        job.done(1, .5)
+        job.done(1, .5)
+        self.assertFalse(job.finished)
+
+        job.done(0, .25, 'failed')
+        self.assertEqual(job.wait(), {0: .25, 1: .5})
+        self.assertEqual(job.errors, {0: 'failed'})
+        self.assertEqual([s['done'] for s in status], [1, 2])
+
+    def test_timeout(self):
+        job = daemon._Job(1)
+        self.assertRaisesRegexp(Exception, 'job timed out after 0.1s',
+                                job.wait, .1)
+
+    def test_failed(self):
+        job = daemon._Job(2)
+        job.done(0, .5)
+        job.fail('worker pool closed')
+
+        self.assertRaisesRegexp(Exception, 'worker pool closed', job.wait)
+
+
+class DaemonTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+        self.socket = os.path.join(self.tmp, 'daemon.sock')
+        self.dir_in = os.path.join(self.tmp, 'in')
+        self.paths = synthetic.write_shoot(self.dir_in, 4, blob_size=1600,
+                                           width=40, height=30)
+        self.procs = []
+
+    def tearDown(self):
+
+        for proc, log in self.procs:
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGTERM)
+                self.wait(proc, 10)
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            log.close()
+
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def daemon(self, name='daemon', latency='.2'):
+        """starts ``lfptool daemon`` with one worker process"""
+
+        env = dict(os.environ,
+                   LPT_TNT=stub_tnt,
+                   LPT_LYTRO_HOME=os.path.join(self.tmp, 'lytro'),
+                   LPT_STUB_TNT_LATENCY=latency)
+
+        log = open(os.path.join(self.tmp, name + '.log'), 'w+')
+        argv = [sys.executable, lfptool, 'daemon', '--socket', self.socket,
+                '-P', '1']
+        proc = subprocess.Popen(argv, env=env, stdout=log,
+                                stderr=subprocess.STDOUT)
+        self.procs.append((proc, log))
+        return proc, log
+
+    def listening(self, proc, log, timeout=30):
+        """waits for the daemon to take connections"""
+
+        deadline = time.time() + timeout
+
+        while time.time() < deadline:
+            self.assertIsNone(proc.poll(), self.output(log))
+
+            if 'listening on' in self.output(log):
+                return
+
+            time.sleep(.05)
+
+        self.fail('daemon did not start: ' + self.output(log))
+
+    def wait(self, proc, timeout=60):
+        deadline = time.time() + timeout
+        while proc.poll() is None and time.time() < deadline:
+            time.sleep(.1)
+        return proc.poll()
+
+    def output(self, log):
+        log.seek(0)
+        return log.read()
+
+    def request(self, argv, on_message=None):
+        """sends one request
+
+        :param on_message: `object`, called with every message as received
+        :return: `list`, messages until the job ended
+        """
+
+        sock = socket.socket(socket.AF_UNIX)
+        sock.settimeout(60)
+        sock.connect(self.socket)
+        sock.sendall(json.dumps({'argv': argv}) + '\n')
+
+        messages = []
+        rfile = sock.makefile('rb')
+
+        try:
+            for line in iter(rfile.readline, ''):
+                messages.append(json.loads(line))
+                if on_message:
+                    on_message(messages[-1])
+        finally:
+            rfile.close()
+            sock.close()
+
+        return messages
+
+    def test_job_streamed(self):
+        self.listening(*self.daemon())
+
+        messages = self.request(['raw', '-i', self.dir_in, '--image-out'])
+        ops = [m['op'] for m in messages]
+
+        self.assertEqual(ops, ['accepted'] + ['task'] * 4 + ['done'],
+                         messages)
+        self.assertEqual(len(set(m['job'] for m in messages)), 1)
+
+        tasks = [m for m in messages if m['op'] == 'task']
+        self.assertEqual(sorted(m['task'] for m in tasks), range(4))
+        self.assertEqual([m['done'] for m in tasks], [1, 2, 3, 4])
+        self.assertTrue(all(m['error'] is None for m in tasks))
+
+        for path in self.paths:
+            self.assertTrue(os.path.exists(os.path.splitext(path)[0] +
+                                           '.tiff'))
+
+        # the same workers take the next job
+        messages = self.request(['raw', '-i', self.paths[0], '--image-out'])
+        self.assertEqual(messages[-1]['op'], 'done', messages)
+
+    def test_error_reply(self):
+        self.listening(*self.daemon())
+
+        messages = self.request(['extract', '-i', self.dir_in])
+        self.assertEqual([m['op'] for m in messages], ['error'])
+        self.assertIn('command must be one of', messages[0]['message'])
+
+        missing = os.path.join(self.tmp, 'missing')
+        messages = self.request(['raw', '-i', missing, '--image-out'])
+        self.assertEqual([m['op'] for m in messages], ['accepted', 'error'])
+        self.assertIn('not a valid file or directory',
+                      messages[-1]['message'])
+
+    def test_second_daemon_refused(self):
+        proc, log = self.daemon()
+        self.listening(proc, log)
+
+        second, second_log = self.daemon('second')
+        self.assertNotEqual(self.wait(second), 0)
+        self.assertIn('daemon already listening on ' + self.socket,
+                      self.output(second_log))
+
+        # the first one still serves
+        self.assertIsNone(proc.poll())
+        messages = self.request(['raw', '-i', self.paths[0], '--image-out'])
+        self.assertEqual(messages[-1]['op'], 'done', messages)
+
+    def test_worker_killed(self):
+        proc, log = self.daemon(latency='3')
+        self.listening(proc, log)
+
+        def kill_workers(message):
+            if message['op'] != 'accepted':
+                return
+
+            # let a worker take the task and report it
+            time.sleep(1)
+            workers = subprocess.check_output(['pgrep', '-P', str(proc.pid)])
+            for pid in workers.split():
+                os.kill(int(pid), signal.SIGKILL)
+
+        messages = self.request(['raw', '-i', self.paths[0], '--image-out'],
+                                kill_workers)
+
+        self.assertEqual([m['op'] for m in messages],
+                         ['accepted', 'task', 'error'], messages)
+        self.assertIn('worker process exited', messages[1]['error'])
+        self.assertIn('1 of 1 task(s) failed', messages[2]['message'])
+
+        # the dead workers were replaced
+        messages = self.request(['raw', '-i', self.paths[1], '--image-out'])
+        self.assertEqual(messages[-1]['op'], 'done', messages)
+
+
+if __name__ == '__main__':
+    unittest.main()
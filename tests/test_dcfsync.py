@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - incremental SD card sync"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+
+from adbtest import FakeAdbTestCase
+
+from lpt.camera.camerabin import DcfSync
+
+dcf_path = 'storage/sdcard1/DCIM/100PHOTO/'
+
+
+class DcfSyncTest(FakeAdbTestCase):
+
+    def setUp(self):
+
+        FakeAdbTestCase.setUp(self)
+        self.data = {}
+
+        for i in range(1, 6):
+            name = 'IMG_{:04d}.LFR'.format(i)
+            self.data[name] = os.urandom(10000 + i)
+            self.device_file('ILLUM0001', dcf_path + name, self.data[name])
+
+        self.dest = os.path.join(self.tmp, 'download')
+        self.out = os.path.join(self.dest, 'shoot')
+
+    def sync(self, jobs=3):
+        dcf_sync = DcfSync(self.dest, adb=[self.adb], jobs=jobs)
+        entries = dcf_sync.list_remote(dcf_path)
+        pending = dcf_sync.pending(entries)
+        pulled, failed = dcf_sync.sync(pending, dcf_path, self.out)
+        return dcf_sync, entries, sorted(pulled), sorted(failed)
+
+    def pulls(self):
+        return [c for c in self.adb_calls() if c.startswith('pull ')]
+
+    def test_list_remote(self):
+        entries = DcfSync(self.dest, adb=[self.adb]).list_remote(dcf_path)
+
+        self.assertEqual(sorted(e['name'] for e in entries),
+                         sorted(self.data))
+        for entry in entries:
+            self.assertEqual(entry['size'], len(self.data[entry['name']]))
+
+    def test_sync(self):
+        dcf_sync, _, pulled, failed = self.sync()
+
+        self.assertEqual(pulled, sorted(self.data))
+        self.assertEqual(failed, [])
+        self.assertEqual(sorted(os.listdir(self.out)), sorted(self.data))
+
+        for name, data in self.data.items():
+            with open(os.path.join(self.out, name), 'rb') as f:
+                self.assertEqual(f.read(), data)
+            self.assertEqual(dcf_sync.manifest[name]['md5'],
+                             hashlib.md5(data).hexdigest())
+
+    def test_incremental(self):
+        self.sync()
+        pulls = len(self.pulls())
+
+        dcf_sync, entries, pulled, _ = self.sync()
+        self.assertEqual(pulled, [])
+        self.assertEqual(len(self.pulls()), pulls)
+
+        # a new picture and a rewritten one are pulled, nothing else
+        self.device_file('ILLUM0001', dcf_path + 'IMG_0006.LFR', 'new')
+        self.device_file('ILLUM0001', dcf_path + 'IMG_0002.LFR', 'changed')
+        time.sleep(.01)
+
+        _, _, pulled, _ = self.sync()
+        self.assertEqual(pulled, ['IMG_0002.LFR', 'IMG_0006.LFR'])
+
+    def test_local_copy_removed(self):
+        self.sync()
+        os.remove(os.path.join(self.out, 'IMG_0003.LFR'))
+
+        _, _, pulled, _ = self.sync()
+        self.assertEqual(pulled, ['IMG_0003.LFR'])
+
+    def test_checksum_mismatch(self):
+        # same size, different content: only the camera's md5 catches it
+        os.environ['FAKE_ADB_CORRUPT'] = 'IMG_0004.LFR'
+        dcf_sync, _, pulled, failed = self.sync()
+
+        self.assertEqual(failed, ['IMG_0004.LFR'])
+        self.assertNotIn('IMG_0004.LFR', pulled)
+        self.assertNotIn('IMG_0004.LFR', dcf_sync.manifest)
+        self.assertEqual(sorted(os.listdir(self.out)),
+                         sorted(n for n in self.data if n != 'IMG_0004.LFR'))
+
+        del os.environ['FAKE_ADB_CORRUPT']
+        _, _, pulled, _ = self.sync()
+        self.assertEqual(pulled, ['IMG_0004.LFR'])
+
+    def test_remote_md5(self):
+        dcf_sync = DcfSync(self.dest, adb=[self.adb])
+        name = 'IMG_0001.LFR'
+
+        self.assertEqual(dcf_sync.remote_md5(dcf_path + name),
+                         hashlib.md5(self.data[name]).hexdigest())
+        self.assertIsNone(dcf_sync.remote_md5(dcf_path + 'missing.LFR'))
+
+    def test_remote_md5_quiet(self):
+        # neither md5sum nor md5 finds the file; none of their complaints
+        # reach the user's stderr
+        dcf_sync = DcfSync(self.dest, adb=[self.adb])
+        stderr = os.dup(2)
+
+        with tempfile.TemporaryFile() as f:
+            os.dup2(f.fileno(), 2)
+            try:
+                dcf_sync.remote_md5(dcf_path + 'missing.LFR')
+            finally:
+                os.dup2(stderr, 2)
+                os.close(stderr)
+            f.seek(0)
+            self.assertEqual(f.read(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - multiple camera manager"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+import os
+import threading
+import time
+import unittest
+
+from adbtest import FakeAdbTestCase
+
+from lpt.camera.devices import DeviceManager
+
+serials = 'ILLUM0001', 'ILLUM0002', 'ILLUM0003'
+
+
+class DeviceManagerTest(FakeAdbTestCase):
+
+    serials = serials
+
+    def setUp(self):
+
+        FakeAdbTestCase.setUp(self)
+        self.manager = DeviceManager(self.adb)
+        self.manager.bind()
+
+    def tearDown(self):
+
+        for bld in self.manager.devices.values():
+            bld.cam.session.close()
+        FakeAdbTestCase.tearDown(self)
+
+    def test_list_serials(self):
+        self.assertEqual(self.manager.list_serials(), list(serials))
+
+        os.rmdir(os.path.join(self.device('ILLUM0002'), '.state', 'model'))
+        os.rmdir(os.path.join(self.device('ILLUM0002'), '.state'))
+        os.rmdir(self.device('ILLUM0002'))
+        self.assertEqual(self.manager.list_serials(),
+                         ['ILLUM0001', 'ILLUM0003'])
+
+    def test_bind(self):
+        self.assertEqual(list(self.manager.devices), list(serials))
+
+        for serial, bld in self.manager.devices.items():
+            self.assertEqual(bld.cam.serial, serial)
+            self.assertEqual(bld.cam.adb_cmd, [self.adb, '-s', serial])
+
+        # binding again keeps the existing sessions
+        devices = dict(self.manager.devices)
+        self.manager.bind(['ILLUM0001'])
+        self.assertIs(self.manager.devices['ILLUM0001'],
+                      devices['ILLUM0001'])
+
+    def test_run(self):
+        isos = dict(zip(serials, (100, 200, 400)))
+        threads = set()
+
+        def job(serial, bld):
+            threads.add(threading.current_thread().name)
+            bld.cam.set_iso(isos[serial], True)
+
+        status = self.manager.run(job)
+
+        self.assertEqual(dict(status), dict((s, 'done') for s in serials))
+        self.assertEqual(len(threads), len(serials))
+        for serial in serials:
+            self.assertEqual(self.model(serial, 'iso'), str(isos[serial]))
+
+        for serial in serials:
+            self.assertIn('-s {} shell'.format(serial), self.adb_calls())
+
+    def test_concurrent(self):
+        # every camera applies exposure mode and iso after a lag each; run
+        # in turn the three would take at least 3s
+        os.environ['FAKE_ADB_LAG'] = '.5'
+        start = time.time()
+        self.manager.run(lambda serial, bld: bld.cam.set_iso(800, True))
+
+        self.assertLess(time.time() - start, 2.5)
+        for serial in serials:
+            self.assertEqual(self.model(serial, 'iso'), '800')
+
+    def test_failure_is_isolated(self):
+
+        def job(serial, bld):
+            if serial == 'ILLUM0002':
+                raise IOError('camera unplugged')
+            bld.cam.set_iso(100, True)
+
+        status = self.manager.run(job)
+
+        self.assertEqual(status['ILLUM0001'], 'done')
+        self.assertEqual(status['ILLUM0002'], 'failed (camera unplugged)')
+        self.assertEqual(status['ILLUM0003'], 'done')
+        self.assertEqual(self.model('ILLUM0003', 'iso'), '100')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - coordinator/worker mode"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# a coordinator and several workers on localhost: first as threads running
+# `distrib.work` with test worker functions, then as ``lfptool`` processes
+# rendering synthetic LFRs with the stub TNT engine (see benchmarks/)
+
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_tests, '..'))
+dir_benchmarks = os.path.join(dir_root, 'benchmarks')
+sys.path.insert(0, dir_root)
+sys.path.insert(0, dir_benchmarks)
+
+import synthetic
+
+from lpt.lfp import distrib
+
+lfptool = os.path.join(dir_root, 'lpt', 'bin', 'lfptool.py')
+stub_tnt = os.path.join(dir_benchmarks, 'stub_tnt.py')
+
+
+def free_port():
+    """:return: `int`, a port nothing listens on right now"""
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def wait_listening(port, timeout=10):
+    """waits for something to listen on `port`"""
+
+    deadline = time.time() + timeout
+
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port)).close()
+            return
+        except socket.error:
+            if time.time() > deadline:
+                raise
+            time.sleep(.05)
+
+
+def _echo(queue, kwds, lock=None, verbose=False):
+    """test worker function: records tasks, fails or drops on request"""
+
+    for task in iter(queue.get, 'STOP'):
+        n, what = task
+        time.sleep(kwds['sleep'])
+
+        if what == 'fail':
+            raise ValueError('task {} failed'.format(n))
+        if what == 'drop' and not kwds['dropped'].get(n):
+            kwds['dropped'][n] = True
+            raise EOFError
+
+        kwds['ran'].append((threading.current_thread().name, n))
+        queue.task_done()
+
+    queue.task_done()
+
+
+class CoordinatorTest(unittest.TestCase):
+
+    def run_workers(self, tasks, workers=3, sleep=.1):
+        """serves `tasks` to thread workers
+
+        workers only start once the coordinator listens, so that none of
+        them misses the whole run
+
+        :return: `tuple`, coordinator and (worker name, task) pairs run
+        """
+
+        port = free_port()
+        ran, dropped = [], {}
+        kwds = dict(sleep=sleep, ran=ran, dropped=dropped)
+        master = [(n, what) for n, what in enumerate(tasks)]
+
+        coordinator = distrib.Coordinator(('', port), dict(worker='echo'),
+                                          master, range(len(master)))
+        # the job is sent as JSON; the shared lists stay with the threads
+        coordinator.job.update(kwds={}, verbose=False)
+
+        def work():
+            distrib.work(('', port), {'echo': lambda q, k, l, v:
+                                      _echo(q, kwds, l, v)})
+
+        serving = threading.Thread(target=coordinator.serve)
+        serving.daemon = True
+        serving.start()
+        wait_listening(port)
+
+        threads = [threading.Thread(target=work, name='w{}'.format(i))
+                   for i in range(workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        for thread in [serving] + threads:
+            thread.join(10)
+            self.assertFalse(thread.is_alive())
+
+        return coordinator, ran
+
+    def test_parse_address(self):
+        self.assertEqual(distrib.parse_address(':7000'), ('', 7000))
+        self.assertEqual(distrib.parse_address('0.0.0.0:7000'),
+                         ('0.0.0.0', 7000))
+        self.assertRaises(ValueError, distrib.parse_address, '7000')
+        self.assertRaises(ValueError, distrib.parse_address, ':70000')
+
+    def test_empty_host_is_localhost(self):
+        coordinator = distrib.Coordinator(('', 7000), {}, [], [])
+        self.assertEqual(coordinator.address, ('127.0.0.1', 7000))
+
+        coordinator = distrib.Coordinator(('0.0.0.0', 7000), {}, [], [])
+        self.assertEqual(coordinator.address, ('0.0.0.0', 7000))
+
+    def test_workers_share_tasks(self):
+        coordinator, ran = self.run_workers(['ok'] * 30)
+
+        self.assertEqual(sorted(n for _, n in ran), range(30))
+        self.assertEqual(sorted(coordinator.seconds), range(30))
+        self.assertEqual(coordinator.errors, {})
+        self.assertGreater(len(set(w for w, _ in ran)), 1)
+
+    def test_failed_task(self):
+        coordinator, ran = self.run_workers(['ok', 'fail', 'ok', 'ok'])
+
+        self.assertEqual(sorted(n for _, n in ran), [0, 2, 3])
+        self.assertEqual(sorted(coordinator.seconds), [0, 1, 2, 3])
+        self.assertEqual(list(coordinator.errors), [1])
+        self.assertIn('task 1 failed', coordinator.errors[1][1])
+
+    def test_lost_worker_requeued(self):
+        # the worker holding task 2 drops its connection; another one
+        # picks the task up again
+        coordinator, ran = self.run_workers(['ok', 'ok', 'drop', 'ok'],
+                                            workers=2)
+
+        self.assertEqual(sorted(n for _, n in ran), [0, 1, 2, 3])
+        self.assertEqual(coordinator.errors, {})
+
+
+class WorkerProcessTest(unittest.TestCase):
+
+    workers = 3
+
+    def setUp(self):
+
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+        self.dir_in = os.path.join(self.tmp, 'in')
+        self.paths = synthetic.write_shoot(self.dir_in, 6, blob_size=1600,
+                                           width=40, height=30)
+
+        self.env = dict(os.environ,
+                        LPT_TNT=stub_tnt,
+                        LPT_LYTRO_HOME=os.path.join(self.tmp, 'lytro'),
+                        LPT_STUB_TNT_LATENCY='.2')
+        self.procs = []
+
+    def tearDown(self):
+
+        for proc, log in self.procs:
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            log.close()
+
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def lfptool(self, name, *argv):
+        log = open(os.path.join(self.tmp, name + '.log'), 'w+')
+        proc = subprocess.Popen([sys.executable, lfptool] + list(argv),
+                                env=self.env, stdout=log,
+                                stderr=subprocess.STDOUT)
+        self.procs.append((proc, log))
+        return proc, log
+
+    def wait(self, proc, timeout=60):
+        deadline = time.time() + timeout
+        while proc.poll() is None and time.time() < deadline:
+            time.sleep(.1)
+        return proc.poll()
+
+    def output(self, log):
+        log.seek(0)
+        return log.read()
+
+    def test_render_on_workers(self):
+        address = ':{}'.format(free_port())
+        coordinator, log = self.lfptool('coordinator', 'raw', '-i',
+                                        self.dir_in, '--image-out',
+                                        '--serve', address)
+
+        workers = [self.lfptool('w{}'.format(i), 'worker', '--connect',
+                                address, '--name', 'w{}'.format(i))
+                   for i in range(self.workers)]
+
+        self.assertEqual(self.wait(coordinator), 0, self.output(log))
+        self.assertIn('on 127.0.0.1:', self.output(log))
+        self.assertIn('served (0006) task(s), (0000) failed',
+                      self.output(log))
+
+        counts = []
+        for proc, worker_log in workers:
+            self.assertEqual(self.wait(proc), 0, self.output(worker_log))
+            done = re.search(r'worker done: \((\d+)\)',
+                             self.output(worker_log))
+            counts.append(int(done.group(1)))
+
+        self.assertEqual(sum(counts), len(self.paths))
+        self.assertGreater(len([c for c in counts if c]), 1)
+
+        for path in self.paths:
+            self.assertTrue(os.path.exists(os.path.splitext(path)[0] +
+                                           '.tiff'))
+
+
+if __name__ == '__main__':
+    unittest.main()
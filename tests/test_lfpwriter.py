@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - metadata-only LFP rewrites"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# synthetic LFPs (see benchmarks/synthetic.py) are edited with `LfpWriter`
+# and read back with `Lfp`: every blob must still be stored under the sha1
+# of its content, and blobs nothing refers to differently must be the same
+# bytes as before
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_tests, '..'))
+sys.path.insert(0, dir_root)
+sys.path.insert(0, os.path.join(dir_root, 'benchmarks'))
+
+import synthetic
+
+from lpt.lfp.lfp import Lfp
+from lpt.lfp.lfp import LfpWriter
+
+
+def blob_data(lfp):
+    """:return: `dict`, stored bytes of every blob by reference"""
+
+    data = {}
+    with open(lfp.path, 'rb') as f:
+        for ref, blob in lfp.blobs.items():
+            f.seek(blob.offset)
+            data[ref] = f.read(blob.length)
+    return data
+
+
+def stored_json(lfp, ref):
+    return json.loads(blob_data(lfp)[ref])
+
+
+class LfpWriterTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+        self.path = synthetic.write_lfp(os.path.join(self.tmp, 'in.lfp'),
+                                        frames=2, blob_size=1600, width=40,
+                                        height=30)
+        self.out = os.path.join(self.tmp, 'out.lfp')
+        self.lfp = Lfp(self.path)
+        self.before = blob_data(self.lfp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def frame(self, lfp, n):
+        """:return: `dict`, references of frame `n` as stored"""
+
+        picture = stored_json(lfp, lfp._master_sha)
+        return picture['frames'][n]['frame']
+
+    def assertHashed(self, lfp):
+        for ref, data in blob_data(lfp).items():
+            self.assertEqual(ref, 'sha1-' + hashlib.sha1(data).hexdigest())
+
+    def test_edit_metadata(self):
+        ref = self.frame(self.lfp, 0)['metadataRef']
+        metadata = stored_json(self.lfp, ref)
+        metadata['image']['orientation'] = 3
+
+        writer = LfpWriter(self.lfp)
+        writer.set_blob(ref, metadata)
+        self.assertEqual(writer.write(self.out), self.out)
+
+        lfp = Lfp(self.out)
+        after = blob_data(lfp)
+        self.assertHashed(lfp)
+
+        # the edited blob and the master referring to it are new
+        new_ref = self.frame(lfp, 0)['metadataRef']
+        self.assertNotEqual(new_ref, ref)
+        self.assertNotIn(ref, after)
+        self.assertEqual(stored_json(lfp, new_ref), metadata)
+        self.assertNotEqual(lfp._master_sha, self.lfp._master_sha)
+
+        # everything else is unchanged, frame 1 included
+        unchanged = set(self.before) - set([ref, self.lfp._master_sha])
+        for old_ref in unchanged:
+            self.assertEqual(after[old_ref], self.before[old_ref])
+        self.assertEqual(self.frame(lfp, 1), self.frame(self.lfp, 1))
+        self.assertEqual(len(after), len(self.before))
+
+    def test_set_recipe(self):
+        picture = stored_json(self.lfp, self.lfp._master_sha)
+        picture['views'] = [{'recipe': {'viewFocus': 0.0}}]
+
+        writer = LfpWriter(self.lfp)
+        writer.set_picture(picture)
+        writer.set_recipe({'viewFocus': 1.5})
+        writer.write(self.out)
+
+        lfp = Lfp(self.out)
+        self.assertHashed(lfp)
+        self.assertEqual(stored_json(lfp, lfp._master_sha)['views'],
+                         [{'recipe': {'viewFocus': 1.5}}])
+
+        image = self.frame(self.lfp, 0)['imageRef']
+        self.assertEqual(self.frame(lfp, 0)['imageRef'], image)
+        self.assertEqual(blob_data(lfp)[image], self.before[image])
+
+    def test_no_recipe(self):
+        writer = LfpWriter(self.lfp)
+        self.assertRaisesRegexp(Exception, 'no recipe in view 0',
+                                writer.set_recipe, {'viewFocus': 1.5})
+
+    def test_not_json(self):
+        writer = LfpWriter(self.lfp)
+        image = self.frame(self.lfp, 0)['imageRef']
+        self.assertRaisesRegexp(Exception, 'not a JSON blob',
+                                writer.set_blob, image, {'a': 1})
+
+    def test_in_place(self):
+        ref = self.frame(self.lfp, 1)['privateMetadataRef']
+        metadata = stored_json(self.lfp, ref)
+        metadata['camera']['serialNumber'] = 'B5159999999'
+
+        writer = LfpWriter(self.path)
+        writer.set_blob(ref, metadata)
+        self.assertEqual(writer.write(), self.path)
+
+        lfp = Lfp(self.path)
+        self.assertHashed(lfp)
+        self.assertEqual(os.listdir(self.tmp), ['in.lfp'])
+        self.assertEqual(
+            stored_json(lfp, self.frame(lfp, 1)['privateMetadataRef']),
+            metadata)
+
+    def test_unedited_copy(self):
+        # the frames share one private metadata blob, which is written once
+        LfpWriter(self.lfp).write(self.out)
+
+        lfp = Lfp(self.out)
+        self.assertEqual(blob_data(lfp), self.before)
+        self.assertEqual(lfp._master_sha, self.lfp._master_sha)
+
+
+if __name__ == '__main__':
+    unittest.main()
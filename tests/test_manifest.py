@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - batch job manifests"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# manifests are parsed and expanded in process; whole runs go through
+# ``lfptool manifest`` on synthetic LFRs with the stub TNT engine (see
+# benchmarks/)
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_tests, '..'))
+dir_benchmarks = os.path.join(dir_root, 'benchmarks')
+sys.path.insert(0, dir_root)
+sys.path.insert(0, dir_benchmarks)
+
+import synthetic
+
+from lpt.lfp.manifest import Manifest
+
+lfptool = os.path.join(dir_root, 'lpt', 'bin', 'lfptool.py')
+stub_tnt = os.path.join(dir_benchmarks, 'stub_tnt.py')
+
+previews = {
+    'name': 'previews',
+    'action': 'image_out',
+    'args': {'imagerep': 'jpeg'},
+    'variants': {'focus': [-1, 0, 1], 'size': [[540, 540]]},
+    'output': '{dir_out}/{name}_{focus}.jpeg'}
+
+
+class ManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def manifest(self, data):
+        path = os.path.join(self.tmp, 'manifest.json')
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        return Manifest(path)
+
+    def assertInvalid(self, data, message):
+        self.assertRaisesRegexp(Exception, re.escape(message), self.manifest,
+                                data)
+
+    def test_expansion(self):
+        plan = self.manifest({
+            'inputs': ['shoot/'],
+            'args': {'dir_out': 'renders/', 'threads': 4},
+            'jobs': [previews,
+                     {'action': 'eslf_out', 'inputs': ['IMG_0001.lfr']}]})
+
+        shoot = os.path.join(self.tmp, 'shoot')
+        renders = os.path.join(self.tmp, 'renders/')
+        first, second = plan.jobs
+
+        # defaults apply to every job, paths are relative to the manifest
+        self.assertEqual(first['inputs'], [shoot])
+        self.assertEqual(first['args']['dir_out'], renders)
+        self.assertEqual(second['args']['threads'], 4)
+        self.assertEqual(second['inputs'],
+                         [os.path.join(self.tmp, 'IMG_0001.lfr')])
+        self.assertEqual(second['name'], '2')
+
+        # every combination; pairs set two arguments
+        variants = list(plan.variants(first))
+        self.assertEqual([v['focus'] for v in variants], [-1, 0, 1])
+        self.assertTrue(all(v['height'] == v['width'] == 540
+                            for v in variants))
+        self.assertTrue(all(v['imagerep'] == 'jpeg' for v in variants))
+        self.assertEqual(first['own'],
+                         set(['imagerep', 'focus', 'height', 'width']))
+        self.assertEqual(list(plan.variants(second)), [second['args']])
+
+        # files of one input directory are searched once
+        self.assertEqual(plan.inputs, [shoot, second['inputs'][0]])
+
+        kwds = dict(variants[0], dir_out=renders)
+        self.assertEqual(plan.output(first, '/shoot/IMG_0001.lfr', kwds),
+                         os.path.join(self.tmp, 'renders',
+                                      'IMG_0001_-1.jpeg'))
+
+    def test_nested_inputs(self):
+        plan = self.manifest({
+            'jobs': [{'action': 'eslf_out', 'inputs': ['shoot/a.lfr']},
+                     {'action': 'unpack', 'inputs': ['shoot']}]})
+
+        self.assertEqual(plan.inputs, [os.path.join(self.tmp, 'shoot')])
+
+    def test_invalid(self):
+        job = {'action': 'eslf_out', 'inputs': ['shoot']}
+
+        self.assertInvalid([], 'not a JSON object')
+        self.assertInvalid({'jobs': []}, 'no jobs')
+        self.assertInvalid({'jobs': [dict(job, action='raw2lfp')]},
+                           'job 1: action must be one of')
+        self.assertInvalid({'jobs': [dict(job, plan='x')]},
+                           'job 1: unknown key(s): plan')
+        self.assertInvalid({'jobs': [dict(job, args={'fokus': 1})]},
+                           'job 1: args: unknown argument(s): fokus')
+        self.assertInvalid({'jobs': [dict(job, variants=[1, 2])]},
+                           'job 1: variants: not an object')
+        self.assertInvalid({'jobs': [dict(job, variants={'focus': 1})]},
+                           'job 1: variants focus: not a list of values')
+        self.assertInvalid({'jobs': [dict(job, variants={'size': [540]})]},
+                           'job 1: variants size: values must be pairs')
+        self.assertInvalid({'jobs': [dict(job, output='{name}.jpeg')]},
+                           'job 1: output templates need action image_out')
+        self.assertInvalid({'jobs': [{'action': 'unpack'}]},
+                           'job 1: no inputs')
+
+    def test_bad_output_template(self):
+        plan = self.manifest({'inputs': ['shoot'],
+                              'jobs': [dict(previews, output='{nme}.jpeg')]})
+
+        self.assertRaisesRegexp(Exception, 'output template', plan.output,
+                                plan.jobs[0], 'IMG_0001.lfr', {})
+
+
+class ManifestCommandTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+        self.paths = synthetic.write_shoot(os.path.join(self.tmp, 'shoot'),
+                                           2, blob_size=1600, width=40,
+                                           height=30)
+        self.renders = os.path.join(self.tmp, 'renders')
+
+        # the second job asks for one preview the first one renders too
+        again = dict(previews, name='again',
+                     variants={'focus': [0], 'size': [[540, 540]]})
+        eslf = {'action': 'eslf_out', 'inputs': ['shoot/IMG_0001.lfr']}
+        self.manifest = os.path.join(self.tmp, 'manifest.json')
+
+        with open(self.manifest, 'w') as f:
+            json.dump({'inputs': ['shoot/'], 'args': {'dir_out': 'renders/'},
+                       'jobs': [previews, again, eslf]}, f)
+
+        self.env = dict(os.environ,
+                        LPT_TNT=stub_tnt,
+                        LPT_LYTRO_HOME=os.path.join(self.tmp, 'lytro'),
+                        LPT_STUB_TNT_LATENCY='.05')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def lfptool(self, *argv):
+        """:return: `str`, output of a successful ``lfptool manifest``"""
+
+        argv = [sys.executable, lfptool, 'manifest', '-m', self.manifest,
+                '-P', '1'] + list(argv)
+        proc = subprocess.Popen(argv, env=self.env, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        output = proc.communicate()[0]
+        self.assertEqual(proc.returncode, 0, output)
+        return output
+
+    def total(self, output, name):
+        return int(re.search(name + r' : (\d+)', output).group(1))
+
+    def previews(self):
+        return sorted(f for f in os.listdir(self.renders)
+                      if f.endswith('.jpeg'))
+
+    def test_dry_run(self):
+        output = self.lfptool('--dry-run')
+
+        self.assertEqual(self.total(output, 'jobs'), 3)
+        self.assertEqual(self.total(output, 'LFPs'), 2)
+        self.assertEqual(self.total(output, 'tasks'), 9)
+        self.assertEqual(self.total(output, 'duplicates'), 2)
+
+        listed = re.findall(r'\d{4} : (\w+) (\S+)', output)
+        self.assertEqual(len(listed), 7)
+        self.assertEqual([a for a, _ in listed].count('eslf_out'), 1)
+        self.assertIn(os.path.join(self.renders, 'IMG_0002_0.0.jpeg'),
+                      output)
+
+        # nothing is rendered
+        self.assertEqual(self.previews(), [])
+
+    def test_run(self):
+        self.lfptool()
+
+        self.assertEqual(self.previews(),
+                         sorted('IMG_000{}_{}.jpeg'.format(n, focus)
+                                for focus in ('-1.0', '0.0', '1.0')
+                                for n in (1, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - download to render pipeline"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# synthetic LFRs on a simulated camera are pulled by `DcfSync` and handed,
+# one at a time, to a `RenderPipeline` rendering with the stub TNT engine
+# (see benchmarks/)
+
+import os
+import sys
+import threading
+import unittest
+
+from adbtest import FakeAdbTestCase
+from adbtest import dir_root
+
+dir_benchmarks = os.path.join(dir_root, 'benchmarks')
+sys.path.insert(0, dir_benchmarks)
+
+import synthetic
+
+from lpt.camera.camerabin import DcfSync
+from lpt.camera.pipeline import RenderPipeline
+from lpt.lfp.tnt import Tnt
+from lpt.lfp.tntcommon import TntCommon
+
+dcf_path = 'storage/sdcard1/DCIM/100PHOTO/'
+stub_tnt = os.path.join(dir_benchmarks, 'stub_tnt.py')
+
+
+class RenderPipelineTest(FakeAdbTestCase):
+
+    count = 6
+
+    def setUp(self):
+
+        FakeAdbTestCase.setUp(self)
+        self.names = []
+
+        for i in range(1, self.count + 1):
+            name = 'IMG_{:04d}.LFR'.format(i)
+            data = synthetic.lfp_data(blob_size=1600, width=40, height=30)
+            self.device_file('ILLUM0001', dcf_path + name, data)
+            self.names.append(name)
+
+        self.out = os.path.join(self.tmp, 'download', 'shoot')
+        self.rendered = os.path.join(self.tmp, 'rendered')
+
+        self.exe, Tnt._exe = Tnt._exe, stub_tnt
+        self.latency = os.environ.get('LPT_STUB_TNT_LATENCY')
+        os.environ['LPT_STUB_TNT_LATENCY'] = '.1'
+
+        # records the progress index every render is given
+        self.indices = []
+        self.raw_image_out = TntCommon.raw_image_out
+        lock = threading.Lock()
+
+        def raw_image_out(tnt_common, lfp_in, **kwargs):
+            with lock:
+                self.indices.append(kwargs['i'])
+            return self.raw_image_out(tnt_common, lfp_in, **kwargs)
+
+        TntCommon.raw_image_out = raw_image_out
+
+    def tearDown(self):
+
+        TntCommon.raw_image_out = self.raw_image_out
+        Tnt._exe = self.exe
+        if self.latency is None:
+            os.environ.pop('LPT_STUB_TNT_LATENCY', None)
+        else:
+            os.environ['LPT_STUB_TNT_LATENCY'] = self.latency
+
+        FakeAdbTestCase.tearDown(self)
+
+    def test_render_while_pulling(self):
+        render = RenderPipeline(jobs=3, queue_size=2, dir_out=self.rendered,
+                                imagerep='jpeg')
+        dcf_sync = DcfSync(os.path.dirname(self.out), adb=[self.adb])
+
+        render.start()
+        try:
+            entries = dcf_sync.list_remote(dcf_path)
+            pulled, failed = dcf_sync.sync(entries, dcf_path, self.out,
+                                           render.submit)
+        finally:
+            rendered, render_failed = render.finish()
+
+        self.assertEqual(sorted(pulled), self.names)
+        self.assertEqual(failed, [])
+        self.assertEqual(render_failed, [])
+        self.assertEqual(sorted(os.path.basename(p) for p in rendered),
+                         self.names)
+
+        # every file gets its own progress index
+        self.assertEqual(sorted(self.indices), range(self.count))
+
+        for name in self.names:
+            image = os.path.splitext(name)[0] + '.jpeg'
+            self.assertTrue(os.path.exists(os.path.join(self.rendered,
+                                                        image)))
+
+    def test_bad_file_fails_alone(self):
+        render = RenderPipeline(jobs=2, dir_out=self.rendered)
+        bad = os.path.join(self.tmp, 'bad.lfr')
+        with open(bad, 'w') as f:
+            f.write('not an lfr')
+
+        render.start()
+        render.submit(bad)
+        render.submit(os.path.join(self.device('ILLUM0001'), dcf_path,
+                                   self.names[0]))
+        rendered, failed = render.finish()
+
+        self.assertEqual(failed, [bad])
+        self.assertEqual(len(rendered), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - packed raw sensor frames"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# random pixel values are packed one pixel and one bit at a time by `pack`,
+# written into synthetic LFPs (see benchmarks/synthetic.py) and decoded by
+# `RawImage`'s vectorised unpacking
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+dir_root = os.path.abspath(os.path.join(dir_tests, '..'))
+sys.path.insert(0, dir_root)
+sys.path.insert(0, os.path.join(dir_root, 'benchmarks'))
+
+import synthetic
+
+from lpt.lfp.rawimage import RawImage
+
+width, height = 24, 10
+
+
+def bits_of(value, bits):
+    """:return: `list`, the bits of `value`, most significant first"""
+
+    return [(value >> i) & 1 for i in reversed(range(bits))]
+
+
+def to_bytes(bit_list):
+    """:return: `str`, bytes of a bit list, most significant bit first"""
+
+    return ''.join(chr(int(''.join(map(str, bit_list[i:i + 8])), 2))
+                   for i in range(0, len(bit_list), 8))
+
+
+def pack(pixels, bits, endianness):
+    """packs pixel values as the camera does
+
+    10-bit little endian (Illum): the high eight bits of four pixels, then
+    one byte of their low two bits, first pixel lowest; 12-bit little
+    endian: two pixels as a little endian 24-bit word, first pixel low;
+    big endian: a bit stream of the pixels, most significant bit first
+
+    :param pixels: `list`, pixel values in row order
+    :return: `str`, packed bytes
+    """
+
+    group = 4 if bits == 10 else 2
+    out = []
+
+    for i in range(0, len(pixels), group):
+        values = pixels[i:i + group]
+
+        if endianness == 'big':
+            out.append(to_bytes(sum([bits_of(v, bits) for v in values], [])))
+
+        elif bits == 10:
+            high = [v >> 2 for v in values]
+            low = sum((v & 0x03) << (2 * n) for n, v in enumerate(values))
+            out.append(''.join(chr(b) for b in high + [low]))
+
+        else:
+            word = values[0] | values[1] << 12
+            out.append(''.join(chr((word >> s) & 0xff) for s in (0, 8, 16)))
+
+    return ''.join(out)
+
+
+class RawImageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+        self.random = random.Random(40)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def raw_image(self, bits, endianness, pixels=None):
+        """:return: `tuple`, <RawImage> of a synthetic LFP and its pixels"""
+
+        if pixels is None:
+            pixels = [self.random.randrange(1 << bits)
+                      for _ in range(width * height)]
+
+        path = os.path.join(self.tmp, '{}{}.lfr'.format(bits, endianness))
+        synthetic.write_lfp(path, width=width, height=height, bits=bits,
+                            endianness=endianness,
+                            raw=pack(pixels, bits, endianness))
+
+        return RawImage(path), pixels
+
+    def rows_of(self, pixels, start, stop):
+        return [pixels[r * width:(r + 1) * width] for r in range(start, stop)]
+
+    def test_packings(self):
+        for bits in 10, 12:
+            for endianness in 'little', 'big':
+                raw, pixels = self.raw_image(bits, endianness)
+
+                self.assertEqual((raw.bits, raw.endianness),
+                                 (bits, endianness))
+                self.assertEqual(raw.shape, (height, width))
+                self.assertEqual(raw.decode().tolist(),
+                                 self.rows_of(pixels, 0, height),
+                                 '{} bit {} endian'.format(bits, endianness))
+
+    def test_extremes(self):
+        for bits in 10, 12:
+            for endianness in 'little', 'big':
+                top = (1 << bits) - 1
+                pixels = [top, 0] * (width * height // 2)
+                raw, _ = self.raw_image(bits, endianness, pixels)
+
+                self.assertEqual(raw.decode().tolist(),
+                                 self.rows_of(pixels, 0, height))
+
+    def test_default_packing(self):
+        # without pixelPacking, the sensor's bits pick the endianness
+        path = os.path.join(self.tmp, 'default.lfr')
+        pixels = [self.random.randrange(1 << 10)
+                  for _ in range(width * height)]
+        synthetic.write_lfp(path, width=width, height=height,
+                            raw=pack(pixels, 10, 'little'))
+
+        raw = RawImage(path)
+        self.assertEqual((raw.bits, raw.endianness), (10, 'little'))
+        self.assertEqual(raw.decode().tolist(),
+                         self.rows_of(pixels, 0, height))
+
+    def test_rows(self):
+        raw, pixels = self.raw_image(12, 'big')
+
+        self.assertEqual(raw.rows(3, 7).tolist(), self.rows_of(pixels, 3, 7))
+        self.assertEqual(raw.rows(8, 100).tolist(),
+                         self.rows_of(pixels, 8, height))
+
+        chunks = list(raw.chunks(4))
+        self.assertEqual([start for start, _ in chunks], [0, 4, 8])
+        self.assertEqual(sum([c.tolist() for _, c in chunks], []),
+                         self.rows_of(pixels, 0, height))
+
+    def test_bad_rows(self):
+        raw, _ = self.raw_image(10, 'little')
+
+        for start, stop in (5, 5), (6, 2), (height, None), (-1, 3):
+            self.assertRaisesRegexp(Exception, 'invalid row range',
+                                    raw.rows, start, stop)
+
+    def test_blob_too_small(self):
+        path = os.path.join(self.tmp, 'small.lfr')
+        synthetic.write_lfp(path, width=width, height=height, raw='\x00' * 8)
+
+        self.assertRaisesRegexp(Exception, 'blob too small', RawImage, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - recipe tool commands across processes"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# workers are forked, so a `Cmds.current_file` replaced here is what they
+# run; it stands in for the per-file work and ends a worker on the spot for
+# files named killed*.json.  results a worker has queued but not yet sent
+# die with it, so a killed worker can cost more than the file it was on
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(dir_tests, '..')))
+
+from lpt.recipe import cmds
+
+
+def _current_file(self, args, recipe_file, lock, i=0):
+    if os.path.basename(recipe_file).startswith('killed'):
+        os._exit(1)
+    return True
+
+
+class CurrentParallelTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+        self.names = ['a.json', 'b.json', 'c.json', 'd.json']
+        for name in self.names:
+            with open(os.path.join(self.tmp, name), 'w') as f:
+                f.write('{}')
+
+        self.current_file = cmds.Cmds.current_file
+        cmds.Cmds.current_file = _current_file
+
+        self.warnings = []
+        self.tool_warn = cmds.ToolWarn
+        cmds.ToolWarn = self.warnings.append
+
+    def tearDown(self):
+
+        cmds.Cmds.current_file = self.current_file
+        cmds.ToolWarn = self.tool_warn
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def kill_at(self, *names):
+        for name in names:
+            with open(os.path.join(self.tmp, name), 'w') as f:
+                f.write('{}')
+
+    def failed(self):
+        """:return: `list`, names of the files reported as lost"""
+
+        lost = ': worker process exited'
+        self.assertTrue(all(w.endswith(lost) for w in self.warnings))
+        return sorted(os.path.basename(w[:-len(lost)])
+                      for w in self.warnings)
+
+    def run_current(self, processors=2):
+        """runs `current` in a thread, so a hang fails rather than blocks"""
+
+        recipe_cmds = cmds.Cmds()
+        args = argparse.Namespace(paths=[self.tmp], processors=processors,
+                                  action=recipe_cmds.info,
+                                  print_help=object, verbose=False)
+
+        thread = threading.Thread(target=recipe_cmds.current, args=(args,))
+        thread.daemon = True
+        thread.start()
+        thread.join(30)
+        self.assertFalse(thread.is_alive(), 'current did not return')
+
+    def test_all_done(self):
+        self.run_current()
+        self.assertEqual(self.warnings, [])
+
+    def test_worker_killed(self):
+        self.kill_at('killed.json')
+        self.run_current()
+
+        self.assertIn('killed.json', self.failed())
+
+    def test_every_worker_killed(self):
+        # the files nobody took up are reported too
+        self.kill_at('killed1.json', 'killed2.json')
+        self.run_current()
+
+        failed = self.failed()
+        self.assertIn('killed1.json', failed)
+        self.assertIn('killed2.json', failed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - longest job first task scheduling"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# tasks are (index, input path[, per-task keyword arguments]) tuples as
+# queued by `Cmds._multiprocess`; inputs are plain files of a known size
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(dir_tests, '..')))
+
+from lpt.lfp.schedule import Scheduler
+
+
+class SchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+        self.path = os.path.join(self.tmp, 'timings.json')
+        self.master = [(0, self.write('small.lfp', 1)),
+                       (1, self.write('large.lfp', 4)),
+                       (2, self.write('medium.lfp', 2))]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, name, mb):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'wb') as f:
+            f.write('\x00' * int(mb * 1e6))
+        return path
+
+    def stored(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_order(self):
+        kwargs = {'action': 'image_out'}
+
+        longest = Scheduler(path=None).order(self.master, kwargs)
+        self.assertEqual([n for n, _ in longest], [1, 2, 0])
+        self.assertEqual(sorted(u for _, u in longest), [1., 2., 4.])
+
+        in_path = Scheduler('path', path=None).order(self.master, kwargs)
+        self.assertEqual([n for n, _ in in_path], [0, 1, 2])
+
+    def test_order_by_action(self):
+        # a cheap action on a large input can go after a small expensive one
+        master = [(0, self.master[0][1], {'action': 'unpack'}),
+                  (1, self.master[1][1], {'action': 'extract'})]
+
+        order = Scheduler(path=None).order(master, {})
+        self.assertEqual([n for n, _ in order], [0, 1])
+
+    def test_output_size(self):
+        master = [(0, self.master[0][1], {'height': 2000, 'width': 2000}),
+                  (1, self.master[0][1])]
+
+        order = Scheduler(path=None).order(master, {'action': 'image_out'})
+        self.assertEqual(order, [(0, 4.), (1, 1.)])
+
+    def test_record(self):
+        kwargs = {'action': 'image_out'}
+        scheduler = Scheduler(path=self.path)
+        units = dict(scheduler.order(self.master, kwargs))
+
+        scheduler.record(self.master, kwargs, units, {0: 2., 1: 8., 2: 4.})
+        self.assertEqual(self.stored(), {'image_out': 2.})
+        self.assertEqual(sorted(os.listdir(self.tmp)),
+                         ['large.lfp', 'medium.lfp', 'small.lfp',
+                          'timings.json'])
+
+        # later runs are folded in, half and half
+        scheduler = Scheduler(path=self.path)
+        self.assertEqual(scheduler.rate('image_out'), 2.)
+        scheduler.record(self.master, kwargs, units, {0: 4.})
+        self.assertEqual(self.stored(), {'image_out': 3.})
+
+    def test_record_bad_file(self):
+        with open(self.path, 'w') as f:
+            f.write('{"image_out": ')
+
+        scheduler = Scheduler(path=self.path)
+        self.assertEqual(scheduler.rate('image_out'), 1.)
+        scheduler.record(self.master, {'action': 'image_out'}, {0: 1.},
+                         {0: 3.})
+        self.assertEqual(self.stored(), {'image_out': 3.})
+
+    def test_makespan(self):
+        self.assertEqual(Scheduler.makespan([], 2), 0.)
+        self.assertEqual(Scheduler.makespan([1., 2., 3.], 1), 6.)
+        self.assertEqual(Scheduler.makespan([1., 1., 4.], 2), 5.)
+        self.assertEqual(Scheduler.makespan([4., 1., 1.], 2), 4.)
+        self.assertEqual(Scheduler.makespan([3., 3.], 0), 6.)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - camera state polling"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# the simulated camera applies every ``model set`` and capture after
+# $FAKE_ADB_LAG seconds, so a wait has to poll for it; lags are kept well
+# below the fixed sleeps the waits replace
+
+import os
+import time
+import unittest
+
+from adbtest import FakeAdbTestCase
+
+from lpt.camera.camerabin import CameraControls
+
+lag = .3
+
+
+class WaitTest(FakeAdbTestCase):
+
+    def setUp(self):
+        FakeAdbTestCase.setUp(self)
+        os.environ['FAKE_ADB_LAG'] = str(lag)
+        self.cam = CameraControls(adb_bin=self.adb)
+
+    def tearDown(self):
+        self.cam.session.close()
+        FakeAdbTestCase.tearDown(self)
+
+    def timed(self, func, *args):
+        start = time.time()
+        result = func(*args)
+        return result, time.time() - start
+
+    def test_set_waits_for_value(self):
+        _, seconds = self.timed(self.cam.set_iso, 200, True)
+
+        self.assertEqual(self.model('ILLUM0001', 'iso'), '200')
+        self.assertEqual(self.model('ILLUM0001', 'exposureMode'),
+                         'EXPOSURE_MANUAL')
+        # exposure mode and iso, each after its own lag; 2s fixed before
+        self.assertGreaterEqual(seconds, 2 * lag)
+        self.assertLess(seconds, 1.5)
+
+    def test_report(self):
+        self.cam.set_timeout(30, True)
+        budget, spent, saved = self.cam.wait_report()
+
+        self.assertEqual(budget, 1)
+        self.assertGreaterEqual(spent, lag)
+        self.assertAlmostEqual(saved, budget - spent)
+        self.assertEqual(self.cam.wait_report(), (0, 0, 0))
+
+    def test_deadline(self):
+        self.model('ILLUM0001', 'iso', 100)
+        probe = lambda: self.cam.get_output('model get iso')[14:]
+        self.cam.check_if_running_adb(True)
+
+        ready, seconds = self.timed(self.cam.wait_until, probe,
+                                    lambda v: v.strip() == '800', .5)
+
+        self.assertFalse(ready)
+        self.assertGreaterEqual(seconds, .5)
+        self.assertLess(seconds, 1.)
+
+    def test_model_value_matches(self):
+        match = CameraControls.model_value_matches
+
+        self.assertTrue(match('0.0040000\n', '0.004'))
+        self.assertFalse(match('0.0050000\n', '0.004'))
+        self.assertTrue(match('EXPOSURE_MANUAL\n', 'exposure_manual'))
+        self.assertFalse(match('\n', '100'))
+
+    def test_lens_reaches_target(self):
+        self.model('ILLUM0001', 'focusPos', 800 / 1645.)
+        self.cam.set_real_focus(1000, True)
+
+        self.assertEqual(self.cam.get_real_focus(True), 1000)
+
+    def test_lens_stops_short(self):
+        # the simulated lens stops at step 1500; the wait ends once it has
+        # moved and holds still, not at the deadline
+        self.model('ILLUM0001', 'focusPos', 800 / 1645.)
+        _, seconds = self.timed(self.cam.set_real_focus, 1645, True)
+
+        self.assertEqual(self.cam.get_real_focus(True), 1500)
+        self.assertLess(seconds, 2)
+
+    def test_focus_range_cached(self):
+        # probed once per camera and zoom step, then read from the user's
+        # config home rather than the package directory
+        self.device_file('ILLUM0001', 'unitdata/unit_info.json',
+                         '{"camera": {"serialNumber": "A123 "}}')
+        self.model('ILLUM0001', 'focusPos', 800 / 1645.)
+        config_home = os.environ.get('XDG_CONFIG_HOME')
+        os.environ['XDG_CONFIG_HOME'] = os.path.join(self.tmp, 'config')
+
+        try:
+            self.cam.session.close()
+            self.cam = CameraControls(adb_bin=self.adb)
+        finally:
+            if config_home is None:
+                del os.environ['XDG_CONFIG_HOME']
+            else:
+                os.environ['XDG_CONFIG_HOME'] = config_home
+
+        self.assertEqual(self.cam.get_valid_focus_range(), [200, 1500])
+        _, seconds = self.timed(self.cam.get_valid_focus_range)
+
+        self.assertLess(seconds, lag)
+        self.assertTrue(os.path.exists(os.path.join(
+            self.tmp, 'config', 'lytro', 'focus_ranges.json')))
+
+    def test_take_picture(self):
+        with open(self.device('ILLUM0001') + '/.state/shotsremaining',
+                  'w') as f:
+            f.write('10\n')
+
+        _, seconds = self.timed(self.cam.take_picture, True, 2)
+
+        self.assertEqual(self.cam.get_pictures_remaining(True), 8)
+        self.assertGreaterEqual(seconds, 2 * lag)
+        self.assertLess(seconds, 5.5)
+
+    def test_wait_for_dcf(self):
+        self.device_file('ILLUM0001',
+                         'storage/sdcard1/DCIM/100PHOTO/IMG_0001.LFR', 'lfr')
+
+        ready, seconds = self.timed(self.cam.wait_for_dcf)
+
+        self.assertTrue(ready)
+        self.assertLess(seconds, 2)
+
+    def test_wait_for_dcf_empty_card(self):
+        ready, seconds = self.timed(self.cam.wait_for_dcf, .5)
+
+        self.assertFalse(ready)
+        self.assertGreaterEqual(seconds, .5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""Lytro Power Tools - tests - watch folder ingest"""
+
+# <copyright>
+# Copyright (c) 2011-2015 Lytro, Inc. All rights reserved.
+# This software is the confidential and proprietary information of Lytro, Inc.
+# You shall not disclose such confidential information and shall use it only in
+# accordance with the license granted to you by Lytro, Inc.
+
+# EXCEPT AS EXPRESSLY SET FORTH IN A WRITTEN LICENSE AGREEMENT WITH LICENSEE,
+# LYTRO, INC. MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+# THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE, OR
+# NON-INFRINGEMENT. LYTRO, INC. SHALL NOT BE LIABLE FOR ANY DAMAGES SUFFERED BY
+# LICENSEE AS A RESULT OF USING, COPYING, MODIFYING OR DISTRIBUTING THIS
+# SOFTWARE OR ITS DERIVATIVES.
+# </copyright>
+
+# the watcher only lists and stats files, so any file matching the LFP
+# pattern will do; a settle time of 0 hands a file on at its second poll.
+# every test runs with inotify (where available) and with polling
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+dir_tests = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(dir_tests, '..')))
+
+from lpt.lfp.watch import Watcher
+
+
+class WatcherTest(unittest.TestCase):
+
+    notify = True
+
+    def setUp(self):
+
+        self.tmp = tempfile.mkdtemp(prefix='lpt_test_')
+        self.dir_in = os.path.join(self.tmp, 'in')
+        self.cursor = os.path.join(self.tmp, 'cursor.json')
+        os.mkdir(self.dir_in)
+        self.path = self.write('IMG_0001.lfr', 'lfp')
+        self.watchers = []
+
+    def tearDown(self):
+        [w.close() for w in self.watchers]
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, name, data):
+        path = os.path.join(self.dir_in, name)
+        with open(path, 'w') as f:
+            f.write(data)
+        return path
+
+    def watcher(self, **kwargs):
+        watcher = Watcher([self.dir_in], self.cursor, settle=0,
+                          notify=self.notify, **kwargs)
+        self.watchers.append(watcher)
+        return watcher
+
+    def ready(self, watcher):
+        """:return: `list`, files handed on by two polls"""
+
+        return watcher.poll() + watcher.poll()
+
+    def cursor_data(self):
+        with open(self.cursor) as f:
+            return json.load(f)
+
+    def test_done_not_handled_again(self):
+        watcher = self.watcher()
+        self.assertEqual(self.ready(watcher), [self.path])
+        self.assertEqual(self.ready(watcher), [])
+
+        watcher.handled(self.path, 'done')
+        self.assertEqual(self.ready(watcher), [])
+        self.assertEqual(self.cursor_data()[self.path][2], 'done')
+
+        # the cursor carries over to the next session
+        self.assertEqual(self.ready(self.watcher()), [])
+
+    def test_failed_retried(self):
+        watcher = self.watcher(retries=3, backoff=.1)
+        self.assertEqual(self.ready(watcher), [self.path])
+
+        # tried again after .1s, then .2s
+        for delay in .1, .2:
+            watcher.handled(self.path, 'failed')
+            self.assertEqual(self.ready(watcher), [])
+            self.assertFalse(os.path.exists(self.cursor))
+
+            time.sleep(delay + .05)
+            self.assertEqual(self.ready(watcher), [self.path])
+
+        # the third failure is final
+        watcher.handled(self.path, 'failed')
+        self.assertEqual(self.cursor_data()[self.path][2], 'failed')
+
+        time.sleep(.5)
+        self.assertEqual(self.ready(watcher), [])
+        self.assertEqual(watcher.failed, {})
+
+    def test_failed_then_done(self):
+        watcher = self.watcher(backoff=.1)
+        self.ready(watcher)
+        watcher.handled(self.path, 'failed')
+
+        time.sleep(.15)
+        self.assertEqual(self.ready(watcher), [self.path])
+        watcher.handled(self.path, 'done')
+
+        self.assertEqual(watcher.failed, {})
+        self.assertEqual(self.cursor_data()[self.path][2], 'done')
+
+    def test_changed_failed_file(self):
+        # a rewritten file does not wait out the backoff
+        watcher = self.watcher(backoff=60)
+        self.ready(watcher)
+        watcher.handled(self.path, 'failed')
+        self.assertEqual(self.ready(watcher), [])
+
+        self.write('IMG_0001.lfr', 'rewritten lfp')
+        self.assertEqual(self.ready(watcher), [self.path])
+
+    def test_failed_file_removed(self):
+        watcher = self.watcher(backoff=60)
+        self.ready(watcher)
+        watcher.handled(self.path, 'failed')
+
+        os.remove(self.path)
+        self.assertEqual(self.ready(watcher), [])
+        self.assertEqual(watcher.failed, {})
+
+    def test_new_directories(self):
+        watcher = self.watcher()
+        self.assertEqual(self.ready(watcher), [self.path])
+
+        os.makedirs(os.path.join(self.dir_in, 'a', 'b'))
+        path = self.write(os.path.join('a', 'b', 'IMG_0002.lfr'), 'lfp')
+        self.write(os.path.join('a', 'notes.txt'), 'not an lfp')
+        self.assertEqual(self.ready(watcher), [path])
+
+        # a directory moved away takes its files along
+        watcher.handled(path, 'done')
+        os.rename(os.path.join(self.dir_in, 'a'),
+                  os.path.join(self.tmp, 'a'))
+        self.assertEqual(self.ready(watcher), [])
+        self.assertNotIn(path, watcher.seen)
+
+    def test_notify(self):
+        watcher = self.watcher()
+        linux = sys.platform.startswith('linux')
+        self.assertEqual(bool(watcher._notify), self.notify and linux)
+
+
+class PollingWatcherTest(WatcherTest):
+
+    notify = False
+
+    def test_listing_kept(self):
+        # a directory is listed again only once it changes
+        past = time.time() - 60
+        os.utime(self.dir_in, (past, past))
+
+        listed = []
+        listdir = os.listdir
+
+        def count(path):
+            listed.append(path)
+            return listdir(path)
+
+        watcher = self.watcher()
+        os.listdir = count
+        try:
+            self.assertEqual(self.ready(watcher), [self.path])
+            self.assertEqual(listed, [self.dir_in])
+            watcher.handled(self.path, 'done')
+
+            # files are still stat'ed
+            self.write('IMG_0001.lfr', 'rewritten lfp')
+            self.assertEqual(self.ready(watcher), [self.path])
+            self.assertEqual(len(listed), 1)
+
+            # a directory changed this recently is listed at every poll,
+            # a change in the same time stamp tick could follow
+            path = self.write('IMG_0002.lfr', 'lfp')
+            self.assertEqual(self.ready(watcher), [path])
+            self.assertEqual(len(listed), 3)
+        finally:
+            os.listdir = listdir
+
+
+if __name__ == '__main__':
+    unittest.main()